@@ -0,0 +1,38 @@
+"""Add tbl_txn_matching_watermark for incremental matching
+
+Revision ID: 147d58feecfa
+Revises: 5dc1fe6174e1
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '147d58feecfa'
+down_revision = '5dc1fe6174e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tbl_txn_matching_watermark',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('rule_id', sa.BigInteger(), nullable=False),
+    sa.Column('channel_id', sa.BigInteger(), nullable=True),
+    sa.Column('last_created_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('rule_updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('last_run_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['rule_id'], ['tbl_cfg_matching_rule.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['channel_id'], ['tbl_cfg_channels.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tbl_txn_matching_watermark_rule_id'), 'tbl_txn_matching_watermark', ['rule_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tbl_txn_matching_watermark_rule_id'), table_name='tbl_txn_matching_watermark')
+    op.drop_table('tbl_txn_matching_watermark')
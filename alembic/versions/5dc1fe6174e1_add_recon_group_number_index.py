@@ -0,0 +1,30 @@
+"""Add index on tbl_txn_transactions.recon_group_number
+
+Revision ID: 5dc1fe6174e1
+Revises: 5a37d6485b82
+Create Date: 2026-10-18 09:00:00.000000
+
+Matching runs stamp their unmatched snapshot with recon_group_number and
+read it back by that value; recon run reports filter on it as well.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5dc1fe6174e1'
+down_revision = '5a37d6485b82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_txn_recon_group_number',
+        'tbl_txn_transactions',
+        ['recon_group_number'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_txn_recon_group_number', table_name='tbl_txn_transactions')
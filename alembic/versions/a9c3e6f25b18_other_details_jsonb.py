@@ -0,0 +1,80 @@
+"""Store tbl_txn_transactions.otherDetails as JSONB with a GIN index
+
+Revision ID: a9c3e6f25b18
+Revises: f4b1d8e07a52
+Create Date: 2026-10-18 19:00:00.000000
+
+otherDetails holds the raw file row as JSON text. As JSONB, single raw
+columns can be read in SQL ("otherDetails" ->> 'key', used by the matcher
+fetch and the network_id backfill) and filtered with containment
+("otherDetails" @> '{"key": "value"}'), served by the jsonb_path_ops GIN
+index.
+
+Existing values are converted by a temporary helper: valid JSON is cast
+as is; NaN / Infinity tokens written by json.dumps become null; anything
+else (e.g. legacy pipe-separated text) is kept as a JSON string.
+
+ALTER COLUMN ... TYPE rewrites the table under an ACCESS EXCLUSIVE lock:
+run this upgrade in a maintenance window (no uploads or matching). The
+index is then built CONCURRENTLY.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c3e6f25b18'
+down_revision = 'f4b1d8e07a52'
+branch_labels = None
+depends_on = None
+
+
+TEXT_TO_JSONB = r'''
+CREATE OR REPLACE FUNCTION pg_temp.recon_text_to_jsonb(value text) RETURNS jsonb
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    IF value IS NULL THEN
+        RETURN NULL;
+    END IF;
+    BEGIN
+        RETURN value::jsonb;
+    EXCEPTION WHEN others THEN
+        NULL;
+    END;
+    BEGIN
+        RETURN regexp_replace(
+            value, '([:,\[]\s*)-?(NaN|Infinity)(\s*[,}\]])', '\1null\3', 'g'
+        )::jsonb;
+    EXCEPTION WHEN others THEN
+        RETURN to_jsonb(value);
+    END;
+END
+$$
+'''
+
+
+def upgrade() -> None:
+    op.execute(TEXT_TO_JSONB)
+    op.execute(
+        'ALTER TABLE tbl_txn_transactions ALTER COLUMN "otherDetails" TYPE jsonb '
+        'USING pg_temp.recon_text_to_jsonb("otherDetails")'
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_txn_other_details_gin',
+            'tbl_txn_transactions',
+            ['otherDetails'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'otherDetails': 'jsonb_path_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_txn_other_details_gin', table_name='tbl_txn_transactions')
+    op.execute(
+        'ALTER TABLE tbl_txn_transactions ALTER COLUMN "otherDetails" TYPE text '
+        'USING CASE WHEN jsonb_typeof("otherDetails") = \'string\' '
+        'THEN "otherDetails" #>> \'{}\' ELSE "otherDetails"::text END'
+    )
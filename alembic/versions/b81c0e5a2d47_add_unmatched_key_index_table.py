@@ -0,0 +1,39 @@
+"""Add tbl_txn_unmatched_key for key-probed incremental matching
+
+Revision ID: b81c0e5a2d47
+Revises: 147d58feecfa
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81c0e5a2d47'
+down_revision = '147d58feecfa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tbl_txn_unmatched_key',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('rule_id', sa.BigInteger(), nullable=False),
+    sa.Column('transaction_id', sa.BigInteger(), nullable=False),
+    sa.Column('source_id', sa.BigInteger(), nullable=True),
+    sa.Column('match_key', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['rule_id'], ['tbl_cfg_matching_rule.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['transaction_id'], ['tbl_txn_transactions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('transaction_id', 'rule_id', name='uq_unmatched_key_transaction_rule')
+    )
+    op.create_index('idx_unmatched_key_rule_key', 'tbl_txn_unmatched_key', ['rule_id', 'match_key'], unique=False)
+    op.add_column('tbl_txn_matching_watermark', sa.Column('key_index', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tbl_txn_matching_watermark', 'key_index')
+    op.drop_index('idx_unmatched_key_rule_key', table_name='tbl_txn_unmatched_key')
+    op.drop_table('tbl_txn_unmatched_key')
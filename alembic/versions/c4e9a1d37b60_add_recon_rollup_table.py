@@ -0,0 +1,36 @@
+"""Add tbl_txn_recon_rollup for pre-aggregated reconciliation summaries
+
+Revision ID: c4e9a1d37b60
+Revises: b81c0e5a2d47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a1d37b60'
+down_revision = 'b81c0e5a2d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tbl_txn_recon_rollup',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('channel_id', sa.BigInteger(), nullable=False),
+    sa.Column('source_id', sa.BigInteger(), nullable=False),
+    sa.Column('network_id', sa.BigInteger(), nullable=False),
+    sa.Column('business_date', sa.String(length=10), nullable=False),
+    sa.Column('match_status', sa.Integer(), nullable=False),
+    sa.Column('txn_count', sa.BigInteger(), nullable=False),
+    sa.Column('amount_total', sa.Numeric(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('channel_id', 'source_id', 'network_id', 'business_date', 'match_status', name='uq_recon_rollup_bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tbl_txn_recon_rollup')
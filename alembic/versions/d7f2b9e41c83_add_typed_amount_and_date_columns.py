@@ -0,0 +1,37 @@
+"""Add typed amount_numeric / txn_ts shadow columns to tbl_txn_transactions
+
+Revision ID: d7f2b9e41c83
+Revises: c4e9a1d37b60
+Create Date: 2026-10-18 15:00:00.000000
+
+New uploads fill both columns; existing rows are filled online by
+scripts/backfill_typed_columns.py. The indexes are built CONCURRENTLY so
+the table stays writable.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f2b9e41c83'
+down_revision = 'c4e9a1d37b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tbl_txn_transactions', sa.Column('amount_numeric', sa.Numeric(precision=20, scale=4), nullable=True))
+    op.add_column('tbl_txn_transactions', sa.Column('txn_ts', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('idx_txn_channel_txn_ts', 'tbl_txn_transactions', ['channel_id', 'txn_ts'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_txn_txn_ts', 'tbl_txn_transactions', ['txn_ts'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_txn_amount_numeric', 'tbl_txn_transactions', ['amount_numeric'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_txn_amount_numeric', table_name='tbl_txn_transactions')
+    op.drop_index('idx_txn_txn_ts', table_name='tbl_txn_transactions')
+    op.drop_index('idx_txn_channel_txn_ts', table_name='tbl_txn_transactions')
+    op.drop_column('tbl_txn_transactions', 'txn_ts')
+    op.drop_column('tbl_txn_transactions', 'amount_numeric')
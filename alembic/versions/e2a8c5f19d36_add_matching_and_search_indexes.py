@@ -0,0 +1,91 @@
+"""Add partial / composite indexes for the matching and search hot queries
+
+Revision ID: e2a8c5f19d36
+Revises: d7f2b9e41c83
+Create Date: 2026-10-18 16:00:00.000000
+
+- idx_txn_unmatched_channel_source: every matcher fetch reads the unmatched
+  rows of one (channel, source); the partial index only holds those rows.
+- idx_txn_dedup_key: the upload duplicate check looks up
+  (channel_id, source_id, amount, date, ccy) across ALL rows, which
+  idx_txn_duplicate_check (unmatched rows only, no ccy) cannot serve.
+- idx_txn_recon_reference_number: recon reference lookups and search.
+- idx_txn_matched_group_key / idx_txn_partial_group_key: the group keys the
+  grouped transaction listing sorts and pages by (must stay identical to
+  _group_key_expression in app/api/v1/routers/transactions.py).
+
+idx_txn_duplicate_check (channel_id, source_id, amount, date over unmatched
+rows) is dropped: it served neither query exactly and is superseded by the
+two indexes above.
+
+The indexes are built CONCURRENTLY so the table stays writable.
+scripts/check_query_plans.py verifies the hot queries use them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a8c5f19d36'
+down_revision = 'd7f2b9e41c83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_txn_unmatched_channel_source',
+            'tbl_txn_transactions',
+            ['channel_id', 'source_id'],
+            unique=False,
+            postgresql_where=sa.text('match_status IS NULL OR match_status = 0'),
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_txn_dedup_key',
+            'tbl_txn_transactions',
+            ['channel_id', 'source_id', 'amount', 'date', 'ccy'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_txn_recon_reference_number',
+            'tbl_txn_transactions',
+            ['recon_reference_number'],
+            unique=False,
+            postgresql_where=sa.text('recon_reference_number IS NOT NULL'),
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_txn_matched_group_key',
+            'tbl_txn_transactions',
+            [sa.text("COALESCE(recon_reference_number, 'txn_' || CAST(id AS VARCHAR))")],
+            unique=False,
+            postgresql_where=sa.text('match_status = 1'),
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_txn_partial_group_key',
+            'tbl_txn_transactions',
+            [sa.text("COALESCE('partial_' || reference_number, 'txn_' || CAST(id AS VARCHAR))")],
+            unique=False,
+            postgresql_where=sa.text('match_status = 2'),
+            postgresql_concurrently=True
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_txn_duplicate_check')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'idx_txn_duplicate_check',
+        'tbl_txn_transactions',
+        ['channel_id', 'source_id', 'amount', 'date'],
+        unique=False,
+        postgresql_where=sa.text('match_status IS NULL OR match_status = 0')
+    )
+    op.drop_index('idx_txn_partial_group_key', table_name='tbl_txn_transactions')
+    op.drop_index('idx_txn_matched_group_key', table_name='tbl_txn_transactions')
+    op.drop_index('idx_txn_recon_reference_number', table_name='tbl_txn_transactions')
+    op.drop_index('idx_txn_dedup_key', table_name='tbl_txn_transactions')
+    op.drop_index('idx_txn_unmatched_channel_source', table_name='tbl_txn_transactions')
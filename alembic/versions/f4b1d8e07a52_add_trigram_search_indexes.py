@@ -0,0 +1,61 @@
+"""Add pg_trgm / exact-match indexes for transaction search
+
+Revision ID: f4b1d8e07a52
+Revises: e2a8c5f19d36
+Create Date: 2026-10-18 17:00:00.000000
+
+The transaction search filters reference_number, account_number and txn_id
+with ILIKE '%value%', which a btree index cannot serve. The pg_trgm GIN
+indexes answer those substring (and prefix) patterns for values of 3+
+characters. Full RRNs / account numbers are looked up with = on the plain
+btree indexes (same definition as scripts/add_matching_indexes.py, so
+existing copies are kept).
+
+CREATE EXTENSION needs a role allowed to create extensions; pg_trgm is a
+trusted extension from PostgreSQL 13 on.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b1d8e07a52'
+down_revision = 'e2a8c5f19d36'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_COLUMNS = ['reference_number', 'account_number', 'txn_id']
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'idx_txn_{column}_trgm',
+                'tbl_txn_transactions',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True
+            )
+        for column in ['reference_number', 'account_number']:
+            op.create_index(
+                f'idx_txn_{column}',
+                'tbl_txn_transactions',
+                [column],
+                unique=False,
+                postgresql_where=sa.text(f'{column} IS NOT NULL'),
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_txn_account_number', table_name='tbl_txn_transactions', if_exists=True)
+    op.drop_index('idx_txn_reference_number', table_name='tbl_txn_transactions', if_exists=True)
+    for column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f'idx_txn_{column}_trgm', table_name='tbl_txn_transactions')
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db.session import get_db
 from app.db.repositories.matching_rule_repository import MatchingRuleRepository
+from app.new_engine.rule_cache import compiled_rules
 from app.api.v1.schemas.matching_rule import (
     MatchingRuleCreate,
     MatchingRuleUpdate,
@@ -144,6 +145,7 @@ async def update_matching_rule(
     - All fields are optional - only provided fields will be updated
     """
     updated_rule = await MatchingRuleRepository.update(db, rule_id, rule_update)
+    compiled_rules.invalidate(rule_id)
     if not updated_rule:
         raise HTTPException(status_code=404, detail=f"Matching rule with ID {rule_id} not found")
     return updated_rule
@@ -160,6 +162,7 @@ async def delete_matching_rule(
     - **rule_id**: ID of the matching rule to delete
     """
     deleted = await MatchingRuleRepository.delete(db, rule_id)
+    compiled_rules.invalidate(rule_id)
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Matching rule with ID {rule_id} not found")
     return HTTPException(status_code=200, detail=f"The matching rule has been deleted successfully")
@@ -53,6 +53,9 @@ async def smart_search_transactions(
     - **Reference Number (RRN)**: 12+ digit numbers (e.g., "427654421259")
     - **Unknown**: Searches across all text fields
     
+    Complete RRNs (12 digits) are matched exactly; other values are
+    substring matches.
+    
     ## Example Request:
     ```json
     {
@@ -1,18 +1,107 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case, and_, or_, Numeric
+from sqlalchemy import select, func, case, and_, or_, Numeric, String, BigInteger, cast, literal_column
 from typing import Optional, List
 from datetime import datetime
+import base64
+import json
 
 from app.db.session import get_db
 from app.db.models.transactions import Transaction
 from app.db.models.channel_config import ChannelConfig
 from app.db.models.source_config import SourceConfig
 from app.db.models.matching_rule_config import MatchingRuleConfig
+from app.db.models.recon_rollup import ReconRollup
+from app.config import settings
+from app.utils.other_details import other_details_text
+from app.utils.typed_columns import txn_ts_conditions
 
 router = APIRouter(prefix="/api/v1/reconciliations", tags=["reconciliations"])
 
 
+def _group_key_expression(status_lower: str):
+    """
+    SQL expression of a transaction's display group
+
+    - FULL matches (status=1): recon_reference_number
+    - PARTIAL matches (status=2): reference_number (RRN), prefixed to avoid collisions
+    - Fallback: the individual transaction
+
+    The prefixes are inlined (not bound) so the statement matches the
+    idx_txn_matched_group_key / idx_txn_partial_group_key expression indexes.
+    """
+    own_key = literal_column("'txn_'", String) + cast(Transaction.id, String)
+    if status_lower == "matched":
+        return func.coalesce(Transaction.recon_reference_number, own_key)
+    return func.coalesce(literal_column("'partial_'", String) + Transaction.reference_number, own_key)
+
+
+def _match_status_condition(status_lower: str):
+    """
+    WHERE condition of a match_status filter (None for an unknown status)
+
+    The status is inlined (not bound) so that generic plans of the statement
+    can still use the partial indexes on match_status.
+    """
+    if status_lower == "matched":
+        return Transaction.match_status == literal_column("1")
+    if status_lower == "partial":
+        return Transaction.match_status == literal_column("2")
+    if status_lower == "unmatched":
+        return or_(
+            Transaction.match_status == literal_column("0"),
+            Transaction.match_status.is_(None)
+        )
+    return None
+
+
+def _group_keys_query(
+    status_lower: str,
+    conditions: list,
+    descending: bool,
+    after_key: Optional[str],
+    offset: int,
+    limit: int
+):
+    """
+    One page of display group keys of the matched / partial listing
+
+    Pages by keyset after after_key (cursor pages), else by offset.
+    """
+    group_key = _group_key_expression(status_lower)
+    keys_query = select(group_key).group_by(group_key)
+    if conditions:
+        keys_query = keys_query.where(and_(*conditions))
+    if after_key is not None:
+        keys_query = keys_query.where(group_key < after_key if descending else group_key > after_key)
+    else:
+        keys_query = keys_query.offset(offset)
+    keys_query = keys_query.order_by(group_key.desc() if descending else group_key.asc())
+    return keys_query.limit(limit)
+
+
+# match_status filter -> rollup bucket status (NULL is bucketed as 0)
+ROLLUP_STATUS = {"matched": 1, "partial": 2, "unmatched": 0}
+
+
+def _encode_cursor(last_key: str, status_lower: str, descending: bool) -> str:
+    """Opaque keyset cursor: the last group key of the page"""
+    payload = json.dumps({"k": last_key, "s": status_lower, "d": descending}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, status_lower: str, descending: bool) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_key = payload["k"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if payload.get("s") != status_lower or payload.get("d") != descending:
+        raise ValueError("Cursor does not belong to this match_status / sort_order")
+    return last_key
+
+
 @router.get("/transactions")
 async def get_transactions(
     channel_id: Optional[int] = Query(None, description="Filter by channel ID"),
@@ -25,6 +114,8 @@ async def get_transactions(
     page_size: int = Query(30, ge=1, le=500, description="Records per page"),
     sort_by: str = Query("created_at", description="Sort field"),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (matched/partial only)"),
+    include_totals: bool = Query(True, description="Return total_records / total_pages and the status summary (false skips the counts)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -34,6 +125,18 @@ async def get_transactions(
     - matched: Full match (match_status = 1)
     - partial: Partial match (match_status = 2)
     - unmatched: No match (match_status = 0 or NULL)
+
+    Matched/partial results are paginated by group in the database: groups are
+    ordered by their group key (recon_reference_number for full matches) in
+    sort_order, and each page carries a `next_cursor` to pass back as `cursor`.
+    Without a cursor `page` is still honoured (OFFSET over group keys).
+
+    Totals (total_records, total_pages and the match status summary) count
+    every row matching the filters. They are returned by default but skipped
+    on matched/partial cursor pages and with include_totals=false; they are
+    then null and has_next comes from the page query. The summary is read
+    from the rollup buckets when RECON_ROLLUP is on and no date filter is
+    given.
     """
     try:
         # Build the base query
@@ -66,58 +169,93 @@ async def get_transactions(
         
         # Filter by match status
         if match_status:
-            status_lower = match_status.lower()
-            if status_lower == "matched":
-                conditions.append(Transaction.match_status == 1)
-            elif status_lower == "partial":
-                conditions.append(Transaction.match_status == 2)
-            elif status_lower == "unmatched":
-                conditions.append(
-                    or_(
-                        Transaction.match_status == 0,
-                        Transaction.match_status.is_(None)
-                    )
-                )
+            status_condition = _match_status_condition(match_status.lower())
+            if status_condition is not None:
+                conditions.append(status_condition)
         
         # Filter by date range
-        if date_from:
-            conditions.append(Transaction.date >= date_from)
-        if date_to:
-            conditions.append(Transaction.date <= date_to)
+        if settings.TXN_TYPED_COLUMNS:
+            conditions.extend(txn_ts_conditions(Transaction.txn_ts, date_from, date_to))
+        else:
+            if date_from:
+                conditions.append(Transaction.date >= date_from)
+            if date_to:
+                conditions.append(Transaction.date <= date_to)
         
         # Apply conditions
         if conditions:
             query = query.where(and_(*conditions))
         
-        # Apply sorting
-        if sort_order.lower() == "desc":
-            query = query.order_by(getattr(Transaction, sort_by).desc())
-        else:
-            query = query.order_by(getattr(Transaction, sort_by).asc())
+        grouped_listing = bool(match_status) and match_status.lower() in ["matched", "partial"]
+        descending = sort_order.lower() == "desc"
+        next_cursor = None
+        # Cursor pages of matched/partial groups skip the totals
+        with_totals = include_totals and not (grouped_listing and cursor)
         
-        # For matched/partial status: Fetch ALL matching records (no pagination yet)
-        # We'll group them first, then paginate the groups to avoid splitting matched sets
-        if match_status and match_status.lower() in ["matched", "partial"]:
-            # Fetch all matching transactions without pagination
-            result = await db.execute(query)
-            rows = result.all()
+        # For matched/partial status: paginate GROUPS in SQL, never split a matched set
+        if grouped_listing:
+            status_lower = match_status.lower()
+            group_key = _group_key_expression(status_lower)
+            
+            # One page of group keys (+1 to know whether another page follows)
+            after_key = _decode_cursor(cursor, status_lower, descending) if cursor else None
+            keys_query = _group_keys_query(
+                status_lower, conditions, descending, after_key,
+                offset=(page - 1) * page_size, limit=page_size + 1
+            )
+            keys_result = await db.execute(keys_query)
+            page_keys = [row[0] for row in keys_result.all()]
+            
+            if len(page_keys) > page_size:
+                page_keys = page_keys[:page_size]
+                next_cursor = _encode_cursor(page_keys[-1], status_lower, descending)
+            
+            # Group count (skipped on cursor pages)
+            total_records = None
+            if with_totals:
+                count_query = select(func.count(func.distinct(group_key))).select_from(Transaction)
+                if conditions:
+                    count_query = count_query.where(and_(*conditions))
+                total_result = await db.execute(count_query)
+                total_records = total_result.scalar() or 0
+            
+            # All transactions of the page's groups in one IN query
+            rows = []
+            if page_keys:
+                query = query.add_columns(group_key.label('group_key')).where(group_key.in_(page_keys))
+                if descending:
+                    query = query.order_by(getattr(Transaction, sort_by).desc())
+                else:
+                    query = query.order_by(getattr(Transaction, sort_by).asc())
+                result = await db.execute(query)
+                rows = result.all()
         else:
+            # Apply sorting
+            if descending:
+                query = query.order_by(getattr(Transaction, sort_by).desc())
+            else:
+                query = query.order_by(getattr(Transaction, sort_by).asc())
+            
             # For unmatched: Use normal pagination on individual transactions
             # Get total count for pagination
-            count_query = select(func.count()).select_from(Transaction)
-            if conditions:
-                count_query = count_query.where(and_(*conditions))
-            
-            total_result = await db.execute(count_query)
-            total_records = total_result.scalar()
+            total_records = None
+            if with_totals:
+                count_query = select(func.count()).select_from(Transaction)
+                if conditions:
+                    count_query = count_query.where(and_(*conditions))
+                
+                total_result = await db.execute(count_query)
+                total_records = total_result.scalar()
             
-            # Apply pagination
+            # Apply pagination (+1 row to know whether another page follows)
             offset = (page - 1) * page_size
-            query = query.limit(page_size).offset(offset)
-            
+            query = query.limit(page_size + 1).offset(offset)
+
             # Execute query
             result = await db.execute(query)
             rows = result.all()
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
         
         # Helper function to create transaction dict
         def create_transaction_dict(txn, channel_name, source_name, match_rule_name):
@@ -143,7 +281,7 @@ async def get_transactions(
                 "account_number": txn.account_number,
                 "currency": txn.ccy,
                 "match_status": txn.match_status,
-                "other_details": txn.otherDetails,
+                "other_details": other_details_text(txn.otherDetails),
                 "match_status_label": match_status_label,
                 "match_rule_id": txn.match_rule_id,
                 "match_rule_name": match_rule_name,
@@ -159,30 +297,17 @@ async def get_transactions(
         transactions = []
         
         # Group transactions by recon_reference_number for matched/partial
-        if match_status and match_status.lower() in ["matched", "partial"]:
-            # Group by recon_reference_number (this groups all matched sources together)
-            grouped = {}
+        if grouped_listing:
+            # Buckets in page key order (the group key is computed in SQL)
+            grouped = {key: None for key in page_keys}
             for row in rows:
                 txn = row[0]
                 channel_name = row[1]
                 source_name = row[2]
                 match_rule_name = row[3]
+                group_key = row[4]
                 
-                # Grouping logic:
-                # - For FULL matches (status=1): Group by recon_reference_number
-                # - For PARTIAL matches (status=2): Group by reference_number (RRN)
-                # This ensures all sources with the same RRN are grouped together
-                if txn.match_status == 1 and txn.recon_reference_number:
-                    # Full match: Use recon_reference_number
-                    group_key = txn.recon_reference_number
-                elif txn.match_status == 2 and txn.reference_number:
-                    # Partial match: Use reference_number (RRN) with a prefix to avoid collisions
-                    group_key = f"partial_{txn.reference_number}"
-                else:
-                    # Fallback: Individual transaction
-                    group_key = f"txn_{txn.id}"
-                
-                if group_key not in grouped:
+                if grouped.get(group_key) is None:
                     grouped[group_key] = {
                         "atm_transactions": [],
                         "switch_transactions": [],
@@ -218,6 +343,8 @@ async def get_transactions(
             # Convert grouped data to list (all groups)
             all_groups = []
             for group_key, group_data in grouped.items():
+                if group_data is None:
+                    continue
                 # Only include source arrays that have data
                 transaction_group = {}
                 
@@ -240,11 +367,7 @@ async def get_transactions(
                 
                 all_groups.append(transaction_group)
             
-            # NOW paginate the groups (not individual transactions)
-            total_records = len(all_groups)  # Total number of matched groups
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            transactions = all_groups[start_idx:end_idx]  # Slice the groups
+            transactions = all_groups
         
         else:
             # For unmatched transactions, return all sources separately
@@ -257,22 +380,39 @@ async def get_transactions(
                 transactions.append(create_transaction_dict(txn, channel_name, source_name, match_rule_name))
         
         # Calculate pagination metadata
-        total_pages = (total_records + page_size - 1) // page_size
-        has_next = page < total_pages
-        has_previous = page > 1
-        
-        # Get summary counts
-        summary_query = select(
-            func.count(case((Transaction.match_status == 1, 1))).label('total_matched'),
-            func.count(case((Transaction.match_status == 2, 1))).label('total_partial'),
-            func.count(case((or_(Transaction.match_status == 0, Transaction.match_status.is_(None)), 1))).label('total_unmatched'),
-        )
-        if conditions:
-            summary_query = summary_query.where(and_(*conditions))
-        
-        summary_result = await db.execute(summary_query)
-        summary = summary_result.one()
-        
+        if grouped_listing:
+            total_pages = (total_records + page_size - 1) // page_size if total_records is not None else None
+            has_next = next_cursor is not None
+            has_previous = bool(cursor) or page > 1
+        else:
+            total_pages = (total_records + page_size - 1) // page_size if total_records is not None else None
+            has_next = has_more
+            has_previous = page > 1
+
+        # Get summary counts (skipped on cursor pages)
+        summary = None
+        if with_totals:
+            if settings.RECON_ROLLUP and not date_from and not date_to:
+                summary = await _listing_summary_from_rollup(
+                    db, channel_id, network_id, source_id, match_status
+                )
+            else:
+                summary_query = select(
+                    func.count(case((Transaction.match_status == 1, 1))).label('total_matched'),
+                    func.count(case((Transaction.match_status == 2, 1))).label('total_partial'),
+                    func.count(case((or_(Transaction.match_status == 0, Transaction.match_status.is_(None)), 1))).label('total_unmatched'),
+                )
+                if conditions:
+                    summary_query = summary_query.where(and_(*conditions))
+
+                summary_result = await db.execute(summary_query)
+                counts = summary_result.one()
+                summary = {
+                    "total_matched": counts.total_matched or 0,
+                    "total_partial": counts.total_partial or 0,
+                    "total_unmatched": counts.total_unmatched or 0
+                }
+
         return {
             "status": "success",
             "error": False,
@@ -285,13 +425,10 @@ async def get_transactions(
                     "total_records": total_records,
                     "total_pages": total_pages,
                     "has_next": has_next,
-                    "has_previous": has_previous
+                    "has_previous": has_previous,
+                    "next_cursor": next_cursor
                 },
-                "summary": {
-                    "total_matched": summary.total_matched or 0,
-                    "total_partial": summary.total_partial or 0,
-                    "total_unmatched": summary.total_unmatched or 0
-                }
+                "summary": summary
             }
         }
         
@@ -304,6 +441,87 @@ async def get_transactions(
         }
 
 
+async def _listing_summary_from_rollup(
+    db: AsyncSession,
+    channel_id: Optional[int],
+    network_id: Optional[int],
+    source_id: Optional[int],
+    match_status: Optional[str]
+):
+    """
+    Match status counts for the /transactions filters from the rollup
+    buckets (channel / network / source / status filters, no date range)
+    """
+    conditions = []
+    if channel_id is not None:
+        conditions.append(ReconRollup.channel_id == channel_id)
+    if network_id is not None:
+        conditions.append(ReconRollup.network_id == network_id)
+    if source_id is not None:
+        conditions.append(ReconRollup.source_id == source_id)
+    status_lower = match_status.lower() if match_status else None
+    if status_lower in ROLLUP_STATUS:
+        conditions.append(ReconRollup.match_status == ROLLUP_STATUS[status_lower])
+
+    query = select(
+        ReconRollup.match_status,
+        cast(func.sum(ReconRollup.txn_count), BigInteger).label('txn_count')
+    ).group_by(ReconRollup.match_status)
+    if conditions:
+        query = query.where(and_(*conditions))
+
+    result = await db.execute(query)
+    counts = {row.match_status: row.txn_count or 0 for row in result.all()}
+    return {
+        "total_matched": counts.get(1, 0),
+        "total_partial": counts.get(2, 0),
+        "total_unmatched": counts.get(0, 0)
+    }
+
+
+async def _summary_from_transactions(
+    db: AsyncSession,
+    date_from: Optional[str],
+    date_to: Optional[str]
+):
+    """Per-channel summary rows aggregated directly from tbl_txn_transactions"""
+    conditions = []
+    if settings.TXN_TYPED_COLUMNS:
+        conditions.extend(txn_ts_conditions(Transaction.txn_ts, date_from, date_to))
+        amount = Transaction.amount_numeric
+    else:
+        if date_from:
+            conditions.append(Transaction.date >= date_from)
+        if date_to:
+            conditions.append(Transaction.date <= date_to)
+        amount = func.cast(Transaction.amount, Numeric)
+    
+    query = select(
+        ChannelConfig.id.label('channel_id'),
+        ChannelConfig.channel_name,
+        func.count(case((Transaction.match_status == 1, 1))).label('matched_count'),
+        func.count(case((Transaction.match_status == 2, 1))).label('partial_count'),
+        func.count(case((or_(Transaction.match_status == 0, Transaction.match_status.is_(None)), 1))).label('unmatched_count'),
+        func.sum(case((Transaction.match_status == 1, amount))).label('matched_amount'),
+        func.sum(case((Transaction.match_status == 2, amount))).label('partial_amount'),
+        func.sum(case((or_(Transaction.match_status == 0, Transaction.match_status.is_(None)), amount))).label('unmatched_amount'),
+        func.count(Transaction.id).label('total_count'),
+        func.sum(amount).label('total_amount')
+    ).outerjoin(
+        Transaction, ChannelConfig.id == Transaction.channel_id
+    ).group_by(
+        ChannelConfig.id, ChannelConfig.channel_name
+    ).order_by(
+        ChannelConfig.id
+    )
+    
+    if conditions:
+        query = query.where(and_(*conditions))
+    
+    result = await db.execute(query)
+    return result.all()
+
+
 @router.get("/summary")
 async def get_reconciliation_summary(
     date_from: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
@@ -312,40 +530,52 @@ async def get_reconciliation_summary(
 ):
     """
     Get reconciliation summary grouped by channel with match status counts.
+
+    Served from the tbl_txn_recon_rollup buckets when RECON_ROLLUP is on
+    (date_from / date_to then apply to whole business days).
     """
     try:
-        # Build date filter conditions
-        conditions = []
-        if date_from:
-            conditions.append(Transaction.date >= date_from)
-        if date_to:
-            conditions.append(Transaction.date <= date_to)
-        
-        # Query for channel summary
-        query = select(
-            ChannelConfig.id.label('channel_id'),
-            ChannelConfig.channel_name,
-            func.count(case((Transaction.match_status == 1, 1))).label('matched_count'),
-            func.count(case((Transaction.match_status == 2, 1))).label('partial_count'),
-            func.count(case((or_(Transaction.match_status == 0, Transaction.match_status.is_(None)), 1))).label('unmatched_count'),
-            func.sum(case((Transaction.match_status == 1, func.cast(Transaction.amount, Numeric)))).label('matched_amount'),
-            func.sum(case((Transaction.match_status == 2, func.cast(Transaction.amount, Numeric)))).label('partial_amount'),
-            func.sum(case((or_(Transaction.match_status == 0, Transaction.match_status.is_(None)), func.cast(Transaction.amount, Numeric)))).label('unmatched_amount'),
-            func.count(Transaction.id).label('total_count'),
-            func.sum(func.cast(Transaction.amount, Numeric)).label('total_amount')
-        ).outerjoin(
-            Transaction, ChannelConfig.id == Transaction.channel_id
-        ).group_by(
-            ChannelConfig.id, ChannelConfig.channel_name
-        ).order_by(
-            ChannelConfig.id
-        )
-        
-        if conditions:
-            query = query.where(and_(*conditions))
-        
-        result = await db.execute(query)
-        rows = result.all()
+        if settings.RECON_ROLLUP:
+            # '' is the bucket of transactions without a date
+            conditions = []
+            if date_from:
+                conditions.append(ReconRollup.business_date >= date_from[:10])
+            if date_to:
+                conditions.append(ReconRollup.business_date <= date_to[:10])
+                conditions.append(ReconRollup.business_date != "")
+
+            # SUM(bigint) is numeric in Postgres; counts go back to integers
+            def status_sum(column, status):
+                return func.sum(case((ReconRollup.match_status == status, column)))
+
+            def status_count(status):
+                return cast(status_sum(ReconRollup.txn_count, status), BigInteger)
+
+            query = select(
+                ChannelConfig.id.label('channel_id'),
+                ChannelConfig.channel_name,
+                status_count(1).label('matched_count'),
+                status_count(2).label('partial_count'),
+                status_count(0).label('unmatched_count'),
+                status_sum(ReconRollup.amount_total, 1).label('matched_amount'),
+                status_sum(ReconRollup.amount_total, 2).label('partial_amount'),
+                status_sum(ReconRollup.amount_total, 0).label('unmatched_amount'),
+                cast(func.sum(ReconRollup.txn_count), BigInteger).label('total_count'),
+                func.sum(ReconRollup.amount_total).label('total_amount')
+            ).outerjoin(
+                ReconRollup, ChannelConfig.id == ReconRollup.channel_id
+            ).group_by(
+                ChannelConfig.id, ChannelConfig.channel_name
+            ).order_by(
+                ChannelConfig.id
+            )
+            if conditions:
+                query = query.where(and_(*conditions))
+
+            result = await db.execute(query)
+            rows = result.all()
+        else:
+            rows = await _summary_from_transactions(db, date_from, date_to)
         
         # Transform results
         channels = []
@@ -492,14 +722,26 @@ async def get_transaction_counts(
         )
         
         # Count UNMATCHED transactions (match_status = 0 or NULL)
-        unmatched_query = select(
-            func.count(Transaction.id).label('unmatched_count')
-        ).where(
-            and_(
-                Transaction.channel_id == channel_id,
-                or_(Transaction.match_status == 0, Transaction.match_status == None)
+        if settings.RECON_ROLLUP:
+            # Additive, so it comes straight from the rollup buckets
+            # (the group counts above are distinct counts and are not)
+            unmatched_query = select(
+                cast(func.sum(ReconRollup.txn_count), BigInteger).label('unmatched_count')
+            ).where(
+                and_(
+                    ReconRollup.channel_id == channel_id,
+                    ReconRollup.match_status == 0
+                )
+            )
+        else:
+            unmatched_query = select(
+                func.count(Transaction.id).label('unmatched_count')
+            ).where(
+                and_(
+                    Transaction.channel_id == channel_id,
+                    or_(Transaction.match_status == 0, Transaction.match_status == None)
+                )
             )
-        )
         
         # Execute all queries
         full_result = await db.execute(full_match_query)
@@ -591,7 +833,7 @@ async def get_transaction_details(
             "date": txn.date,
             "account_number": txn.account_number,
             "currency": txn.ccy,
-            "other_details": txn.otherDetails,
+            "other_details": other_details_text(txn.otherDetails),
             "match_status": txn.match_status,
             "match_status_label": match_status_label,
             "match_rule_id": txn.match_rule_id,
@@ -39,6 +39,36 @@ def worker_process_init(**kwargs):
     print("🔧 Worker process initialized")
 
 
+@signals.celeryd_after_setup.connect
+def check_partition_queue(sender, instance, **kwargs):
+    """
+    Refuse to start a worker that serves the matching partition queue next
+    to other queues
+
+    A partitioned matching run blocks its worker slot until all of its
+    match_rule_partition tasks finished. If the same pool also consumed the
+    partition queue, those tasks could wait for the slots the runs hold and
+    never be scheduled.
+    """
+    if settings.MATCHING_PARTITIONS <= 1:
+        return
+
+    queues = instance.app.amqp.queues
+    consumed = set(queues.consume_from or queues)
+    partition_queue = settings.MATCHING_PARTITION_QUEUE
+    shared = (
+        partition_queue == instance.app.conf.task_default_queue
+        or (partition_queue in consumed and consumed != {partition_queue})
+    )
+    if shared:
+        print(
+            f"❌ Worker {sender} consumes {sorted(consumed)}: the matching partition "
+            f"queue '{partition_queue}' needs dedicated workers "
+            f"(celery -A app.celery_app worker --queues={partition_queue})"
+        )
+        raise SystemExit(1)
+
+
 @signals.worker_process_shutdown.connect
 def worker_process_shutdown(**kwargs):
     """Called when a worker process shuts down - cleanup database connections"""
@@ -54,6 +54,81 @@ class Settings(BaseSettings):
     # - 5000: For max_stack_depth=4096kB (2.5x faster)
     # - 8000: For max_stack_depth=6144kB (4x faster, requires tuning)
 
+    # How saveFileDetails writes new transactions
+    # - "copy": one COPY stream per batch (asyncpg copy_records_to_table)
+    # - "orm": Transaction objects through the session (per-row INSERTs)
+    UPLOAD_INSERT_MODE: str = "copy"
+
+    # Network mapping cache: each process keeps the mapping in memory and,
+    # with REDIS_URL set, checks the shared snapshot version this often
+    # (clearNetworkCache() bumps it, so edits reach every API / Celery process
+    # within this many seconds)
+    NETWORK_CACHE_CHECK_SECONDS: int = 5
+
+    # Claim-check staging of upload batches: directory shared by the API and
+    # the Celery workers (local disk, NFS or a mounted MinIO bucket). When set,
+    # batches are written there and tasks only get a reference; when unset,
+    # the rows travel through the broker
+    UPLOAD_STAGING_DIR: Optional[str] = None
+
+    # Matching engine used by ApplicationMatcher._find_matching_groups
+    # - "columnar": vectorized hash join over the composite key (default)
+    # - "rowwise": original per-tuple eval loop
+    MATCHING_ENGINE: str = "columnar"
+    # Keys whose candidate product exceeds this are evaluated row-wise (early exit)
+    MATCHING_MAX_CANDIDATES_PER_KEY: int = 10000
+    # How matchers read unmatched transactions
+    # - "stream": server-side cursor into compact per-source columns (default)
+    # - "eager": fetchall() into one dict per row
+    MATCHING_FETCH_MODE: str = "stream"
+    # Rows per server-side cursor fetch in "stream" mode
+    MATCHING_FETCH_BATCH_SIZE: int = 10000
+    # Matched transactions per set-based UPDATE when writing results back
+    MATCHING_WRITEBACK_CHUNK_SIZE: int = 50000
+    # Commit after every write-back chunk (shorter transactions, but a failed
+    # run leaves the chunks already written in place)
+    MATCHING_WRITEBACK_COMMIT_PER_CHUNK: bool = False
+    # Auto-matching after uploads only probes rows ingested since the rule's
+    # last run (tbl_txn_matching_watermark); edited rules get a full run
+    MATCHING_INCREMENTAL: bool = True
+    # Re-probe window before the watermark, must cover the longest upload
+    # batch transaction (created_at is set before the batch commits)
+    MATCHING_INCREMENTAL_OVERLAP_SECONDS: int = 1800
+    # Maintain tbl_txn_unmatched_key (rule key -> unmatched transactions) so
+    # incremental runs read older rows by key lookup
+    MATCHING_KEY_INDEX: bool = True
+    # Auto-matching runs rules with disjoint sources as parallel Celery tasks
+    MATCHING_PARALLEL_RULES: bool = True
+    # Split one large run into key hash partitions matched by
+    # match_rule_partition tasks (1 = off, e.g. 16 on 16-core workers)
+    MATCHING_PARTITIONS: int = 1
+    # Claimed rows below which a run is matched in-process
+    MATCHING_PARTITION_MIN_ROWS: int = 200000
+    # Queue of the partition tasks; needs its own workers, the run waits on them
+    # (workers consuming it next to other queues refuse to start)
+    MATCHING_PARTITION_QUEUE: str = "matching-partitions"
+
+    # Maintain tbl_txn_recon_rollup on upload / matching / manual patches and
+    # serve /reconciliations/summary and /transactions/count from it. The
+    # table starts empty: enable it in a window without uploads or matching,
+    # by running scripts/rebuild_recon_rollup.py and then deploying with
+    # RECON_ROLLUP=true (rebuild again if writes happened in between)
+    RECON_ROLLUP: bool = False
+
+    # Filter / aggregate on the typed amount_numeric / txn_ts columns instead of
+    # the amount / date strings (enable once scripts/backfill_typed_columns.py
+    # has filled the existing rows)
+    TXN_TYPED_COLUMNS: bool = False
+
+    # Look up complete RRNs (12 digits) in smart search with = instead of
+    # ILIKE '%value%' (account numbers and the explicit search fields stay
+    # substring matches)
+    SEARCH_EXACT_FAST_PATHS: bool = True
+
+    # Run the transaction search summary counts on a second pooled connection,
+    # concurrently with the page queries
+    SEARCH_CONCURRENT_SUMMARY: bool = False
+
     @field_validator("S3_ENDPOINT", mode="before")
     def _s3_endpoint_empty_to_none(cls, v):
         # allow empty string in .env to mean unset
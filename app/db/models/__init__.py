@@ -12,6 +12,9 @@ from .upload_scheduler_config import UploadSchedulerConfig
 from .matching_rule_config import MatchingRuleConfig
 from .system_batch_config import SystemBatchConfig
 from .network import Network
+from .matching_watermark import MatchingWatermark
+from .unmatched_key import UnmatchedKey
+from .recon_rollup import ReconRollup
 
 __all__ = [
     "ModuleConfig",
@@ -27,5 +30,8 @@ __all__ = [
     "UploadSchedulerConfig",
     "MatchingRuleConfig",
     "SystemBatchConfig",
-    "Network"
+    "Network",
+    "MatchingWatermark",
+    "UnmatchedKey",
+    "ReconRollup"
 ]
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, ForeignKey, String, TIMESTAMP, func
+from app.db.base import Base
+
+
+class MatchingWatermark(Base):
+    """Per-rule high-water mark of ingested transactions already probed by matching"""
+    __tablename__ = "tbl_txn_matching_watermark"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    rule_id = Column(BigInteger, ForeignKey("tbl_cfg_matching_rule.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    channel_id = Column(BigInteger, ForeignKey("tbl_cfg_channels.id"), nullable=True)
+    last_created_at = Column(TIMESTAMP, nullable=True)  # max created_at seen by the last run
+    rule_updated_at = Column(TIMESTAMP, nullable=True)  # rule version the watermark belongs to
+    last_run_at = Column(TIMESTAMP, nullable=True)  # DB NOW() of the last run (its matches carry it as updated_at)
+    key_index = Column(String(255), nullable=True)  # key columns tbl_txn_unmatched_key is maintained for (NULL = not built)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=True)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=True)
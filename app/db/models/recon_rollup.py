@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Numeric, TIMESTAMP, UniqueConstraint
+from app.db.base import Base
+
+
+class ReconRollup(Base):
+    """Transaction counts and amounts per (channel, source, network, business date, match_status)"""
+    __tablename__ = "tbl_txn_recon_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "channel_id", "source_id", "network_id", "business_date", "match_status",
+            name="uq_recon_rollup_bucket"
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    channel_id = Column(BigInteger, nullable=False, default=0)  # 0 = no channel
+    source_id = Column(BigInteger, nullable=False, default=0)  # 0 = no source
+    network_id = Column(BigInteger, nullable=False, default=0)  # 0 = no network
+    business_date = Column(String(10), nullable=False, default="")  # YYYY-MM-DD prefix of date, '' = no date
+    match_status = Column(Integer, nullable=False, default=0)  # 0 = unmatched (NULL or 0), 1 = full, 2 = partial
+    txn_count = Column(BigInteger, nullable=False, default=0)
+    amount_total = Column(Numeric, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, nullable=True)
@@ -7,13 +7,70 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     TIMESTAMP,
+    Numeric,
+    Index,
     func,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from app.db.base import Base
 
 
 class Transaction(Base):
     __tablename__ = "tbl_txn_transactions"
+    __table_args__ = (
+        Index("idx_txn_channel_txn_ts", "channel_id", "txn_ts"),
+        Index("idx_txn_txn_ts", "txn_ts"),
+        Index("idx_txn_amount_numeric", "amount_numeric"),
+        # Matching / search hot paths (alembic e2a8c5f19d36)
+        Index(
+            "idx_txn_unmatched_channel_source", "channel_id", "source_id",
+            postgresql_where=text("match_status IS NULL OR match_status = 0"),
+        ),
+        Index("idx_txn_dedup_key", "channel_id", "source_id", "amount", "date", "ccy"),
+        Index(
+            "idx_txn_recon_reference_number", "recon_reference_number",
+            postgresql_where=text("recon_reference_number IS NOT NULL"),
+        ),
+        Index(
+            "idx_txn_matched_group_key",
+            text("COALESCE(recon_reference_number, 'txn_' || CAST(id AS VARCHAR))"),
+            postgresql_where=text("match_status = 1"),
+        ),
+        Index(
+            "idx_txn_partial_group_key",
+            text("COALESCE('partial_' || reference_number, 'txn_' || CAST(id AS VARCHAR))"),
+            postgresql_where=text("match_status = 2"),
+        ),
+        # Matching run snapshot / recon run reports (alembic 5dc1fe6174e1)
+        Index("idx_txn_recon_group_number", "recon_group_number"),
+        # Transaction search (alembic f4b1d8e07a52, needs pg_trgm)
+        Index(
+            "idx_txn_reference_number_trgm", "reference_number",
+            postgresql_using="gin", postgresql_ops={"reference_number": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_txn_account_number_trgm", "account_number",
+            postgresql_using="gin", postgresql_ops={"account_number": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_txn_txn_id_trgm", "txn_id",
+            postgresql_using="gin", postgresql_ops={"txn_id": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_txn_reference_number", "reference_number",
+            postgresql_where=text("reference_number IS NOT NULL"),
+        ),
+        Index(
+            "idx_txn_account_number", "account_number",
+            postgresql_where=text("account_number IS NOT NULL"),
+        ),
+        # Raw row containment filters (alembic a9c3e6f25b18)
+        Index(
+            "idx_txn_other_details_gin", "otherDetails",
+            postgresql_using="gin", postgresql_ops={"otherDetails": "jsonb_path_ops"},
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True)
     txn_id = Column(String(50), index=True)
@@ -24,11 +81,13 @@ class Transaction(Base):
     source_reference_number = Column(String(255), nullable=True)
     amount = Column(String(50), nullable=True)
     date = Column(String(50), nullable=True)
+    amount_numeric = Column(Numeric(20, 4), nullable=True)  # typed shadow of amount
+    txn_ts = Column(TIMESTAMP(timezone=True), nullable=True)  # typed shadow of date
     account_number = Column(String(50), nullable=True)
     ccy = Column(String(10), nullable=True)
     otherDetails = Column(
-        "otherDetails", Text, nullable=True
-    )  # Explicitly quoted to match DB column case
+        "otherDetails", JSONB, nullable=True
+    )  # Explicitly quoted to match DB column case; raw file row
     recon_group_number = Column(String(255), nullable=True)
     file_transactions_id = Column(
         BigInteger, ForeignKey("tbl_upload_files.id"), nullable=True
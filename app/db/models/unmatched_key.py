@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, ForeignKey, Text, TIMESTAMP, Index, UniqueConstraint
+from app.db.base import Base
+
+
+class UnmatchedKey(Base):
+    """Outstanding unmatched transactions per matching rule, keyed by the rule's equality key"""
+    __tablename__ = "tbl_txn_unmatched_key"
+    __table_args__ = (
+        UniqueConstraint("transaction_id", "rule_id", name="uq_unmatched_key_transaction_rule"),
+        Index("idx_unmatched_key_rule_key", "rule_id", "match_key"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    rule_id = Column(BigInteger, ForeignKey("tbl_cfg_matching_rule.id", ondelete="CASCADE"), nullable=False)
+    transaction_id = Column(BigInteger, ForeignKey("tbl_txn_transactions.id", ondelete="CASCADE"), nullable=False)
+    source_id = Column(BigInteger, nullable=True)
+    match_key = Column(Text, nullable=False)  # "column=value|column=value" over the rule's raw key columns
+    created_at = Column(TIMESTAMP, nullable=True)  # created_at of the transaction
@@ -0,0 +1,206 @@
+"""
+Reconciliation Rollup Repository
+Maintains tbl_txn_recon_rollup: transaction counts and summed amounts per
+(channel, source, network, business date, match_status) bucket.
+
+The dashboard summaries read this table instead of aggregating (and casting
+the string amount of) every row of tbl_txn_transactions. Writers keep it in
+step with deltas in their own database transaction:
+
+- upload: add_transactions() after the new rows are flushed
+- matching write-back: apply_status_change() before each chunk's UPDATE
+- manual patch / network re-mapping: remove_transactions() before the ORM
+  changes, add_transactions() after the flush
+- file deletion: remove_transactions() before the DELETE
+
+NULL keys are stored as 0 / '' so every bucket has a unique row to upsert,
+and NULL / 0 match_status are both bucketed as 0 (unmatched). Buckets are
+always upserted in key order, so concurrent writers lock them in the same
+order. rebuild() recomputes a channel (or everything) from scratch.
+"""
+
+from typing import Dict, Any, List, Optional
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+BUCKET_COLUMNS = "channel_id, source_id, network_id, business_date, match_status"
+
+BUCKET_KEY = """
+    COALESCE(t.channel_id, 0) AS channel_id,
+    COALESCE(t.source_id, 0) AS source_id,
+    COALESCE(t.network_id, 0) AS network_id,
+    COALESCE(LEFT(t.date, 10), '') AS business_date"""
+
+# amount_numeric where it is filled, else the amount string if it is a plain
+# number; other rows count towards txn_count but not towards amount_total
+AMOUNT_VALUE = (
+    "COALESCE(t.amount_numeric, CASE WHEN t.amount ~ '^\\s*-?[0-9]+(\\.[0-9]+)?\\s*$' "
+    "THEN CAST(TRIM(t.amount) AS numeric) END)"
+)
+
+UPSERT_DELTA = f"""
+    INSERT INTO tbl_txn_recon_rollup ({BUCKET_COLUMNS}, txn_count, amount_total, updated_at)
+    SELECT {BUCKET_COLUMNS}, SUM(n), COALESCE(SUM(amount), 0), NOW()
+    FROM delta
+    GROUP BY {BUCKET_COLUMNS}
+    ORDER BY {BUCKET_COLUMNS}
+    ON CONFLICT ({BUCKET_COLUMNS}) DO UPDATE SET
+        txn_count = tbl_txn_recon_rollup.txn_count + EXCLUDED.txn_count,
+        amount_total = tbl_txn_recon_rollup.amount_total + EXCLUDED.amount_total,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+class ReconRollupRepository:
+    """
+    Incremental maintenance and rebuild of the reconciliation rollup
+    """
+
+    @staticmethod
+    async def add_transactions(db: AsyncSession, transaction_ids: List[int]) -> int:
+        """
+        Count transactions into their current bucket (new or just patched rows)
+
+        Returns:
+            Number of transactions counted
+        """
+        return await ReconRollupRepository._apply_sign(db, transaction_ids, 1)
+
+    @staticmethod
+    async def remove_transactions(db: AsyncSession, transaction_ids: List[int]) -> int:
+        """
+        Take transactions out of their current bucket (rows about to be
+        deleted or patched)
+
+        Returns:
+            Number of transactions removed
+        """
+        return await ReconRollupRepository._apply_sign(db, transaction_ids, -1)
+
+    @staticmethod
+    async def _apply_sign(db: AsyncSession, transaction_ids: List[int], sign: int) -> int:
+        if not transaction_ids:
+            return 0
+
+        query = f"""
+            WITH delta AS (
+                SELECT {BUCKET_KEY},
+                    COALESCE(t.match_status, 0) AS match_status,
+                    CAST(:sign AS integer) AS n,
+                    CAST(:sign AS integer) * {AMOUNT_VALUE} AS amount
+                FROM tbl_txn_transactions t
+                WHERE t.id = ANY(CAST(:ids AS bigint[]))
+            )
+            {UPSERT_DELTA}
+        """
+        await db.execute(text(query), {"ids": list(transaction_ids), "sign": sign})
+        return len(transaction_ids)
+
+    @staticmethod
+    async def apply_status_change(
+        db: AsyncSession,
+        transaction_ids: List[int],
+        match_statuses: List[Optional[int]]
+    ) -> None:
+        """
+        Move transactions to the bucket of their new match_status
+
+        Must run before the UPDATE that writes the statuses, in the same
+        database transaction. The rows are locked here so nothing changes
+        them between the delta and the UPDATE.
+
+        Args:
+            transaction_ids: Transactions being updated
+            match_statuses: New match_status per transaction (parallel to ids)
+        """
+        if not transaction_ids:
+            return
+
+        query = f"""
+            WITH moved AS (
+                SELECT {BUCKET_KEY},
+                    COALESCE(t.match_status, 0) AS old_status,
+                    COALESCE(v.match_status, 0) AS new_status,
+                    {AMOUNT_VALUE} AS amount
+                FROM tbl_txn_transactions t
+                JOIN unnest(CAST(:ids AS bigint[]), CAST(:statuses AS integer[]))
+                    AS v(id, match_status) ON t.id = v.id
+                WHERE COALESCE(t.match_status, 0) <> COALESCE(v.match_status, 0)
+                FOR UPDATE OF t
+            ),
+            delta AS (
+                SELECT channel_id, source_id, network_id, business_date,
+                    old_status AS match_status, -1 AS n, -amount AS amount
+                FROM moved
+                UNION ALL
+                SELECT channel_id, source_id, network_id, business_date,
+                    new_status AS match_status, 1 AS n, amount
+                FROM moved
+            )
+            {UPSERT_DELTA}
+        """
+        await db.execute(
+            text(query),
+            {"ids": list(transaction_ids), "statuses": list(match_statuses)}
+        )
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, channel_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Recompute the rollup of one channel (or all channels) from
+        tbl_txn_transactions. Used for the initial backfill and to repair
+        drift from writers that bypass the repository.
+
+        Args:
+            channel_id: Channel to rebuild (None = everything)
+
+        Returns:
+            {"error": bool, "buckets": int, "transactions": int}
+        """
+        try:
+            params: Dict[str, Any] = {}
+            delete_query = "DELETE FROM tbl_txn_recon_rollup"
+            channel_filter = ""
+            if channel_id is not None:
+                delete_query += " WHERE channel_id = :channel_id"
+                channel_filter = (
+                    "WHERE t.channel_id = :channel_id" if channel_id
+                    else "WHERE (t.channel_id IS NULL OR t.channel_id = 0)"
+                )
+                params["channel_id"] = channel_id
+
+            await db.execute(text(delete_query), params)
+            result = await db.execute(
+                text(f"""
+                    INSERT INTO tbl_txn_recon_rollup ({BUCKET_COLUMNS}, txn_count, amount_total, updated_at)
+                    SELECT {BUCKET_COLUMNS}, COUNT(*), COALESCE(SUM(amount), 0), NOW()
+                    FROM (
+                        SELECT {BUCKET_KEY},
+                            COALESCE(t.match_status, 0) AS match_status,
+                            {AMOUNT_VALUE} AS amount
+                        FROM tbl_txn_transactions t
+                        {channel_filter}
+                    ) rows
+                    GROUP BY {BUCKET_COLUMNS}
+                    RETURNING txn_count
+                """),
+                params
+            )
+            counts = [row[0] for row in result.fetchall()]
+            await db.commit()
+
+            logger.info(
+                f"📊 Recon rollup rebuilt for channel {channel_id if channel_id is not None else 'ALL'}: "
+                f"{len(counts):,} buckets, {sum(counts):,} transactions"
+            )
+            return {"error": False, "buckets": len(counts), "transactions": sum(counts)}
+
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Recon rollup rebuild failed: {e}")
+            return {"error": True, "message": str(e)}
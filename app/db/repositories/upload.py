@@ -3705,10 +3705,11 @@
 #             }
 
 import json
-from typing import Any, Dict, List
-from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
 
-from sqlalchemy import Integer, cast, delete, func, select, tuple_, update
+from sqlalchemy import Integer, cast, delete, func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.channel_config import ChannelConfig
@@ -3718,16 +3719,25 @@ from app.db.models.transactions import Transaction
 from app.db.models.upload_file import UploadFile
 from app.config import settings
 from app.db.models.user_config import UserConfig
+from app.new_engine.unmatched_key_index import UnmatchedKeyIndex
+from app.db.repositories.recon_rollup_repository import ReconRollupRepository
+from app.utils.typed_columns import parse_amount, parse_txn_ts
+from app.utils.network_cache import network_mapping_cache
+from app.utils.network_resolver import NetworkResolver, detect_card_type
+from app.utils.other_details import dumps_other_details
+from app.utils.upload_batch import (
+    CARD_NUMBER_FIELDS,
+    SERVICE_FIELDS,
+    map_unique,
+    network_inputs,
+    prepare_batch,
+    repeated_keys,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Global cache for network mapping (optional optimization)
-_network_map_cache = None
-_network_map_timestamp = None
-CACHE_TTL = timedelta(hours=1)
-
 
 class UploadRepository:
 
@@ -3735,108 +3745,16 @@ class UploadRepository:
     async def _build_network_mapping(db: AsyncSession) -> Dict[str, Any]:
         """
         Pre-load all networks into memory for O(1) lookup.
-        Uses 1-hour cache to avoid repeated DB queries.
-        Returns: Dict with 'patterns' mapping, 'others_id' for fallback, and 'channel_configs'
+        Cached per process and shared across processes through Redis
+        (app.utils.network_cache); clearNetworkCache() invalidates every copy.
+        Returns: Dict with 'patterns' mapping, 'resolver' (NetworkResolver
+        compiled from the patterns), 'others_id' for fallback, and 'channel_configs'
         """
-        global _network_map_cache, _network_map_timestamp
-
-        # Check if cache is valid
-        if (
-            _network_map_cache is not None
-            and _network_map_timestamp is not None
-            and datetime.now() - _network_map_timestamp < CACHE_TTL
-        ):
-            print(
-                f"✓ Using cached network mapping ({len(_network_map_cache.get('patterns', {}))} patterns)"
-            )
-            return _network_map_cache
-
-        # Load fresh data from database
         try:
-            from app.db.models.network import Network  # Adjust import path as needed
-
-            # Load networks
-            stmt = select(Network.id, Network.network_name)
-            result = await db.execute(stmt)
-            networks = result.all()
-
-            network_map = {}
-            others_id = None
-
-            for network_id, network_name in networks:
-                if not network_name:
-                    continue
-
-                name_lower = network_name.lower().strip()
-
-                # Check if this is the "Others" network
-                if name_lower in ["others", "other", "unknown"]:
-                    others_id = network_id
-                    print(f"✓ Found 'Others' network with ID: {others_id}")
-
-                # Direct name match
-                network_map[name_lower] = network_id
-
-                # Common patterns for your data
-                network_map[f"nfs {name_lower}"] = network_id
-                network_map[f"nfs_{name_lower}"] = network_id
-                network_map[f"{name_lower} nfs"] = network_id
-                network_map[f"nfs{name_lower}"] = network_id
-
-                # Handle spaces vs underscores
-                name_with_space = name_lower.replace("_", " ")
-                name_with_underscore = name_lower.replace(" ", "_")
-                network_map[name_with_space] = network_id
-                network_map[name_with_underscore] = network_id
-                network_map[f"nfs {name_with_space}"] = network_id
-                network_map[f"nfs_{name_with_underscore}"] = network_id
-
-            # Load channel-network relationships to check which channels use networks
-            # Get distinct channel_ids from Network table that have at least one network
-            print(f"🔍 Checking which channels have networks...")
-            channel_network_stmt = (
-                select(Network.channel_id)
-                .where(Network.channel_id.isnot(None))
-                .distinct()
+            return await network_mapping_cache.get(
+                load=lambda: UploadRepository._load_network_mapping(db),
+                prepare=UploadRepository._compile_network_mapping,
             )
-            channel_network_result = await db.execute(channel_network_stmt)
-            channels_with_networks = set(channel_network_result.scalars().all())
-
-            # Build channel config map: channel_id -> has_network (True/False)
-            channel_configs = {}
-
-            # Get all channels
-            all_channels_stmt = select(ChannelConfig.id, ChannelConfig.channel_name)
-            all_channels_result = await db.execute(all_channels_stmt)
-            all_channels = all_channels_result.all()
-
-            # Mark which channels have networks
-            for channel_id, channel_name in all_channels:
-                has_networks = channel_id in channels_with_networks
-                channel_configs[channel_id] = has_networks
-                status = "✓ HAS networks" if has_networks else "○ NO networks"
-                print(f"   Channel {channel_id} ({channel_name}): {status}")
-
-            # Update cache with patterns, others_id, and channel configs
-            _network_map_cache = {
-                "patterns": network_map,
-                "others_id": others_id,
-                "channel_configs": channel_configs,
-            }
-            _network_map_timestamp = datetime.now()
-
-            print(
-                f"✓ Loaded fresh network mapping ({len(network_map)} patterns from {len(networks)} networks)"
-            )
-            print(f"✓ Loaded {len(channel_configs)} channel configurations")
-            if others_id:
-                print(f"✓ 'Others' network configured with ID: {others_id}")
-            else:
-                print(
-                    f"⚠️ Warning: No 'Others' network found - unmapped services will be NULL"
-                )
-
-            return _network_map_cache
 
         except Exception as e:
             print(f"⚠️ Warning: Could not load network mapping: {str(e)}")
@@ -3844,13 +3762,122 @@ class UploadRepository:
 
             traceback.print_exc()
             print(f"   Network IDs will be NULL for all records")
-            return {"patterns": {}, "others_id": None, "channel_configs": {}}
+            return {
+                "patterns": {},
+                "resolver": NetworkResolver({}),
+                "others_id": None,
+                "channel_configs": {},
+            }
+
+    @staticmethod
+    async def _load_network_mapping(db: AsyncSession) -> Dict[str, Any]:
+        """
+        Read the network patterns and channel configs from the database
+
+        Returns:
+            JSON-serializable dict with 'patterns', 'others_id' and 'channel_configs'
+        """
+        from app.db.models.network import Network  # Adjust import path as needed
+
+        # Load networks
+        stmt = select(Network.id, Network.network_name)
+        result = await db.execute(stmt)
+        networks = result.all()
+
+        network_map = {}
+        others_id = None
+
+        for network_id, network_name in networks:
+            if not network_name:
+                continue
+
+            name_lower = network_name.lower().strip()
+
+            # Check if this is the "Others" network
+            if name_lower in ["others", "other", "unknown"]:
+                others_id = network_id
+                print(f"✓ Found 'Others' network with ID: {others_id}")
+
+            # Direct name match
+            network_map[name_lower] = network_id
+
+            # Common patterns for your data
+            network_map[f"nfs {name_lower}"] = network_id
+            network_map[f"nfs_{name_lower}"] = network_id
+            network_map[f"{name_lower} nfs"] = network_id
+            network_map[f"nfs{name_lower}"] = network_id
+
+            # Handle spaces vs underscores
+            name_with_space = name_lower.replace("_", " ")
+            name_with_underscore = name_lower.replace(" ", "_")
+            network_map[name_with_space] = network_id
+            network_map[name_with_underscore] = network_id
+            network_map[f"nfs {name_with_space}"] = network_id
+            network_map[f"nfs_{name_with_underscore}"] = network_id
+
+        # Load channel-network relationships to check which channels use networks
+        # Get distinct channel_ids from Network table that have at least one network
+        print(f"🔍 Checking which channels have networks...")
+        channel_network_stmt = (
+            select(Network.channel_id)
+            .where(Network.channel_id.isnot(None))
+            .distinct()
+        )
+        channel_network_result = await db.execute(channel_network_stmt)
+        channels_with_networks = set(channel_network_result.scalars().all())
+
+        # Build channel config map: channel_id -> has_network (True/False)
+        channel_configs = {}
+
+        # Get all channels
+        all_channels_stmt = select(ChannelConfig.id, ChannelConfig.channel_name)
+        all_channels_result = await db.execute(all_channels_stmt)
+        all_channels = all_channels_result.all()
+
+        # Mark which channels have networks
+        for channel_id, channel_name in all_channels:
+            has_networks = channel_id in channels_with_networks
+            channel_configs[channel_id] = has_networks
+            status = "✓ HAS networks" if has_networks else "○ NO networks"
+            print(f"   Channel {channel_id} ({channel_name}): {status}")
+
+        print(
+            f"✓ Loaded fresh network mapping ({len(network_map)} patterns from {len(networks)} networks)"
+        )
+        print(f"✓ Loaded {len(channel_configs)} channel configurations")
+        if others_id:
+            print(f"✓ 'Others' network configured with ID: {others_id}")
+        else:
+            print(
+                f"⚠️ Warning: No 'Others' network found - unmapped services will be NULL"
+            )
+
+        return {
+            "patterns": network_map,
+            "others_id": others_id,
+            "channel_configs": channel_configs,
+        }
+
+    @staticmethod
+    def _compile_network_mapping(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Loaded (or snapshot) mapping -> mapping with its compiled resolver"""
+        return {
+            "patterns": data["patterns"],
+            "resolver": NetworkResolver(data["patterns"]),
+            "others_id": data["others_id"],
+            # JSON snapshots carry the channel ids as strings
+            "channel_configs": {
+                int(channel_id): has_networks
+                for channel_id, has_networks in data["channel_configs"].items()
+            },
+        }
 
     @staticmethod
     def _detect_card_type_from_number(card_number: str) -> str:
         """
         Detect card type (Visa, Mastercard, etc.) from card number using BIN ranges.
         Works with both full and masked card numbers (e.g., "453789******7041").
+        BIN rules are precompiled into a prefix trie (app.utils.network_resolver).
 
         Args:
             card_number: Card number string (can contain spaces/dashes/asterisks)
@@ -3858,97 +3885,7 @@ class UploadRepository:
         Returns:
             Card type name (e.g., "visa", "mastercard", "amex") or None if not detected
         """
-        if not card_number:
-            return None
-
-        # Convert to string and clean
-        card_str = str(card_number).strip()
-
-        # Handle masked cards: "453789******7041" or "453789****7041"
-        # Extract the BIN (first 6 digits) before the asterisks
-        if "*" in card_str:
-            # Split by asterisks and take the first part
-            bin_part = card_str.split("*")[0]
-            # Remove any non-digit characters from BIN part
-            card_digits = "".join(filter(str.isdigit, bin_part))
-        else:
-            # Full card number - remove spaces, dashes, and other non-digit characters
-            card_digits = "".join(filter(str.isdigit, card_str))
-
-        # Need at least first digit to detect card type
-        if not card_digits or len(card_digits) < 1:
-            return None
-
-        # Get first 2 and first 4 digits for BIN detection
-        first_digit = card_digits[0]
-        first_two = card_digits[:2] if len(card_digits) >= 2 else ""
-        first_four = card_digits[:4] if len(card_digits) >= 4 else ""
-        first_six = card_digits[:6] if len(card_digits) >= 6 else ""
-
-        # Visa: starts with 4
-        if first_digit == "4":
-            return "visa"
-
-        # Mastercard: 51-55, or 2221-2720
-        if first_two in ["51", "52", "53", "54", "55"]:
-            return "mastercard"
-        if len(first_four) >= 4:
-            try:
-                bin_num = int(first_four)
-                if 2221 <= bin_num <= 2720:
-                    return "mastercard"
-            except ValueError:
-                pass
-
-        # American Express: 34 or 37
-        if first_two in ["34", "37"]:
-            return "amex"
-
-        # Discover: 6011, 622126-622925, 644-649, 65
-        if first_four == "6011" or first_two == "65":
-            return "discover"
-        if len(first_four) >= 4:
-            try:
-                bin_num = int(first_four)
-                if 6440 <= bin_num <= 6499:
-                    return "discover"
-            except ValueError:
-                pass
-        if len(first_six) >= 6:
-            try:
-                bin_num_six = int(first_six)
-                if 622126 <= bin_num_six <= 622925:
-                    return "discover"
-            except ValueError:
-                pass
-
-        # Diners Club: 36, 38, 300-305
-        if first_two in ["36", "38"]:
-            return "diners"
-        first_three = card_digits[:3] if len(card_digits) >= 3 else ""
-        if first_three in ["300", "301", "302", "303", "304", "305"]:
-            return "diners"
-
-        # JCB: 3528-3589
-        if len(first_four) >= 4:
-            try:
-                bin_num = int(first_four)
-                if 3528 <= bin_num <= 3589:
-                    return "jcb"
-            except ValueError:
-                pass
-
-        # UnionPay: starts with 62
-        if first_two == "62":
-            return "unionpay"
-
-        # RuPay (India): 60, 6521, 6522
-        if first_two == "60":
-            return "rupay"
-        if first_four in ["6521", "6522"]:
-            return "rupay"
-
-        return None
+        return detect_card_type(card_number)
 
     @staticmethod
     def _extract_network_id(
@@ -3979,40 +3916,13 @@ class UploadRepository:
             return None
 
         # Channel uses networks - proceed with mapping logic
-        network_map = network_mapping.get("patterns", {})
-
-        if not network_map:
-            return None
-
-        # PRIORITY 1: Try card number detection if provided
-        if card_number:
-            detected_card_type = UploadRepository._detect_card_type_from_number(
-                card_number
-            )
-            if detected_card_type:
-                # Try to find network_id for this card type
-                if detected_card_type in network_map:
-                    return network_map[detected_card_type]
-
-        # PRIORITY 2: Try service name matching
-        if not service_name:
+        if not network_mapping.get("patterns"):
             return None
 
-        service_lower = str(service_name).lower().strip()
-
-        # Try direct match first (fastest)
-        if service_lower in network_map:
-            return network_map[service_lower]
-
-        # Try pattern matching (contains check)
-        # Sort by length to match most specific patterns first
-        sorted_patterns = sorted(network_map.keys(), key=len, reverse=True)
-        for pattern in sorted_patterns:
-            if pattern in service_lower:
-                return network_map[pattern]
-
-        # No match found - return None
-        return None
+        # PRIORITY 1: card type detected from the card number
+        # PRIORITY 2: service name - exact pattern, else the longest pattern
+        # it contains (one pass of the precompiled automaton)
+        return network_mapping["resolver"].resolve(service_name, card_number)
 
     @staticmethod
     async def saveUploadedFileDetails(
@@ -4053,10 +3963,13 @@ class UploadRepository:
         system_id: int = 1,
     ) -> Dict[str, Any]:
         """
-        OPTIMIZED: Bulk duplicate detection using batched queries instead of N queries.
-        Performance: 100,000x faster than per-row queries
-        Safety: Batches keys to avoid PostgreSQL max_stack_depth error on huge uploads
-        Batch size is dynamically loaded from tbl_cfg_system_batch based on system_id
+        OPTIMIZED: Set-based duplicate detection - one anti-join of the batch
+        keys (channel, source, amount, date, ccy) against stored transactions;
+        rows repeating a key earlier in the same batch are duplicates as well.
+        system_id is kept for callers; it no longer sizes key batches.
+
+        OPTIMIZED: Column sources resolved once per batch from its header
+        (app.utils.upload_batch); values are built column by column.
 
         NEW: Network ID mapping using in-memory O(1) lookup (no per-row queries)
         FIXED: Only stores network_id when service name actually matches a pattern
@@ -4073,9 +3986,6 @@ class UploadRepository:
             if fileData:
                 print(f"  First record columns: {list(fileData[0].keys())[:10]}")
 
-            duplicates = []
-            new_records = []
-
             # 🔥 PRE-LOAD NETWORK MAPPING ONCE (O(1) lookups for all rows)
             network_mapping = await UploadRepository._build_network_mapping(db)
             if network_mapping.get("patterns"):
@@ -4085,138 +3995,60 @@ class UploadRepository:
             else:
                 print(f"⚠️ No network mapping available - network_id will be NULL")
 
-            # CRITICAL OPTIMIZATION: Build unique keys for ALL records at once
-            keys_to_check = []
-            for row in fileData:
-                key = [
-                    fileJson["channel_id"],
-                    fileJson["source_id"],
-                ]
-
-                # Add amount to key
-                if getAmountColumnName is not None and getAmountColumnName in row:
-                    key.append(str(row[getAmountColumnName]))
-                else:
-                    key.append(None)
-
-                # Add date to key
-                if getDateTimeColumnName is not None and getDateTimeColumnName in row:
-                    key.append(str(row[getDateTimeColumnName]))
-                else:
-                    key.append(None)
-
-                # Add currency to key (if needed for duplicate check)
-                if getCurrencyColumnName is not None and getCurrencyColumnName in row:
-                    key.append(str(row[getCurrencyColumnName]))
-                else:
-                    key.append(None)
-
-                keys_to_check.append(tuple(key))
-
-            # BATCHED QUERY to check all duplicates (avoids Postgres max_stack_depth error)
-            # Split into chunks to prevent "stack depth limit exceeded" error on large batches
-
-            # DYNAMIC BATCH SIZE: Calculate based on number of jobs from tbl_cfg_system_batch
-            from app.db.models.system_batch_config import SystemBatchConfig
-
-            # Try to get number of jobs from database config
-            batch_config_stmt = select(SystemBatchConfig).where(
-                SystemBatchConfig.system_id == system_id
+            # BATCH PREPARATION: resolve the source columns once from the
+            # batch header and build the transaction values column by column
+            batch, sources = prepare_batch(
+                fileData,
+                amount_column=getAmountColumnName,
+                date_column=getDateTimeColumnName,
+                account_column=getAcountNumberColumnName,
+                currency_column=getCurrencyColumnName,
+                reference_column=getReferenceNumberColumnName,
+                txn_id_column=getTransactionIdColumnName,
+                service_name_column=getServiceNameColumnName,
             )
-            batch_config_result = await db.execute(batch_config_stmt)
-            batch_config = batch_config_result.scalar_one_or_none()
-
-            total_records = len(keys_to_check)
-
-            if batch_config and batch_config.record_per_job:
-                # record_per_job stores NUMBER OF JOBS
-                num_jobs = int(batch_config.record_per_job)
-                # Calculate batch size: total records / number of jobs
-                BATCH_SIZE = max(
-                    1, (total_records + num_jobs - 1) // num_jobs
-                )  # Ceiling division
-                batch_source = (
-                    f"calculated from {num_jobs} jobs (system_id={system_id})"
+            print(f"[FIELD MAPPING] Source columns per field: {sources}")
+
+            channel_id = fileJson["channel_id"]
+            source_id = fileJson["source_id"]
+            with_ccy = getCurrencyColumnName is not None
+            keys_to_check = list(
+                zip(
+                    [channel_id] * len(batch),
+                    [source_id] * len(batch),
+                    batch["key_amount"].tolist(),
+                    batch["key_date"].tolist(),
+                    batch["key_ccy"].tolist(),
                 )
-            else:
-                # Fallback to env var or default
-                BATCH_SIZE = settings.UPLOAD_DUPLICATE_CHECK_BATCH_SIZE
-                batch_source = "config/env default"
-
-            existing_keys = set()
-
-            if keys_to_check:
-                import time
-
-                batch_count = (len(keys_to_check) + BATCH_SIZE - 1) // BATCH_SIZE
-                print(f"\n📊 Duplicate Check Starting:")
-                print(f"   Total keys to check: {len(keys_to_check):,}")
-                print(f"   Batch size: {BATCH_SIZE:,} ({batch_source})")
-                print(f"   Number of batches/jobs: {batch_count}")
-
-                for i in range(0, len(keys_to_check), BATCH_SIZE):
-                    batch_start = time.time()
-                    batch_keys = keys_to_check[i : i + BATCH_SIZE]
-                    batch_num = i // BATCH_SIZE + 1
-
-                    if getCurrencyColumnName:
-                        # Query with currency
-                        stmt = select(
-                            Transaction.channel_id,
-                            Transaction.source_id,
-                            Transaction.amount,
-                            Transaction.date,
-                            Transaction.ccy,
-                        ).where(
-                            tuple_(
-                                Transaction.channel_id,
-                                Transaction.source_id,
-                                Transaction.amount,
-                                Transaction.date,
-                                Transaction.ccy,
-                            ).in_(batch_keys)
-                        )
-                    else:
-                        # Query without currency
-                        keys_without_ccy = [
-                            k[:4] for k in batch_keys
-                        ]  # Remove last element (None)
-                        stmt = select(
-                            Transaction.channel_id,
-                            Transaction.source_id,
-                            Transaction.amount,
-                            Transaction.date,
-                        ).where(
-                            tuple_(
-                                Transaction.channel_id,
-                                Transaction.source_id,
-                                Transaction.amount,
-                                Transaction.date,
-                            ).in_(keys_without_ccy)
-                        )
-
-                    result = await db.execute(stmt)
-                    batch_records = result.all()
-
-                    # Add to existing_keys set for O(1) lookup
-                    existing_keys.update(tuple(record) for record in batch_records)
+            )
 
-                    # Log batch completion
-                    batch_time = time.time() - batch_start
-                    duplicates_found = len(batch_records)
-                    print(
-                        f"   ✓ Batch {batch_num}/{batch_count}: "
-                        f"{len(batch_keys):,} keys checked, "
-                        f"{duplicates_found:,} duplicates found, "
-                        f"{batch_time:.2f}s"
-                    )
+            # SET-BASED duplicate check: one anti-join of the batch keys
+            # against tbl_txn_transactions (no IN-lists, no key batching)
+            existing_keys = await UploadRepository._findExistingKeys(
+                db,
+                channel_id=channel_id,
+                source_id=source_id,
+                keys=keys_to_check,
+                with_ccy=with_ccy,
+            )
 
-                print(
-                    f"✓ Duplicate check complete: {len(existing_keys):,} total duplicates found\n"
+            # Duplicates: keys already stored, and keys repeated earlier in
+            # this batch
+            is_duplicate = [
+                key in existing_keys or repeated
+                for key, repeated in zip(
+                    keys_to_check, repeated_keys(batch, with_ccy).tolist()
                 )
+            ]
+            duplicates = [row for row, dup in zip(fileData, is_duplicate) if dup]
+            new_rows = [row for row, dup in zip(fileData, is_duplicate) if not dup]
+            new_batch = batch.loc[[not dup for dup in is_duplicate]]
 
-            # Process each row and check against existing_keys (in-memory, super fast)
-            rows_processed = 0
+            # 🔥 Map network_id from service_name OR card_number: channel
+            # checks once per batch, lookups once per distinct value
+            channel_has_network = network_mapping.get("channel_configs", {}).get(
+                channel_id, False
+            )
             network_stats = {
                 "mapped": 0,
                 "unmapped_null": 0,  # CHANGED: No service name match found
@@ -4224,622 +4056,108 @@ class UploadRepository:
                 "null_no_service": 0,  # No service name provided
             }
 
-            for row in fileData:
-                # Debug: Log first row to see actual column names
-                if rows_processed == 0:
-                    print(f"DEBUG - First row columns: {list(row.keys())}")
-                    print(
-                        f"DEBUG - First row data sample: {dict(list(row.items())[:5])}"
-                    )
-
-                # Build key for this row
-                key = [
-                    fileJson["channel_id"],
-                    fileJson["source_id"],
-                ]
-                rows_processed += 1
-
-                if getAmountColumnName is not None and getAmountColumnName in row:
-                    key.append(str(row[getAmountColumnName]))
-                else:
-                    key.append(None)
-
-                if getDateTimeColumnName is not None and getDateTimeColumnName in row:
-                    key.append(str(row[getDateTimeColumnName]))
-                else:
-                    key.append(None)
-
-                if getCurrencyColumnName is not None and getCurrencyColumnName in row:
-                    key.append(str(row[getCurrencyColumnName]))
+            if channel_has_network:
+                # 🔥 SPECIAL CASE: Mobile Money channel with CBS source
+                fixed_network_id = await UploadRepository._mobileMoneyCbsNetworkId(
+                    db, channel_id, source_id
+                )
+                if fixed_network_id:
+                    network_ids = [fixed_network_id] * len(new_batch)
                 else:
-                    key.append(None)
-
-                # O(1) duplicate check using set lookup
-                if tuple(key) in existing_keys:
-                    duplicates.append(row)
-                    continue
-
-                # Build new record with current timestamp
-                current_timestamp = datetime.now()
-                data = {
-                    "channel_id": fileJson["channel_id"],
-                    "source_id": fileJson["source_id"],
-                    "otherDetails": json.dumps(row, default=str),
-                    "file_transactions_id": fileJson["file_transactions_id"],
-                    "created_by": fileJson.get("created_by", 2),  # CHANGED: Use authenticated user from fileJson
-                    "updated_by": fileJson.get("updated_by", 2),  # CHANGED: Use authenticated user from fileJson
-                    "version_number": fileJson["version_number"],
-                    "created_at": current_timestamp,
-                    "updated_at": current_timestamp,
-                }
-
-                # DEBUG: Log fileJson to see what source_id we're receiving
-                if len(new_records) == 0:  # Only log once per batch
-                    print(f"[UPLOAD DEBUG] fileJson: {fileJson}")
                     print(
-                        f"[UPLOAD DEBUG] Saving with source_id={fileJson['source_id']}, channel_id={fileJson['channel_id']}"
+                        f"\n[CHANNEL DEBUG] Channel {channel_id} HAS network configuration"
                     )
-                    print(
-                        f"[UPLOAD DEBUG] created_at explicitly set to: {current_timestamp}"
-                    )
-
-                # --- AMOUNT FIELD AUTO-DETECTION ---
-                amount_mapped = False
-                if getAmountColumnName is not None and getAmountColumnName in row:
-                    data["amount"] = str(row[getAmountColumnName])
-                    amount_mapped = True
-                    if len(new_records) == 0:
-                        print(
-                            f"[AMOUNT DEBUG] Explicit mapping used: {getAmountColumnName} = {data['amount']}"
-                        )
-                if not amount_mapped:
-                    amount_fields = [
-                        "amount",
-                        "transaction_amount",
-                        "transaction amount",
-                        "amt",
-                        "txn_amt",
-                        "txn amt",
-                        "txn-amount",
-                        "txn_amount",
-                        "homeamount",
-                        "home_amount",
-                        "home amount",
-                        "localamount",
-                        "local_amount",
-                        "local amount",
-                        "baseamount",
-                        "base_amount",
-                        "base amount",
-                        "debit",
-                        "credit",
-                        "dramount",
-                        "cramount",
-                        "dr amount",
-                        "cr amount",
-                    ]
-                    for field in amount_fields:
-                        if (
-                            field in row
-                            and row[field] is not None
-                            and str(row[field]).strip()
-                        ):
-                            data["amount"] = str(row[field]).strip()
-                            if len(new_records) == 0:
-                                print(
-                                    f"[AMOUNT DEBUG] Auto-detected field '{field}' = {data['amount']}"
-                                )
-                            break
-
-                # --- DATE FIELD AUTO-DETECTION ---
-                date_mapped = False
-                if getDateTimeColumnName is not None and getDateTimeColumnName in row:
-                    date_value = row[getDateTimeColumnName]
-                    if date_value is not None and str(date_value) not in [
-                        "",
-                        "nan",
-                        "NaT",
-                        "None",
-                    ]:
-                        if hasattr(date_value, "strftime"):
-                            data["date"] = date_value.strftime("%Y-%m-%d %H:%M:%S")
-                        else:
-                            data["date"] = str(date_value)
-                        date_mapped = True
-                        if len(new_records) == 0:
-                            print(
-                                f"[DATE DEBUG] Explicit mapping used: {getDateTimeColumnName} = {data['date']}"
-                            )
-                if not date_mapped:
-                    date_fields = [
-                        "date",
-                        "txn_date",
-                        "txn date",
-                        "txndate",
-                        "txndatetime",
-                        "txn_datetime",
-                        "txn datetime",
-                        "transaction_date",
-                        "transaction date",
-                        "transactiondatetime",
-                        "transaction_datetime",
-                        "transaction datetime",
-                        "postingdate",
-                        "posting_date",
-                        "posting date",
-                        "value_date",
-                        "valuedate",
-                        "value date",
-                        "datetime",
-                        "timestamp",
-                        "created_at",
-                        "created at",
-                        "entry_date",
-                        "entrydate",
-                        "entry date",
-                    ]
-                    for field in date_fields:
-                        if (
-                            field in row
-                            and row[field] is not None
-                            and str(row[field]).strip()
-                        ):
-                            date_value = row[field]
-                            if hasattr(date_value, "strftime"):
-                                data["date"] = date_value.strftime("%Y-%m-%d %H:%M:%S")
-                            else:
-                                data["date"] = str(date_value)
-                            if len(new_records) == 0:
-                                print(
-                                    f"[DATE DEBUG] Auto-detected field '{field}' = {data['date']}"
-                                )
-                            break
-
-                # --- ACCOUNT NUMBER FIELD AUTO-DETECTION ---
-                account_mapped = False
-                if (
-                    getAcountNumberColumnName is not None
-                    and getAcountNumberColumnName in row
-                ):
-                    data["account_number"] = str(row[getAcountNumberColumnName])
-                    account_mapped = True
-                    if len(new_records) == 0:
-                        print(
-                            f"[ACCOUNT DEBUG] Explicit mapping used: {getAcountNumberColumnName} = {data['account_number']}"
-                        )
-                if not account_mapped:
-                    account_fields = [
-                        "account_number",
-                        "accountnumber",
-                        "account number",
-                        "acct_number",
-                        "acctnumber",
-                        "acct number",
-                        "accountno",
-                        "account_no",
-                        "account no",
-                        "acctno",
-                        "acct_no",
-                        "acct no",
-                        "accountno_masked",
-                        "account_no_masked",
-                        "account no masked",
-                        "acctno_masked",
-                        "acct_no_masked",
-                        "acct no masked",
-                        "customer_account",
-                        "customeraccount",
-                        "customer account",
-                        "beneficiary_account",
-                        "beneficiaryaccount",
-                        "beneficiary account",
-                        "payer_account",
-                        "payeraccount",
-                        "payer account",
-                        "payee_account",
-                        "payeeaccount",
-                        "payee account",
-                    ]
-                    for field in account_fields:
-                        if (
-                            field in row
-                            and row[field] is not None
-                            and str(row[field]).strip()
-                        ):
-                            data["account_number"] = str(row[field]).strip()
-                            if len(new_records) == 0:
-                                print(
-                                    f"[ACCOUNT DEBUG] Auto-detected field '{field}' = {data['account_number']}"
-                                )
-                            break
-
-                if getCurrencyColumnName is not None and getCurrencyColumnName in row:
-                    data["ccy"] = str(row[getCurrencyColumnName])
-
-                # Map reference_number - PRIORITIZE EXPLICIT MAPPING
-                # 1. First, check if user explicitly mapped reference_number field
-                reference_mapped = False
-                if (
-                    getReferenceNumberColumnName is not None
-                    and getReferenceNumberColumnName in row
-                ):
-                    if (
-                        row[getReferenceNumberColumnName] is not None
-                        and str(row[getReferenceNumberColumnName]).strip()
-                    ):
-                        data["reference_number"] = str(
-                            row[getReferenceNumberColumnName]
-                        ).strip()
-                        reference_mapped = True
-                        if len(new_records) == 0:
-                            print(
-                                f"[REF DEBUG] Explicit mapping used: {getReferenceNumberColumnName} = {data['reference_number']}"
-                            )
-
-                if not reference_mapped:
-                    # 2. Fall back to auto-detection from common field names
-                    reference_fields = [
-                        "transaction_id",
-                        "transaction id",
-                        "rrn",
-                        "reference_number",
-                        "reference number",
-                        "referencenumber",
-                        "ref_number",
-                        "ref number",
-                        "refnumber",
-                        "retrieval_reference_number",
-                        "retrieval reference number",
-                    ]
-                    reference_found = False
-                    for field in reference_fields:
-                        if (
-                            field in row
-                            and row[field] is not None
-                            and str(row[field]).strip()
-                        ):
-                            data["reference_number"] = str(row[field]).strip()
-                            reference_found = True
-                            if len(new_records) == 0:
-                                print(
-                                    f"[REF DEBUG] Auto-detected field '{field}' = {data['reference_number']}"
-                                )
-                            break
-
-                    if not reference_found and len(new_records) == 0:
-                        print(f"[REF DEBUG] ❌ No reference field found!")
-                        print(f"[REF DEBUG] Available columns: {list(row.keys())}")
-                        print(f"[REF DEBUG] Searching for: {reference_fields[:5]}...")
-
-                # Map txn_id - PRIORITIZE EXPLICIT MAPPING
-                if (
-                    getTransactionIdColumnName is not None
-                    and getTransactionIdColumnName in row
-                ):
-                    if (
-                        row[getTransactionIdColumnName] is not None
-                        and str(row[getTransactionIdColumnName]).strip()
-                    ):
-                        data["txn_id"] = str(row[getTransactionIdColumnName]).strip()
-                else:
-                    # Fall back to auto-detection
-                    txn_id_fields = [
-                        "receipt_number",
-                        "receipt number",
-                        "payer_transaction_id",
-                        "payer transaction id",
-                        "stan",
-                        "txn_id",
-                        "txn id",
-                        "transactionid",
-                        "txnid",
-                    ]
-                    for field in txn_id_fields:
-                        if (
-                            field in row
-                            and row[field] is not None
-                            and str(row[field]).strip()
-                        ):
-                            data["txn_id"] = str(row[field]).strip()
-                            break
-
-                # 🔥 FIXED: Map network_id from service_name OR card_number
-                network_id = None
-                network_mapped = False
-                service_name_value = None
-                card_number_value = None
-                channel_id = fileJson["channel_id"]
-                source_id = fileJson["source_id"]
-
-                # Check if this channel uses networks
-                channel_has_network = network_mapping.get("channel_configs", {}).get(
-                    channel_id, False
-                )
-
-                if channel_has_network:
-                    # 🔥 SPECIAL CASE: Mobile Money channel with CBS source
-                    # Get the first network_id for this channel from the network table
-                    channel_details_result = await db.execute(
-                        select(ChannelConfig).where(ChannelConfig.id == channel_id)
+                    network_ids = network_mapping["resolver"].resolve_many(
+                        new_batch["service_name"], new_batch["card_number"]
                     )
-                    channel_details = channel_details_result.scalar_one_or_none()
-
-                    # Check if this is Mobile Money channel (check channel name)
-                    # AND if source is CBS (check cbs_source_id matches)
-                    is_mobile_money_cbs = False
-                    if channel_details:
-                        is_mobile_money = (
-                            channel_details.channel_name
-                            and "MOBILE" in channel_details.channel_name.upper()
-                            and "MONEY" in channel_details.channel_name.upper()
-                        )
-                        is_cbs_source = channel_details.cbs_source_id == source_id
-                        is_mobile_money_cbs = is_mobile_money and is_cbs_source
-
-                        if is_mobile_money_cbs and len(new_records) == 0:
-                            print(
-                                f"\n[MOBILE MONEY CBS] Detected Mobile Money channel with CBS source"
-                            )
-                            print(f"   Channel: {channel_details.channel_name}")
-                            print(f"   Source ID: {source_id}")
-                            print(f"   CBS Source ID: {channel_details.cbs_source_id}")
-
-                    if is_mobile_money_cbs:
-                        # Get the first network_id for this Mobile Money channel
-                        from app.db.models.network import Network
-
-                        first_network_result = await db.execute(
-                            select(Network.id)
-                            .where(Network.channel_id == channel_id)
-                            .order_by(Network.id.asc())
-                            .limit(1)
-                        )
-                        first_network_id = first_network_result.scalar_one_or_none()
-
-                        if first_network_id:
-                            network_id = first_network_id
-                            network_mapped = True
-                            if len(new_records) == 0:
-                                print(
-                                    f"[MOBILE MONEY CBS] ✓ Using first network_id={network_id} for channel {channel_id}"
-                                )
-                        else:
-                            if len(new_records) == 0:
-                                print(
-                                    f"[MOBILE MONEY CBS] ⚠️ No networks found for Mobile Money channel {channel_id}"
-                                )
-
-                    # Channel uses networks - proceed with mapping (if not already mapped by special case)
-                    if not network_mapped and len(new_records) == 0:
-                        print(
-                            f"\n[CHANNEL DEBUG] Channel {channel_id} HAS network configuration"
-                        )
-
-                    # STEP 1: Extract card_number if available (for Card channels)
-                    card_number_fields = [
-                        "card_number",
-                        "card number",
-                        "cardnumber",
-                        "cardno_masked",
-                        "cardno masked",  # Masked card numbers
-                        "card_no_masked",
-                        "card no masked",
-                        "pan",
-                        "card_pan",
-                        "cardpan",
-                        "account_number",
-                        "account number",  # Sometimes card number is in account field
-                        "accountno_masked",
-                        "account_no_masked",  # Masked account that might be card
-                    ]
-                    for field in card_number_fields:
-                        if field in row and row[field]:
-                            card_number_value = str(row[field]).strip()
-                            if len(new_records) == 0:
-                                # Show card number for debugging (it's already masked in your data)
-                                # If it contains asterisks, it's already masked
-                                if "*" in card_number_value:
-                                    masked_card = card_number_value  # Already masked
-                                else:
-                                    # Mask it for security
-                                    masked_card = (
-                                        card_number_value[:6]
-                                        + "****"
-                                        + card_number_value[-4:]
-                                        if len(card_number_value) >= 10
-                                        else "****"
-                                    )
-                                print(
-                                    f"[CARD DEBUG] Found card number in '{field}': {masked_card}"
-                                )
-                            break
-
-                    # STEP 2: Check if user explicitly mapped service_name field
-                    if getServiceNameColumnName and getServiceNameColumnName in row:
-                        service_name_value = row[getServiceNameColumnName]
-                        if len(new_records) == 0 and service_name_value:
-                            print(
-                                f"[SERVICE DEBUG] Explicit service_name: '{service_name_value}'"
-                            )
-
-                    # STEP 3: Fall back to auto-detection of service_name from common field names
-                    if not service_name_value:
-                        service_fields = [
-                            "service_name",
-                            "service name",
-                            "servicename",
-                            "network",
-                            "network_name",
-                            "network name",
-                            "provider",
-                            "provider_name",
-                            "provider name",
-                            "operator",
-                            "operator_name",
-                            "operator name",
-                            "payer_client",
-                            "payer client",
-                            "service",
-                            "channel",
-                            "card_type",
-                            "card type",
-                        ]
-
-                        for field in service_fields:
-                            if field in row and row[field]:
-                                service_name_value = row[field]
-                                if len(new_records) == 0:
-                                    print(
-                                        f"[SERVICE DEBUG] Auto-detected service_name from '{field}': '{service_name_value}'"
-                                    )
-                                break
-
-                    # STEP 4: Extract network_id using BOTH card_number and service_name
-                    # (Skip if already mapped by Mobile Money CBS special case)
-                    if not network_mapped:
-                        # The _extract_network_id function will prioritize card_number detection
-                        network_id = UploadRepository._extract_network_id(
-                            service_name=service_name_value,
-                            network_mapping=network_mapping,
-                            channel_id=channel_id,
-                            card_number=card_number_value,  # NEW: Pass card number for card type detection
-                        )
-
-                    if len(new_records) == 0:
-                        if network_id:
-                            if network_mapped:
-                                print(
-                                    f"[NETWORK DEBUG] ✓ Mobile Money CBS: using first network_id={network_id}"
-                                )
-                            elif card_number_value:
-                                card_type = (
-                                    UploadRepository._detect_card_type_from_number(
-                                        card_number_value
-                                    )
-                                )
-                                print(
-                                    f"[NETWORK DEBUG] ✓ Detected from card: '{card_type}' → network_id={network_id}"
-                                )
-                            else:
-                                print(
-                                    f"[NETWORK DEBUG] ✓ Matched service_name: '{service_name_value}' → network_id={network_id}"
-                                )
-                        else:
-                            if card_number_value:
-                                print(
-                                    f"[NETWORK DEBUG] ✗ Card number provided but no card type detected → NULL"
-                                )
-                            elif service_name_value:
-                                print(
-                                    f"[NETWORK DEBUG] ✗ Service name '{service_name_value}' did NOT match any pattern → NULL"
-                                )
-                            else:
-                                print(
-                                    f"[NETWORK DEBUG] ✗ No card number or service name found → NULL"
-                                )
-                else:
-                    # Channel does NOT use networks - network_id should be NULL
-                    network_id = None
-                    if len(new_records) == 0:
-                        print(
-                            f"\n[CHANNEL DEBUG] Channel {channel_id} does NOT have network configuration → network_id=NULL"
-                        )
 
-                # 4. Assign network_id
-                data["network_id"] = network_id
-
-                # CRITICAL DEBUG: Show what's actually being saved
-                if len(new_records) == 0:
-                    print(f"\n[CRITICAL] Final network_id assignment:")
-                    print(f"   channel_id: {channel_id}")
-                    print(f"   channel_has_network: {channel_has_network}")
-                    if card_number_value:
-                        # Handle already-masked cards
-                        if "*" in card_number_value:
-                            masked_card = card_number_value
-                        else:
-                            masked_card = (
-                                card_number_value[:6] + "****" + card_number_value[-4:]
-                                if len(card_number_value) >= 10
-                                else "****"
-                            )
-                        card_type = UploadRepository._detect_card_type_from_number(
-                            card_number_value
-                        )
-                        print(
-                            f"   card_number_value: {masked_card} (detected: {card_type or 'unknown'})"
-                        )
+                has_input = (
+                    new_batch["service_name"].notna()
+                    | new_batch["card_number"].map(bool)
+                ).tolist()
+                for network_id, provided in zip(network_ids, has_input):
+                    if network_id:
+                        # Channel uses networks and we found a network_id (actual match)
+                        network_stats["mapped"] += 1
+                    elif provided:
+                        # Channel uses networks, data provided, but no match found
+                        network_stats["unmapped_null"] += 1
                     else:
-                        print(f"   card_number_value: None")
-                    print(f"   service_name_value: {service_name_value}")
-                    print(f"   network_id assigned: {network_id}")
-                    print(f"   data['network_id']: {data.get('network_id')}")
-                    print(f"   Type: {type(data.get('network_id'))}\n")
-
-                # Track network mapping statistics
-                channel_has_network = network_mapping.get("channel_configs", {}).get(
-                    channel_id, False
+                        # Channel uses networks but no service name or card number found
+                        network_stats["null_no_service"] += 1
+            else:
+                # Channel does NOT use networks - network_id should be NULL
+                print(
+                    f"\n[CHANNEL DEBUG] Channel {channel_id} does NOT have network configuration → network_id=NULL"
                 )
+                network_ids = [None] * len(new_batch)
+                network_stats["channel_no_network"] = len(new_batch)
+
+            # Build new records: per-batch values once, per-row values from
+            # the prepared columns
+            current_timestamp = datetime.now()
+            constants = {
+                "channel_id": channel_id,
+                "source_id": source_id,
+                "file_transactions_id": fileJson["file_transactions_id"],
+                "created_by": fileJson.get("created_by", 2),  # CHANGED: Use authenticated user from fileJson
+                "updated_by": fileJson.get("updated_by", 2),  # CHANGED: Use authenticated user from fileJson
+                "version_number": fileJson["version_number"],
+                "created_at": current_timestamp,
+                "updated_at": current_timestamp,
+            }
+            columns = {
+                # Raw row as jsonb text (COPY sends it as is)
+                "otherDetails": [dumps_other_details(row) for row in new_rows],
+                "amount": new_batch["amount"].tolist(),
+                "date": new_batch["date"].tolist(),
+                "account_number": new_batch["account_number"].tolist(),
+                "ccy": new_batch["ccy"].tolist(),
+                "reference_number": new_batch["reference_number"].tolist(),
+                "txn_id": new_batch["txn_id"].tolist(),
+                "network_id": network_ids,
+                # Typed shadows of the amount / date strings
+                "amount_numeric": map_unique(new_batch["amount"], parse_amount),
+                "txn_ts": map_unique(new_batch["date"], parse_txn_ts),
+            }
+            names = list(columns)
+            new_records = [
+                {**constants, **dict(zip(names, values))}
+                for values in zip(*columns.values())
+            ]
 
-                if not channel_has_network:
-                    # Channel doesn't use networks - this is expected
-                    network_stats["channel_no_network"] += 1
-                elif network_id:
-                    # Channel uses networks and we found a network_id (actual match)
-                    network_stats["mapped"] += 1
-                elif service_name_value or card_number_value:
-                    # Channel uses networks, data provided, but no match found
-                    network_stats["unmapped_null"] += 1
-                else:
-                    # Channel uses networks but no service name or card number found
-                    network_stats["null_no_service"] += 1
-
-                # Debug log for first record to verify field mapping
-                if len(new_records) == 0:
-                    print(f"\n=== FIRST RECORD FIELD MAPPING DEBUG ===")
-                    print(f"Explicit mappings provided:")
-                    print(
-                        f"  - reference_number: {getReferenceNumberColumnName or 'AUTO-DETECT'}"
-                    )
-                    print(
-                        f"  - transaction_id: {getTransactionIdColumnName or 'AUTO-DETECT'}"
-                    )
-                    print(
-                        f"  - service_name: {getServiceNameColumnName or 'AUTO-DETECT'}"
-                    )
-                    print(f"Available fields in row: {list(row.keys())}")
-                    print(f"Sample data: {dict(list(row.items())[:5])}")
-                    print(f"Mapped values:")
-                    print(
-                        f"  - Reference number: {data.get('reference_number', 'NOT MAPPED')}"
-                    )
-                    print(f"  - Transaction ID: {data.get('txn_id', 'NOT MAPPED')}")
-                    print(f"  - Network ID: {data.get('network_id', 'NULL')}")
-                    if card_number_value:
-                        # Handle already-masked cards
-                        if "*" in card_number_value:
-                            masked_card = card_number_value
-                        else:
-                            masked_card = (
-                                card_number_value[:6] + "****" + card_number_value[-4:]
-                                if len(card_number_value) >= 10
-                                else "****"
-                            )
-                        print(f"  - Card Number Used: {masked_card}")
-                    else:
-                        print(
-                            f"  - Service Name Used: {service_name_value or 'NOT FOUND'}"
-                        )
-                    print(f"  - Amount: {data.get('amount', 'NOT MAPPED')}")
-                    print(f"  - Date: {data.get('date', 'NOT MAPPED')}")
-                    print(f"\n[CRITICAL DEBUG] Complete data dict being inserted:")
-                    print(f"  {data}")
-                    print(f"=====================================\n")
-
-                new_records.append(Transaction(**data))
+            if new_records:
+                print(f"[UPLOAD DEBUG] fileJson: {fileJson}")
+                print(f"\n[CRITICAL DEBUG] First data dict being inserted:")
+                print(f"  {new_records[0]}")
 
             if new_records:
-                db.add_all(new_records)
+                if settings.UPLOAD_INSERT_MODE == "copy":
+                    # BULK INSERT: stream the rows with COPY (ids drawn up front)
+                    new_ids = await UploadRepository._copyTransactions(db, new_records)
+                else:
+                    orm_records = [
+                        Transaction(**{**data, "otherDetails": json.loads(data["otherDetails"])})
+                        for data in new_records
+                    ]
+                    db.add_all(orm_records)
+                    if settings.MATCHING_KEY_INDEX or settings.RECON_ROLLUP:
+                        # ids are assigned by the flush
+                        await db.flush()
+                    new_ids = [record.id for record in orm_records]
+
+                if settings.MATCHING_KEY_INDEX:
+                    # Index the new rows for the channel's matching rules in
+                    # the same transaction
+                    indexed = await UnmatchedKeyIndex(db).index_transactions(
+                        channel_id=fileJson["channel_id"],
+                        source_id=fileJson["source_id"],
+                        transaction_ids=new_ids,
+                    )
+                    print(f"🗂️ Unmatched key index: {indexed:,} entries added")
+                if settings.RECON_ROLLUP:
+                    # Count the new rows into the reconciliation rollup
+                    await ReconRollupRepository.add_transactions(db, new_ids)
                 await db.commit()
 
             # Print network mapping statistics
@@ -4866,6 +4184,216 @@ class UploadRepository:
             print("uploadRepository-saveFileDetails", str(e))
             return {"error": True, "status": "error", "message": str(e)}
 
+    @staticmethod
+    async def _mobileMoneyCbsNetworkId(
+        db: AsyncSession, channel_id: int, source_id: int
+    ) -> Optional[int]:
+        """
+        Network for uploads from the CBS source of a Mobile Money channel:
+        every row gets the channel's first network_id.
+
+        Returns:
+            That network_id, or None for other channels / sources (or when
+            the channel has no networks)
+        """
+        channel_details_result = await db.execute(
+            select(ChannelConfig).where(ChannelConfig.id == channel_id)
+        )
+        channel_details = channel_details_result.scalar_one_or_none()
+        if not channel_details:
+            return None
+
+        # Mobile Money channel (by name) AND source is its CBS source
+        is_mobile_money = (
+            channel_details.channel_name
+            and "MOBILE" in channel_details.channel_name.upper()
+            and "MONEY" in channel_details.channel_name.upper()
+        )
+        if not (is_mobile_money and channel_details.cbs_source_id == source_id):
+            return None
+
+        print(f"\n[MOBILE MONEY CBS] Detected Mobile Money channel with CBS source")
+        print(f"   Channel: {channel_details.channel_name}")
+        print(f"   Source ID: {source_id}")
+        print(f"   CBS Source ID: {channel_details.cbs_source_id}")
+
+        from app.db.models.network import Network
+
+        first_network_result = await db.execute(
+            select(Network.id)
+            .where(Network.channel_id == channel_id)
+            .order_by(Network.id.asc())
+            .limit(1)
+        )
+        first_network_id = first_network_result.scalar_one_or_none()
+        if first_network_id:
+            print(
+                f"[MOBILE MONEY CBS] ✓ Using first network_id={first_network_id} for channel {channel_id}"
+            )
+        else:
+            print(
+                f"[MOBILE MONEY CBS] ⚠️ No networks found for Mobile Money channel {channel_id}"
+            )
+        return first_network_id
+
+    @staticmethod
+    def _isCheckableKey(key, with_ccy: bool) -> bool:
+        """Whether a duplicate key has every part it is compared on"""
+        return (
+            key[2] is not None
+            and key[3] is not None
+            and (key[4] is not None or not with_ccy)
+        )
+
+    @staticmethod
+    async def _findExistingKeys(
+        db: AsyncSession,
+        channel_id: int,
+        source_id: int,
+        keys: List[tuple],
+        with_ccy: bool,
+    ) -> set:
+        """
+        Duplicate keys of an upload batch that are already stored.
+
+        The distinct keys go to Postgres as three arrays and are checked with
+        a single unnest ... WHERE EXISTS anti-join on idx_txn_dedup_key,
+        instead of tuple IN-lists that had to be batched to stay under
+        max_stack_depth.
+
+        Args:
+            channel_id: Channel of the upload
+            source_id: Source of the upload
+            keys: (channel_id, source_id, amount, date, ccy) per row
+            with_ccy: Compare currency too (ccy is None in keys otherwise)
+
+        Returns:
+            The keys (same tuple shape) that match an existing transaction
+        """
+        import time
+
+        check_start = time.time()
+        # Keys with NULL parts never match (amount = NULL is not true)
+        unique_keys = {
+            tuple(key[2:])
+            for key in keys
+            if UploadRepository._isCheckableKey(key, with_ccy)
+        }
+        existing_keys = set()
+
+        if unique_keys:
+            amounts, dates, ccys = (list(values) for values in zip(*unique_keys))
+            query, params = UploadRepository._existingKeysQuery(
+                channel_id, source_id, amounts, dates, ccys, with_ccy
+            )
+            result = await db.execute(text(query), params)
+            existing_keys = {
+                (channel_id, source_id, amount, date, ccy)
+                for amount, date, ccy in result
+            }
+
+        print(
+            f"\n📊 Duplicate check: {len(keys):,} rows, {len(unique_keys):,} distinct keys, "
+            f"{len(existing_keys):,} already stored ({time.time() - check_start:.2f}s)\n"
+        )
+        return existing_keys
+
+    @staticmethod
+    def _existingKeysQuery(
+        channel_id: int,
+        source_id: int,
+        amounts: List[str],
+        dates: List[str],
+        ccys: List[str],
+        with_ccy: bool,
+    ) -> tuple:
+        """
+        Duplicate check query of _findExistingKeys
+
+        Returns:
+            (query, bind parameters)
+        """
+        ccy_condition = "AND t.ccy = k.ccy" if with_ccy else ""
+        query = f"""
+            SELECT k.amount, k.date, k.ccy
+            FROM unnest(
+                CAST(:amounts AS varchar[]),
+                CAST(:dates AS varchar[]),
+                CAST(:ccys AS varchar[])
+            ) AS k(amount, date, ccy)
+            WHERE EXISTS (
+                SELECT 1 FROM tbl_txn_transactions t
+                WHERE t.channel_id = :channel_id
+                  AND t.source_id = :source_id
+                  AND t.amount = k.amount
+                  AND t.date = k.date
+                  {ccy_condition}
+            )
+        """
+        params = {
+            "amounts": amounts,
+            "dates": dates,
+            "ccys": ccys,
+            "channel_id": channel_id,
+            "source_id": source_id,
+        }
+        return query, params
+
+    @staticmethod
+    async def _copyTransactions(
+        db: AsyncSession, rows: List[Dict[str, Any]]
+    ) -> List[int]:
+        """
+        Bulk insert prepared transaction rows with COPY (asyncpg
+        copy_records_to_table) inside the session's transaction.
+
+        The ids are drawn from the table's sequence first, so callers can
+        index / roll up the new rows as they do after an ORM flush.
+
+        Args:
+            rows: Column name -> value dicts, as built by saveFileDetails
+
+        Returns:
+            Ids of the inserted rows, in input order
+        """
+        if not rows:
+            return []
+
+        id_result = await db.execute(
+            text(
+                "SELECT nextval(pg_get_serial_sequence('tbl_txn_transactions', 'id')) "
+                "FROM generate_series(1, :count)"
+            ),
+            {"count": len(rows)},
+        )
+        ids = sorted(row[0] for row in id_result)
+
+        # Fixed column list in table order; columns a row does not set are NULL
+        present = set().union(*rows)
+        columns = ["id"] + [
+            column.name
+            for column in Transaction.__table__.columns
+            if column.name != "id" and column.name in present
+        ]
+        if len(present) == len(columns) - 1 > 1 and all(
+            len(row) == len(present) for row in rows
+        ):
+            # Every row has every column (as saveFileDetails builds them)
+            values = itemgetter(*columns[1:])
+            records = [(txn_id, *values(row)) for txn_id, row in zip(ids, rows)]
+        else:
+            records = [
+                (txn_id, *(row.get(column) for column in columns[1:]))
+                for txn_id, row in zip(ids, rows)
+            ]
+
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "tbl_txn_transactions", columns=columns, records=records
+        )
+        return ids
+
     @staticmethod
     async def updateUploadProgress(
         db: AsyncSession,
@@ -5174,6 +4702,13 @@ class UploadRepository:
         try:
             # 1️⃣ TEMPORARY: Remove all auto-generated transactions linked to this file
             # Future behavior: transactions must be soft-deleted or archived instead
+            if settings.RECON_ROLLUP:
+                file_txn_ids = (
+                    await db.execute(
+                        select(Transaction.id).where(Transaction.file_transactions_id == file_id)
+                    )
+                ).scalars().all()
+                await ReconRollupRepository.remove_transactions(db, file_txn_ids)
             await db.execute(
                 delete(Transaction).where(Transaction.file_transactions_id == file_id)
             )
@@ -5201,16 +4736,20 @@ class UploadRepository:
     async def clearNetworkCache() -> None:
         """
         Clear the network mapping cache.
-        Call this when network configuration changes.
+        Call this when network configuration changes: bumps the shared
+        version, so every API / Celery process reloads within
+        NETWORK_CACHE_CHECK_SECONDS.
         """
-        global _network_map_cache, _network_map_timestamp
-        _network_map_cache = None
-        _network_map_timestamp = None
+        await network_mapping_cache.invalidate()
         print("✓ Network mapping cache cleared")
 
     @staticmethod
     async def updateNetworkIdForChannel(
-        db: AsyncSession, channel_id: int, batch_size: int = 1000
+        db: AsyncSession,
+        channel_id: int,
+        batch_size: int = 5000,
+        after_id: int = 0,
+        progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> Dict[str, Any]:
         """
         Update network_id for all transactions belonging to a specific channel.
@@ -5219,12 +4758,18 @@ class UploadRepository:
         2. Network patterns have been updated
         3. Existing transactions need their network_id corrected
 
+        OPTIMIZED: keyset batches by id (backfillNetworkIds), one set-based
+        UPDATE per batch, resumable with after_id.
+
         Args:
             channel_id: The channel ID to update transactions for
             batch_size: Number of records to process in each batch
+            after_id: Resume after this transaction id (0 = from the start)
+            progress: Called after every committed batch with the running
+                      counts and last_id (e.g. to report Celery task state)
 
         Returns:
-            Dict with update statistics
+            Dict with update statistics (last_id: checkpoint to resume from)
         """
         try:
             print(f"\n🔄 Starting network_id update for channel_id={channel_id}")
@@ -5247,13 +4792,12 @@ class UploadRepository:
 
             print(f"✓ Channel {channel_id} has network configuration")
 
-            # Count total transactions for this channel
-            count_stmt = (
+            # Count the transactions still to process for this channel
+            count_result = await db.execute(
                 select(func.count())
                 .select_from(Transaction)
-                .where(Transaction.channel_id == channel_id)
+                .where(Transaction.channel_id == channel_id, Transaction.id > after_id)
             )
-            count_result = await db.execute(count_stmt)
             total_transactions = count_result.scalar()
 
             print(f"📊 Found {total_transactions:,} transactions to process")
@@ -5266,153 +4810,61 @@ class UploadRepository:
                     "updated_count": 0,
                 }
 
-            # Process in batches
-            updated_count = 0
-            null_count = 0
-            unchanged_count = 0
-            offset = 0
-
-            # Service name fields to check (in priority order)
-            service_fields = [
-                "service_name",
-                "service name",
-                "servicename",
-                "network",
-                "network_name",
-                "network name",
-                "provider",
-                "provider_name",
-                "provider name",
-                "operator",
-                "operator_name",
-                "operator name",
-                "payer_client",
-                "payer client",
-                "service",
-                "channel",
-                "card_type",
-                "card type",
-            ]
-
-            # Card number fields to check (for Card channels)
-            card_number_fields = [
-                "card_number",
-                "card number",
-                "cardnumber",
-                "cardno_masked",
-                "cardno masked",  # Masked card numbers
-                "card_no_masked",
-                "card no masked",
-                "pan",
-                "card_pan",
-                "cardpan",
-                "account_number",
-                "account number",
-                "accountno_masked",
-                "account_no_masked",  # Masked account that might be card
-            ]
-
-            while offset < total_transactions:
-                print(
-                    f"\n📦 Processing batch {offset // batch_size + 1} (records {offset + 1} to {min(offset + batch_size, total_transactions)})"
-                )
+            stats = {
+                "channel_id": channel_id,
+                "total": total_transactions,
+                "processed": 0,
+                "updated": 0,
+                "set_null": 0,
+                "unchanged": 0,
+                "unparsed": 0,
+                "last_id": after_id,
+            }
 
-                # Fetch batch of transactions
-                stmt = (
-                    select(Transaction)
-                    .where(Transaction.channel_id == channel_id)
-                    .offset(offset)
-                    .limit(batch_size)
+            while True:
+                batch = await UploadRepository.backfillNetworkIds(
+                    db, channel_id=channel_id, after_id=stats["last_id"], batch_size=batch_size
                 )
+                if batch["error"]:
+                    return {
+                        "error": True,
+                        "status": "error",
+                        "message": batch["message"],
+                        "last_id": stats["last_id"],
+                    }
+                if batch["last_id"] is None:
+                    break
 
-                result = await db.execute(stmt)
-                transactions = result.scalars().all()
-
-                batch_updated = 0
-                batch_null = 0
-                batch_unchanged = 0
-
-                for txn in transactions:
-                    try:
-                        # Parse otherDetails JSON to extract service name and card number
-                        other_details = (
-                            json.loads(txn.otherDetails) if txn.otherDetails else {}
-                        )
-
-                        # Try to find service name from various possible fields
-                        service_name_value = None
-                        for field in service_fields:
-                            if field in other_details and other_details[field]:
-                                service_name_value = other_details[field]
-                                break
-
-                        # Try to find card number from various possible fields
-                        card_number_value = None
-                        for field in card_number_fields:
-                            if field in other_details and other_details[field]:
-                                card_number_value = other_details[field]
-                                break
-
-                        # Extract network_id using the same logic as upload (with BOTH service_name and card_number)
-                        new_network_id = UploadRepository._extract_network_id(
-                            service_name=service_name_value,
-                            network_mapping=network_mapping,
-                            channel_id=channel_id,
-                            card_number=card_number_value,  # NEW: Pass card number for card type detection
-                        )
-
-                        # Update only if network_id has changed
-                        if new_network_id != txn.network_id:
-                            txn.network_id = new_network_id
-                            txn.updated_at = datetime.now()
-                            batch_updated += 1
-
-                            if new_network_id is None:
-                                batch_null += 1
-                        else:
-                            batch_unchanged += 1
-
-                    except json.JSONDecodeError as e:
-                        print(
-                            f"⚠️ Warning: Could not parse otherDetails for transaction {txn.id}: {str(e)}"
-                        )
-                        batch_unchanged += 1
-                        continue
-                    except Exception as e:
-                        print(
-                            f"⚠️ Warning: Error processing transaction {txn.id}: {str(e)}"
-                        )
-                        batch_unchanged += 1
-                        continue
-
-                # Commit batch
-                await db.commit()
-
-                updated_count += batch_updated
-                null_count += batch_null
-                unchanged_count += batch_unchanged
+                for key in ("processed", "updated", "set_null", "unchanged", "unparsed"):
+                    stats[key] += batch[key]
+                stats["last_id"] = batch["last_id"]
 
                 print(
-                    f"   ✓ Batch complete: {batch_updated} updated, {batch_null} set to NULL, {batch_unchanged} unchanged"
+                    f"   ✓ Batch up to id {batch['last_id']}: {batch['updated']} updated, "
+                    f"{batch['set_null']} set to NULL, {batch['unchanged']} unchanged "
+                    f"({stats['processed']:,}/{total_transactions:,})"
                 )
-
-                offset += batch_size
+                if progress:
+                    progress(dict(stats))
 
             # Final summary
             print(f"\n✅ Update Complete!")
-            print(f"   Total transactions processed: {total_transactions:,}")
-            print(f"   Updated with network_id: {updated_count - null_count:,}")
-            print(f"   Set to NULL (no match): {null_count:,}")
-            print(f"   Unchanged: {unchanged_count:,}")
+            print(f"   Total transactions processed: {stats['processed']:,}")
+            print(f"   Updated with network_id: {stats['updated'] - stats['set_null']:,}")
+            print(f"   Set to NULL (no match): {stats['set_null']:,}")
+            print(f"   Unchanged: {stats['unchanged']:,}")
+            if stats["unparsed"]:
+                print(f"   ⚠️ Unreadable otherDetails (left unchanged): {stats['unparsed']:,}")
 
             return {
                 "error": False,
                 "status": "success",
                 "message": f"Successfully updated network_id for channel {channel_id}",
-                "total_processed": total_transactions,
-                "updated_count": updated_count,
-                "null_count": null_count,
-                "unchanged_count": unchanged_count,
+                "total_processed": stats["processed"],
+                "updated_count": stats["updated"],
+                "null_count": stats["set_null"],
+                "unchanged_count": stats["unchanged"],
+                "last_id": stats["last_id"],
             }
 
         except Exception as e:
@@ -5423,9 +4875,124 @@ class UploadRepository:
             traceback.print_exc()
             return {"error": True, "status": "error", "message": str(e)}
 
+    @staticmethod
+    async def backfillNetworkIds(
+        db: AsyncSession, channel_id: int, after_id: int = 0, batch_size: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        Re-resolve network_id for one keyset batch of a channel's
+        transactions (ids > after_id) from their stored otherDetails, the
+        same way saveFileDetails resolves it. Only changed rows are written,
+        with one set-based UPDATE; commits the batch.
+
+        Args:
+            channel_id: Channel (must use networks)
+            after_id: Last id of the previous batch (0 to start)
+            batch_size: Transactions per batch
+
+        Returns:
+            Dict with the batch's last_id (None when done) and counts
+        """
+        try:
+            network_mapping = await UploadRepository._build_network_mapping(db)
+
+            # Only the service name / card number keys of otherDetails are
+            # read; rows whose otherDetails is not a JSON object keep their
+            # network_id
+            result = await db.execute(
+                text("""
+                    SELECT
+                        id,
+                        network_id,
+                        "otherDetails" IS NULL
+                            OR "otherDetails" = '""'
+                            OR jsonb_typeof("otherDetails") = 'object' AS readable,
+                        CASE WHEN jsonb_typeof("otherDetails") = 'object' THEN (
+                            SELECT jsonb_object_agg(key, value)
+                            FROM jsonb_each("otherDetails")
+                            WHERE key = ANY(CAST(:keys AS text[]))
+                        ) END AS lookup_details
+                    FROM tbl_txn_transactions
+                    WHERE channel_id = :channel_id
+                      AND id > :after_id
+                    ORDER BY id
+                    LIMIT :batch_size
+                """),
+                {
+                    "channel_id": channel_id,
+                    "after_id": after_id,
+                    "batch_size": batch_size,
+                    "keys": SERVICE_FIELDS + CARD_NUMBER_FIELDS,
+                },
+            )
+            rows = result.fetchall()
+            if not rows:
+                return {"error": False, "last_id": None}
+
+            ids, current_ids, details = [], [], []
+            unparsed = 0
+            for row in rows:
+                if not row.readable:
+                    unparsed += 1
+                    continue
+                ids.append(row.id)
+                current_ids.append(row.network_id)
+                details.append(row.lookup_details or {})
+
+            service_names, card_numbers = network_inputs(details)
+            network_ids = network_mapping["resolver"].resolve_many(service_names, card_numbers)
+
+            changed_ids, changed_network_ids = [], []
+            for txn_id, current_id, network_id in zip(ids, current_ids, network_ids):
+                if network_id != current_id:
+                    changed_ids.append(txn_id)
+                    changed_network_ids.append(network_id)
+
+            if changed_ids:
+                if settings.RECON_ROLLUP:
+                    # Re-bucket the changed rows around the network_id change
+                    await ReconRollupRepository.remove_transactions(db, changed_ids)
+                await db.execute(
+                    text("""
+                        UPDATE tbl_txn_transactions AS t
+                        SET network_id = v.network_id,
+                            updated_at = :updated_at
+                        FROM unnest(
+                            CAST(:ids AS bigint[]),
+                            CAST(:network_ids AS bigint[])
+                        ) AS v(id, network_id)
+                        WHERE t.id = v.id
+                    """),
+                    {
+                        "ids": changed_ids,
+                        "network_ids": changed_network_ids,
+                        "updated_at": datetime.now(),
+                    },
+                )
+                if settings.RECON_ROLLUP:
+                    await ReconRollupRepository.add_transactions(db, changed_ids)
+            await db.commit()
+
+            return {
+                "error": False,
+                "last_id": rows[-1].id,
+                "processed": len(rows),
+                "updated": len(changed_ids),
+                "set_null": sum(1 for network_id in changed_network_ids if network_id is None),
+                "unchanged": len(rows) - len(changed_ids),
+                "unparsed": unparsed,
+            }
+
+        except Exception as e:
+            await db.rollback()
+            print(
+                f"❌ Error backfilling network_id for channel {channel_id} after id {after_id}: {str(e)}"
+            )
+            return {"error": True, "message": str(e)}
+
     @staticmethod
     async def updateNetworkIdForAllChannels(
-        db: AsyncSession, batch_size: int = 1000
+        db: AsyncSession, batch_size: int = 5000
     ) -> Dict[str, Any]:
         """
         Update network_id for ALL channels that have network configuration.
@@ -5512,3 +5079,78 @@ class UploadRepository:
 
             traceback.print_exc()
             return {"error": True, "status": "error", "message": str(e)}
+
+    @staticmethod
+    async def backfillTypedColumns(
+        db: AsyncSession, after_id: int = 0, batch_size: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        Fill amount_numeric / txn_ts of one keyset batch of existing
+        transactions (ids > after_id), parsed exactly like at upload.
+        Commits the batch; updated_at is left alone so matched rows are not
+        picked up again by incremental matching.
+
+        Args:
+            after_id: Last id of the previous batch (0 to start)
+            batch_size: Transactions per batch
+
+        Returns:
+            Dict with the batch's last_id (None when done) and counts
+        """
+        try:
+            result = await db.execute(
+                text("""
+                    SELECT id, amount, date
+                    FROM tbl_txn_transactions
+                    WHERE id > :after_id
+                      AND ((amount_numeric IS NULL AND amount IS NOT NULL)
+                           OR (txn_ts IS NULL AND date IS NOT NULL))
+                    ORDER BY id
+                    LIMIT :batch_size
+                """),
+                {"after_id": after_id, "batch_size": batch_size},
+            )
+            rows = result.fetchall()
+            if not rows:
+                return {"error": False, "last_id": None, "updated": 0, "unparsed": 0}
+
+            ids, amounts, timestamps = [], [], []
+            unparsed = 0
+            for row in rows:
+                amount = parse_amount(row.amount)
+                txn_ts = parse_txn_ts(row.date)
+                if (amount is None and row.amount is not None) or (
+                    txn_ts is None and row.date is not None
+                ):
+                    unparsed += 1
+                ids.append(row.id)
+                amounts.append(amount)
+                timestamps.append(txn_ts)
+
+            await db.execute(
+                text("""
+                    UPDATE tbl_txn_transactions AS t
+                    SET amount_numeric = COALESCE(v.amount_numeric, t.amount_numeric),
+                        txn_ts = COALESCE(v.txn_ts, t.txn_ts)
+                    FROM unnest(
+                        CAST(:ids AS bigint[]),
+                        CAST(:amounts AS numeric[]),
+                        CAST(:timestamps AS timestamptz[])
+                    ) AS v(id, amount_numeric, txn_ts)
+                    WHERE t.id = v.id
+                """),
+                {"ids": ids, "amounts": amounts, "timestamps": timestamps},
+            )
+            await db.commit()
+
+            return {
+                "error": False,
+                "last_id": ids[-1],
+                "updated": len(ids),
+                "unparsed": unparsed,
+            }
+
+        except Exception as e:
+            await db.rollback()
+            print(f"❌ Error backfilling typed columns after id {after_id}: {str(e)}")
+            return {"error": True, "message": str(e)}
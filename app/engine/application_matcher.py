@@ -28,6 +28,9 @@ from datetime import datetime, date, timedelta
 import re
 import logging
 
+from app.config import settings
+from app.new_engine.match_writeback import MatchWriteBack
+
 logger = logging.getLogger(__name__)
 
 
@@ -155,7 +158,7 @@ class ApplicationMatcher:
                     t.date as transaction_date,
                     t.account_number,
                     t.ccy as currency_code,
-                    t."otherDetails",
+                    t."otherDetails" #>> '{}' AS "otherDetails",
                     t.comment,
                     s.source_name
                 FROM tbl_txn_transactions t
@@ -757,6 +760,23 @@ class ApplicationMatcher:
         """
         all_txn_ids = []
         
+        # One UPDATE per chunk; with RECON_ROLLUP the status change is applied
+        # to the rollup in the same transaction, before each UPDATE
+        writer = MatchWriteBack(
+            self.db,
+            columns={
+                "match_status": "integer",
+                "match_conditon": "text",
+            },
+            constants={
+                "reconciled_status": True,
+                "match_rule_id": rule_id,
+            },
+            chunk_size=settings.MATCHING_WRITEBACK_CHUNK_SIZE,
+            update_rollup=settings.RECON_ROLLUP
+        )
+        assignments = {}
+        
         for group in matched_groups:
             transactions = group["transactions"]
             txn_ids = [txn["id"] for txn in transactions]
@@ -784,28 +804,14 @@ class ApplicationMatcher:
             # Create match condition description
             match_condition = f"Matched by rule {rule_id} ({actual_match_type}: {sources_matched} sources) - Application Layer"
             
-            # Update each transaction
-            update_query = """
-                UPDATE tbl_txn_transactions
-                SET 
-                    match_status = :match_status,
-                    reconciled_status = TRUE,
-                    match_rule_id = :rule_id,
-                    match_conditon = :match_condition,
-                    updated_at = NOW()
-                WHERE id = ANY(:txn_ids)
-            """
-            
-            await self.db.execute(
-                text(update_query),
-                {
-                    "match_status": match_status,
-                    "rule_id": rule_id,
-                    "match_condition": match_condition,
-                    "txn_ids": txn_ids
-                }
-            )
+            # A transaction can be part of several groups: the last group's
+            # assignment wins, as with one UPDATE per group
+            for txn_id in txn_ids:
+                assignments[txn_id] = (match_status, match_condition)
         
+        for txn_id, (match_status, match_condition) in assignments.items():
+            await writer.add([txn_id], match_status=match_status, match_conditon=match_condition)
+        await writer.flush()
         await self.db.commit()
         logger.info(f"Updated {len(all_txn_ids)} transactions with match results")
         
@@ -26,6 +26,7 @@ import json
 
 from app.engine.rule_complexity_analyzer import RuleComplexityAnalyzer, RuleComplexity
 from app.engine.application_matcher import ApplicationMatcher
+from app.new_engine.matching_locks import source_locks
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,8 @@ class MatchingRuleDispatcher:
         rule_id: int,
         channel_id: Optional[int] = None,
         dry_run: bool = False,
-        min_sources: Optional[int] = None
+        min_sources: Optional[int] = None,
+        lock_sources: bool = True
     ) -> Dict[str, Any]:
         """
         Execute matching rule using optimal execution strategy
@@ -60,6 +62,8 @@ class MatchingRuleDispatcher:
             channel_id: Optional channel filter
             dry_run: If True, analyze without executing
             min_sources: Minimum sources for partial matching
+            lock_sources: Hold the advisory locks of the rule's sources during
+                a non-dry run (False when the caller already holds them)
             
         Returns:
             {
@@ -105,14 +109,28 @@ class MatchingRuleDispatcher:
             #     result = await self._execute_via_application_layer(...)
             
             # New unified approach - always use application layer
-            result = await self._execute_via_application_layer(
-                rule_id=rule_id,
-                conditions=rule["conditions"],
-                tolerance=rule["tolerance"],
-                channel_id=channel_id,
-                dry_run=dry_run,
-                min_sources=min_sources
-            )
+            # (runs over the same sources are serialized, see matching_locks)
+            if lock_sources and not dry_run:
+                async with source_locks(
+                    self.db.bind, channel_id, rule["conditions"].get("sources", [])
+                ):
+                    result = await self._execute_via_application_layer(
+                        rule_id=rule_id,
+                        conditions=rule["conditions"],
+                        tolerance=rule["tolerance"],
+                        channel_id=channel_id,
+                        dry_run=dry_run,
+                        min_sources=min_sources
+                    )
+            else:
+                result = await self._execute_via_application_layer(
+                    rule_id=rule_id,
+                    conditions=rule["conditions"],
+                    tolerance=rule["tolerance"],
+                    channel_id=channel_id,
+                    dry_run=dry_run,
+                    min_sources=min_sources
+                )
             result["executor"] = "application_layer"
             
             # Add complexity info for monitoring/optimization
@@ -9,6 +9,10 @@ from sqlalchemy import text
 from datetime import datetime
 import logging
 
+from app.config import settings
+from app.new_engine.transaction_columns import SourceColumns
+from app.new_engine.match_writeback import MatchWriteBack
+
 logger = logging.getLogger(__name__)
 
 
@@ -136,6 +140,9 @@ class OptimizedApplicationMatcher:
     ) -> Dict[str, List[Dict]]:
         """
         Fetch unmatched transactions efficiently
+        
+        MATCHING_FETCH_MODE="stream" reads through a server-side cursor into a
+        SourceColumns store per source instead of one dict per row.
         """
         transactions = {}
         
@@ -162,27 +169,41 @@ class OptimizedApplicationMatcher:
             if channel_id:
                 params["channel_id"] = channel_id
             
-            result = await self.db.execute(text(query), params)
-            rows = result.fetchall()
-            
-            transactions[source_name] = [
-                {
-                    "id": row.id,
-                    "reference_number": row.reference_number,
-                    "amount": float(row.amount) if row.amount else None,
-                    "date": row.date,
-                    "account_number": row.account_number,
-                    "ccy": row.ccy,
-                    "source_name": row.source_name
-                }
-                for row in rows
-            ]
+            if settings.MATCHING_FETCH_MODE == "stream":
+                source_columns = SourceColumns(source_name)
+                
+                result = await self.db.stream(
+                    text(query).execution_options(yield_per=settings.MATCHING_FETCH_BATCH_SIZE),
+                    params
+                )
+                async for partition in result.partitions():
+                    for row in partition:
+                        source_columns.append(self._row_to_transaction(row))
+                
+                transactions[source_name] = source_columns.finalize()
+            else:
+                result = await self.db.execute(text(query), params)
+                rows = result.fetchall()
+                
+                transactions[source_name] = [self._row_to_transaction(row) for row in rows]
             
             self.stats["transactions_fetched"] += len(transactions[source_name])
             logger.info(f"Fetched {len(transactions[source_name])} from {source_name}")
         
         return transactions
     
+    def _row_to_transaction(self, row) -> Dict[str, Any]:
+        """Transaction dict for one result row"""
+        return {
+            "id": row.id,
+            "reference_number": row.reference_number,
+            "amount": float(row.amount) if row.amount else None,
+            "date": row.date,
+            "account_number": row.account_number,
+            "ccy": row.ccy,
+            "source_name": row.source_name
+        }
+    
     def _build_hash_indexes(
         self,
         transactions_by_source: Dict[str, List[Dict]],
@@ -191,14 +212,17 @@ class OptimizedApplicationMatcher:
         """
         Build hash indexes for O(1) lookup
         
+        Indexes hold row positions into transactions_by_source[source], so
+        transactions are only materialized when they are looked up.
+        
         Returns:
             {
                 "reference_number": {
-                    "ATM": {"ABC123": txn_obj, ...},
-                    "SWITCH": {"ABC123": txn_obj, ...}
+                    "ATM": {"ABC123": 0, ...},
+                    "SWITCH": {"ABC123": 17, ...}
                 },
                 "amount": {
-                    "ATM": {"100.00": [txn1, txn2], ...}
+                    "ATM": {"100.00": [3, 8], ...}
                 }
             }
         """
@@ -210,17 +234,21 @@ class OptimizedApplicationMatcher:
             for source, txns in transactions_by_source.items():
                 indexes[field][source] = {}
                 
-                for txn in txns:
-                    key = txn.get(field)
+                if isinstance(txns, SourceColumns):
+                    values = txns.column(field)
+                else:
+                    values = [txn.get(field) for txn in txns]
+                
+                for position, key in enumerate(values):
                     if key is not None:
                         # For unique fields (reference_number), store single txn
                         if field == "reference_number":
-                            indexes[field][source][str(key)] = txn
+                            indexes[field][source][str(key)] = position
                         else:
                             # For non-unique fields (amount), store list
                             if str(key) not in indexes[field][source]:
                                 indexes[field][source][str(key)] = []
-                            indexes[field][source][str(key)].append(txn)
+                            indexes[field][source][str(key)].append(position)
         
         logger.info(f"Built hash indexes for fields: {match_fields}")
         return indexes
@@ -267,7 +295,10 @@ class OptimizedApplicationMatcher:
                     continue
                 
                 # O(1) hash lookup!
-                matching_txn = indexes["reference_number"][source].get(str(reference))
+                position = indexes["reference_number"][source].get(str(reference))
+                matching_txn = (
+                    transactions_by_source[source][position] if position is not None else None
+                )
                 
                 if matching_txn and matching_txn["id"] not in processed_ids:
                     candidates[source] = matching_txn
@@ -313,6 +344,9 @@ class OptimizedApplicationMatcher:
         """
         Batch update matched transactions with dynamic match_status
         
+        Assignments are written set-based in chunks of
+        MATCHING_WRITEBACK_CHUNK_SIZE transactions (see MatchWriteBack).
+        
         Args:
             matched_groups: List of matched transaction groups
             rule_id: ID of the matching rule
@@ -327,6 +361,22 @@ class OptimizedApplicationMatcher:
         import secrets
         import string
         
+        # All group assignments go out as unnest() arrays, one UPDATE per chunk
+        writer = MatchWriteBack(
+            self.db,
+            columns={
+                "match_status": "integer",
+                "recon_reference_number": "text",
+                "match_conditon": "text",
+            },
+            constants={"match_rule_id": rule_id},
+            chunk_size=settings.MATCHING_WRITEBACK_CHUNK_SIZE,
+            commit_per_chunk=settings.MATCHING_WRITEBACK_COMMIT_PER_CHUNK,
+            touch_updated_at=False,
+            update_rollup=settings.RECON_ROLLUP
+        )
+        assignments = {}
+        
         for i, group in enumerate(matched_groups):
             recon_ref = f"RECON{''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(12))}"
             
@@ -346,27 +396,23 @@ class OptimizedApplicationMatcher:
                 match_status = 1  # Full match
                 match_type_desc = "FULL"
             
-            # Batch update
-            update_query = """
-                UPDATE tbl_txn_transactions
-                SET 
-                    match_status = :match_status,
-                    match_rule_id = :rule_id,
-                    recon_reference_number = :recon_ref,
-                    match_conditon = :match_condition
-                WHERE id = ANY(:txn_ids)
-            """
-            
-            await self.db.execute(
-                text(update_query),
-                {
-                    "match_status": match_status,
-                    "rule_id": rule_id,
-                    "recon_ref": recon_ref,
-                    "match_condition": f"Matched by rule {rule_id} ({match_type_desc}: {sources_matched} sources) - Optimized Layer",
-                    "txn_ids": txn_ids
-                }
+            # A transaction can be part of several groups: the last group's
+            # assignment wins (a chunk must not repeat an id for the rollup)
+            for txn_id in txn_ids:
+                assignments[txn_id] = (
+                    match_status,
+                    recon_ref,
+                    f"Matched by rule {rule_id} ({match_type_desc}: {sources_matched} sources) - Optimized Layer"
+                )
+        
+        for txn_id, (match_status, recon_ref, match_condition) in assignments.items():
+            await writer.add(
+                [txn_id],
+                match_status=match_status,
+                recon_reference_number=recon_ref,
+                match_conditon=match_condition
             )
+        await writer.flush()
         
         await self.db.commit()
         logger.info(f"Updated {len(all_txn_ids)} transactions in {len(matched_groups)} groups")
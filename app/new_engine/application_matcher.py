@@ -948,12 +948,41 @@ from sqlalchemy import text, select
 from datetime import datetime, date, timedelta
 import re
 import random
+import asyncio
 import logging
-from types import SimpleNamespace
 from itertools import product
 import ast
+
+from app.config import settings
+from app.new_engine.columnar_matcher import ColumnarJoinEngine
+from app.new_engine.transaction_columns import SourceColumns
+from app.new_engine.match_writeback import MatchWriteBack
+from app.new_engine.unmatched_key_index import UnmatchedKeyIndex, RAW_KEY_COLUMNS, RAW_KEY_PRIORITY
+from app.new_engine.rule_cache import CompiledRule
+from app.new_engine.rule_compiler import compile_predicate
+
 logger = logging.getLogger(__name__)
 
+# Row fields that carry the same column (stored once by the streaming fetch)
+FIELD_ALIASES = {"rrn": "reference_number", "transaction_date": "date"}
+
+# Row fields read from columns of tbl_txn_transactions; any other field a rule
+# reads is a raw file column, looked up in otherDetails by the fetch
+TRANSACTION_FIELDS = {
+    "id", "rrn", "reference_number", "amount", "transaction_date", "date", "txn_ts",
+    "account_number", "currency_code", "otherDetails", "comment", "source_name",
+}
+
+# Fields of the legacy "CARD|TERMINAL|MERCHANT" otherDetails text
+LEGACY_DETAIL_FIELDS = {"card_number", "terminal_id", "merchant_id"}
+
+# otherDetails as text (legacy JSON strings unquoted), and the legacy text only
+OTHER_DETAILS_TEXT = """t."otherDetails" #>> '{}'"""
+LEGACY_DETAILS_TEXT = (
+    """CASE WHEN jsonb_typeof(t."otherDetails") = 'string' THEN t."otherDetails" #>> '{}' END"""
+)
+
+
 
 class ApplicationMatcher:
     """
@@ -961,8 +990,11 @@ class ApplicationMatcher:
     Supports OR operators, nested groups, and parentheses
     """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, engine: Optional[str] = None):
         self.db = db
+        # "columnar" = vectorized hash join, "rowwise" = per-tuple eval loop
+        self.engine = engine or settings.MATCHING_ENGINE
+        self.key_index = UnmatchedKeyIndex(db)
     
     async def execute_complex_matching(
         self,
@@ -971,7 +1003,11 @@ class ApplicationMatcher:
         tolerance: Optional[Dict[str, Any]] = None,
         channel_id: Optional[int] = None,
         dry_run: bool = False,
-        min_sources: Optional[int] = None
+        min_sources: Optional[int] = None,
+        since: Optional[datetime] = None,
+        matched_since: Optional[datetime] = None,
+        key_index: Optional[str] = None,
+        compiled_rule: Optional[CompiledRule] = None
     ) -> Dict[str, Any]:
         """
         Execute complex matching rule with OR/parentheses support
@@ -983,6 +1019,13 @@ class ApplicationMatcher:
             channel_id: Optional channel filter
             dry_run: If True, only analyze without updating
             min_sources: Minimum sources required for partial matching
+            since: Incremental run - only probe transactions created after
+                   this against the outstanding unmatched keys (None = full run)
+            matched_since: Incremental run - also re-probe keys where rows were
+                           matched at/after this time
+            key_index: Key columns the rule's unmatched key index was last
+                       maintained for (tbl_txn_matching_watermark.key_index)
+            compiled_rule: Cached compiled form of the rule (compiled here if None)
             
         Returns:
             {
@@ -1009,9 +1052,84 @@ class ApplicationMatcher:
             # Determine match type (FULL or PARTIAL)
             match_type = "PARTIAL" if min_sources and min_sources < len(sources) else "FULL"
             
+            compiled = compiled_rule or self.compile_rule(
+                {"id": rule_id, "conditions": conditions, "tolerance": tolerance}
+            )
+            
+            # Only the fields the rule reads are kept by the streaming fetch
+            fetch_fields = compiled.fetch_fields
+            matching_fields = compiled.matching_fields
+            
+            # Unmatched key index: rebuilt by full runs (and when its key
+            # columns changed), topped up with the new rows otherwise
+            key_columns = UnmatchedKeyIndex.key_columns(matching_fields) if settings.MATCHING_KEY_INDEX else []
+            key_signature = UnmatchedKeyIndex.signature(key_columns) if key_columns else None
+            key_index_ready = key_signature is not None and key_index == key_signature
+            if key_signature and not dry_run:
+                if since is None or not key_index_ready:
+                    await self.key_index.rebuild(rule_id, key_columns, sources, channel_id)
+                else:
+                    await self.key_index.index_new(rule_id, key_columns, sources, channel_id, since)
+                key_index_ready = True
+            
+            # Incremental run: new rows + old unmatched rows sharing their key
+            candidate_filter, candidate_params = "", {}
+            if since is not None:
+                if key_index_ready:
+                    candidate_filter, candidate_params = self.key_index.probe_filter(
+                        rule_id, key_columns, sources, channel_id, since, matched_since
+                    )
+                else:
+                    candidate_filter, candidate_params = self._incremental_candidate_filter(
+                        matching_fields, sources, channel_id, since, matched_since
+                    )
+            
+            # Claim this run's unmatched rows up front (reset + recon_group_number),
+            # so the unmatched side needs no id diff at the end
+            run_marker = None
+            claimed_count = 0
+            if not dry_run:
+                claimed_count = await self._mark_run_transactions(
+                    sources, channel_id, recon_group_number,
+                    candidate_filter=candidate_filter, candidate_params=candidate_params
+                )
+                run_marker = recon_group_number
+            
+            # Large runs: match hash partitions of the key on parallel workers
+            partitions = settings.MATCHING_PARTITIONS
+            if (
+                run_marker
+                and partitions > 1
+                and UnmatchedKeyIndex.key_columns(matching_fields)
+                and claimed_count >= settings.MATCHING_PARTITION_MIN_ROWS
+            ):
+                # Partition workers read the claimed snapshot from their own sessions
+                await self.db.commit()
+                partition_results = await self._execute_partitions(
+                    rule_id, conditions, tolerance, channel_id, min_sources,
+                    recon_group_number, partitions
+                )
+                all_matched_txn_ids = [
+                    txn_id for part in partition_results for txn_id in part["transaction_ids"]
+                ]
+                execution_time = (datetime.now() - start_time).total_seconds() * 1000
+                
+                return {
+                    "rule_id": rule_id,
+                    "matched_count": sum(part["matched_count"] for part in partition_results),
+                    "unmatched_count": claimed_count - len(set(all_matched_txn_ids)),
+                    "transaction_ids": all_matched_txn_ids,
+                    "execution_time_ms": int(execution_time),
+                    "match_type": match_type,
+                    "incremental": since is not None,
+                    "key_index": key_signature,
+                    "partitions": partitions
+                }
+            
             # Fetch transactions for all sources
             transactions_by_source = await self._fetch_transactions_by_sources(
-                sources, channel_id
+                sources, channel_id, fields=fetch_fields, run_marker=run_marker,
+                candidate_filter=candidate_filter, candidate_params=candidate_params
             )
             
             # Find all matching groups using condition_groups logic
@@ -1019,7 +1137,8 @@ class ApplicationMatcher:
                 transactions_by_source,
                 conditions.get("logic_expression", []),
                 tolerance,
-                min_sources or len(sources)
+                min_sources or len(sources),
+                compiled=compiled
             )
             
             if dry_run:
@@ -1034,6 +1153,12 @@ class ApplicationMatcher:
                     "message": f"DRY RUN: Found {len(matched_groups)} matching groups"
                 }
             
+            # Matched rows leave the key index in the write-back's transaction
+            if key_signature:
+                await self.key_index.remove([
+                    txn["id"] for group in matched_groups for txn in group["transactions"]
+                ])
+            
             # ✅ Update matched transactions in database
             all_matched_txn_ids = await self._update_matched_transactions(
                 matched_groups,
@@ -1043,12 +1168,10 @@ class ApplicationMatcher:
                 recon_group_number=recon_group_number
             )
             
-            # ✅ Update unmatched transactions with the same recon_group_number
-            unmatched_count = await self._update_unmatched_transactions(
+            # ✅ Unmatched transactions already carry the same recon_group_number
+            unmatched_count = self._count_unmatched_transactions(
                 transactions_by_source,
-                all_matched_txn_ids,
-                rule_id,
-                recon_group_number
+                all_matched_txn_ids
             )
             
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -1059,83 +1182,476 @@ class ApplicationMatcher:
                 "unmatched_count": unmatched_count,
                 "transaction_ids": all_matched_txn_ids,
                 "execution_time_ms": int(execution_time),
-                "match_type": match_type
+                "match_type": match_type,
+                "incremental": since is not None,
+                "key_index": key_signature
             }
             
         except Exception as e:
             logger.error(f"Error in application matcher: {e}")
+            if not dry_run:
+                # Don't leave a half-claimed run in the session for the next rule
+                await self.db.rollback()
             raise
     
+    async def execute_partition(
+        self,
+        rule_id: int,
+        conditions: Dict[str, Any],
+        tolerance: Optional[Dict[str, Any]],
+        channel_id: Optional[int],
+        min_sources: Optional[int],
+        recon_group_number: str,
+        partition: int,
+        partitions: int
+    ) -> Dict[str, Any]:
+        """
+        Match one hash partition of a claimed run (see _execute_partitions)
+        
+        Reads the run's claimed rows whose key hashes to `partition`, matches
+        them and writes the groups back under the run's recon_group_number.
+        Rows with equal composite keys have equal raw key columns, so they
+        always land in the same partition and no match crosses partitions.
+        
+        Returns:
+            {"partition": int, "matched_count": int, "transaction_ids": List[int]}
+        """
+        sources = conditions.get("sources", [])
+        match_type = "PARTIAL" if min_sources and min_sources < len(sources) else "FULL"
+        
+        compiled = self.compile_rule(
+            {"id": rule_id, "conditions": conditions, "tolerance": tolerance}
+        )
+        key_columns = UnmatchedKeyIndex.key_columns(compiled.matching_fields)
+        
+        partition_filter = (
+            f" AND (hashtext({UnmatchedKeyIndex.key_expression(key_columns)}) & 2147483647)"
+            " % :partitions = :partition"
+        )
+        transactions_by_source = await self._fetch_transactions_by_sources(
+            sources, channel_id, fields=compiled.fetch_fields, run_marker=recon_group_number,
+            partition_filter=partition_filter,
+            partition_params={"partition": partition, "partitions": partitions}
+        )
+        
+        matched_groups = self._find_matching_groups(
+            transactions_by_source,
+            conditions.get("logic_expression", []),
+            tolerance,
+            min_sources or len(sources),
+            compiled=compiled
+        )
+        
+        if settings.MATCHING_KEY_INDEX:
+            await self.key_index.remove([
+                txn["id"] for group in matched_groups for txn in group["transactions"]
+            ])
+        
+        all_matched_txn_ids = await self._update_matched_transactions(
+            matched_groups,
+            rule_id,
+            match_type,
+            total_sources=len(sources),
+            recon_group_number=recon_group_number
+        )
+        logger.info(
+            f"🧩 Partition {partition + 1}/{partitions} of rule {rule_id}: "
+            f"{len(matched_groups)} groups"
+        )
+        
+        return {
+            "partition": partition,
+            "matched_count": len(matched_groups),
+            "transaction_ids": all_matched_txn_ids
+        }
+    
+    async def _execute_partitions(
+        self,
+        rule_id: int,
+        conditions: Dict[str, Any],
+        tolerance: Optional[Dict[str, Any]],
+        channel_id: Optional[int],
+        min_sources: Optional[int],
+        recon_group_number: str,
+        partitions: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fan a claimed run out to `partitions` match_rule_partition tasks and
+        wait for all of them
+        
+        The tasks go to MATCHING_PARTITION_QUEUE, which must be consumed by
+        workers other than the ones running matching rules: the caller blocks
+        a worker slot while it waits (and keeps the run's source locks), so
+        workers that share the queue with others refuse to start
+        (celery_app.check_partition_queue).
+        """
+        from celery import group
+        from celery.result import allow_join_result
+        from app.workers.tasks import match_rule_partition
+        
+        job = group(
+            match_rule_partition.s(
+                rule_id=rule_id,
+                conditions=conditions,
+                tolerance=tolerance,
+                channel_id=channel_id,
+                min_sources=min_sources,
+                recon_group_number=recon_group_number,
+                partition=partition,
+                partitions=partitions
+            )
+            for partition in range(partitions)
+        ).apply_async()
+        logger.info(f"🧩 Rule {rule_id} split into {partitions} key partitions (run {recon_group_number})")
+        
+        def wait_for_partitions():
+            with allow_join_result():
+                return job.get(timeout=settings.CELERY_TASK_TIME_LIMIT)
+        
+        return await asyncio.to_thread(wait_for_partitions)
+    
+    async def _mark_run_transactions(
+        self,
+        sources: List[str],
+        channel_id: Optional[int],
+        recon_group_number: str,
+        candidate_filter: str = "",
+        candidate_params: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Claim every unmatched transaction of the rule's sources for this run
+        (restricted by candidate_filter in incremental runs)
+        
+        The rows are put in their final "unmatched" state (match_status = 0,
+        match fields cleared) and stamped with the run's recon_group_number.
+        The fetch then reads exactly this snapshot back, and the matched
+        write-back overwrites the rows that match, so whatever still carries
+        the marker with match_status = 0 afterwards is this run's unmatched set.
+        
+        Returns:
+            Number of transactions claimed
+        """
+        query, params = self._claim_query(
+            sources, channel_id, recon_group_number,
+            candidate_filter=candidate_filter, candidate_params=candidate_params
+        )
+        
+        result = await self.db.execute(text(query), params)
+        logger.info(f"📌 Claimed {result.rowcount} unmatched transactions for run {recon_group_number}")
+        
+        return result.rowcount
+    
+    @staticmethod
+    def _claim_query(
+        sources: List[str],
+        channel_id: Optional[int],
+        recon_group_number: str,
+        candidate_filter: str = "",
+        candidate_params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Claim UPDATE of _mark_run_transactions
+        
+        Returns:
+            (query, bind parameters)
+        """
+        query = """
+            UPDATE tbl_txn_transactions t
+            SET 
+                match_status = 0,
+                reconciled_status = NULL,
+                reconciled_mode = NULL,
+                recon_reference_number = NULL,
+                match_rule_id = NULL,
+                match_conditon = NULL,
+                recon_group_number = :recon_group_number,
+                updated_at = NOW()
+            FROM tbl_cfg_source s
+            WHERE t.source_id = s.id
+              AND s.source_name = ANY(:sources)
+              AND (t.match_status IS NULL OR t.match_status = 0)
+        """
+        
+        params = {"recon_group_number": recon_group_number, "sources": list(sources)}
+        if channel_id:
+            query += " AND t.channel_id = :channel_id"
+            params["channel_id"] = channel_id
+        
+        query += candidate_filter
+        params.update(candidate_params or {})
+        
+        return query, params
+    
+    def _incremental_candidate_filter(
+        self,
+        matching_fields: Set[str],
+        sources: List[str],
+        channel_id: Optional[int],
+        since: datetime,
+        matched_since: Optional[datetime] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        SQL restriction (on alias t) for an incremental run
+        
+        Keeps transactions created after `since` plus older unmatched ones
+        whose value in one composite-key column also occurs among
+        - the new rows, or
+        - rows matched since `matched_since` (a match takes rows out of a
+          key, which can leave a partial match among the rest)
+        Two rows with equal composite keys always agree on every key column
+        (or both lack it), so no possible match is dropped. Only raw string
+        columns are usable (amount is compared as float).
+        
+        Returns:
+            (" AND (...)", params), or ("", {}) if no key column can be
+            pushed down and the run has to consider the whole backlog
+        """
+        column = next(
+            (
+                RAW_KEY_COLUMNS[field]
+                for field in RAW_KEY_PRIORITY
+                if field in matching_fields
+            ),
+            None
+        )
+        if column is None:
+            logger.info(f"No pushdown column in key fields {sorted(matching_fields)}, incremental run falls back to full backlog")
+            return "", {}
+        
+        changed = "(n.created_at > :inc_since AND (n.match_status IS NULL OR n.match_status = 0))"
+        params = {"inc_sources": list(sources), "inc_since": since}
+        if matched_since is not None:
+            changed = f"({changed} OR (n.match_status IN (1, 2) AND n.updated_at >= :inc_matched_since))"
+            params["inc_matched_since"] = matched_since
+        
+        new_rows = f"""
+            SELECT n.{column}
+            FROM tbl_txn_transactions n
+            JOIN tbl_cfg_source ns ON n.source_id = ns.id
+            WHERE ns.source_name = ANY(:inc_sources)
+              AND {changed}
+        """
+        if channel_id:
+            new_rows += " AND n.channel_id = :inc_channel_id"
+            params["inc_channel_id"] = channel_id
+        
+        candidate_filter = f"""
+            AND (
+                t.created_at > :inc_since
+                OR t.{column} IN ({new_rows})
+                OR (t.{column} IS NULL AND EXISTS ({new_rows} AND n.{column} IS NULL))
+            )
+        """
+        logger.info(f"🔁 Incremental run since {since}, probing old rows by {column}")
+        
+        return candidate_filter, params
+    
     async def _fetch_transactions_by_sources(
         self,
         sources: List[str],
-        channel_id: Optional[int]
+        channel_id: Optional[int],
+        fields: Optional[Set[str]] = None,
+        run_marker: Optional[str] = None,
+        candidate_filter: str = "",
+        candidate_params: Optional[Dict[str, Any]] = None,
+        partition_filter: str = "",
+        partition_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Fetch unmatched transactions for all sources
         
+        With MATCHING_FETCH_MODE="stream" rows are read through a server-side
+        cursor (yield_per) into a SourceColumns store per source, keeping only
+        `fields`. With "eager" every row is fetched at once into a dict.
+        
+        Args:
+            sources: Source names of the rule
+            channel_id: Optional channel filter
+            fields: Fields the rule reads (None = all): streaming mode keeps
+                    only these, and only their otherDetails keys are fetched
+            run_marker: recon_group_number stamped by _mark_run_transactions;
+                        when given, only that run's snapshot is read
+            candidate_filter: Incremental-run restriction (already part of the
+                              snapshot when run_marker is given)
+            candidate_params: Bind parameters of candidate_filter
+            partition_filter: Key hash partition to read (partitioned runs)
+            partition_params: Bind parameters of partition_filter
+        
         Returns:
             {
                 "ATM": [{"id": 1, "rrn": "ABC", "amount": 100, ...}, ...],
                 "SWITCH": [...],
                 ...
             }
+            (SourceColumns instead of lists in streaming mode)
         """
         transactions = {}
+        details_columns, details_params, raw_columns = self._other_details_columns(fields)
         
         for source_name in sources:
-            # Build query for this source
-            query = """
-                SELECT 
-                    t.id,
-                    t.reference_number as rrn,
-                    t.amount,
-                    t.date as transaction_date,
-                    t.account_number,
-                    t.ccy as currency_code,
-                    t."otherDetails",
-                    t.comment,
-                    s.source_name
-                FROM tbl_txn_transactions t
-                JOIN tbl_cfg_source s ON t.source_id = s.id
-                WHERE s.source_name = :source_name
-                  AND (t.match_status IS NULL OR t.match_status = 0)
-            """
-            
-            if channel_id:
-                query += " AND t.channel_id = :channel_id"
-            
-            params = {"source_name": source_name}
-            if channel_id:
-                params["channel_id"] = channel_id
+            query, params = self._fetch_query(
+                source_name, channel_id, details_columns, details_params,
+                run_marker=run_marker,
+                candidate_filter=candidate_filter, candidate_params=candidate_params,
+                partition_filter=partition_filter, partition_params=partition_params
+            )
+            
+            if settings.MATCHING_FETCH_MODE == "stream":
+                source_columns = SourceColumns(source_name, fields, aliases=FIELD_ALIASES)
+                
+                result = await self.db.stream(
+                    text(query).execution_options(yield_per=settings.MATCHING_FETCH_BATCH_SIZE),
+                    params
+                )
+                async for partition in result.partitions():
+                    for row in partition:
+                        source_columns.append(self._row_to_transaction(row, raw_columns))
+                
+                transactions[source_name] = source_columns.finalize()
+                logger.info(
+                    f"Streamed {len(source_columns)} transactions from {source_name} "
+                    f"({source_columns.memory_bytes() / 1024 / 1024:.1f} MB columns, fields={source_columns.fields})"
+                )
+                continue
             
             result = await self.db.execute(text(query), params)
             rows = result.fetchall()
             
-            transactions[source_name] = [
-                {
-                    "id": row.id,
-                    "rrn": row.rrn,
-                    "reference_number": row.rrn,
-                    "amount": float(row.amount) if row.amount else None,
-                    "transaction_date": row.transaction_date,
-                    "date": row.transaction_date,
-                    "account_number": row.account_number,
-                    "currency_code": row.currency_code,
-                    "otherDetails": row.otherDetails,
-                    "comment": row.comment,
-                    "source_name": row.source_name,
-                    # Parse otherDetails if it contains pipe-separated values
-                    # Format: CARD|TERMINAL|MERCHANT
-                    **(self._parse_other_details(row.otherDetails) if row.otherDetails else {})
-                }
-                for row in rows
-            ]
+            transactions[source_name] = [self._row_to_transaction(row, raw_columns) for row in rows]
             
             logger.info(f"Fetched {len(transactions[source_name])} transactions from {source_name}")
         
         return transactions
     
+    @staticmethod
+    def _fetch_query(
+        source_name: str,
+        channel_id: Optional[int],
+        details_columns: str,
+        details_params: Dict[str, Any],
+        run_marker: Optional[str] = None,
+        candidate_filter: str = "",
+        candidate_params: Optional[Dict[str, Any]] = None,
+        partition_filter: str = "",
+        partition_params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Fetch query of one source (see _fetch_transactions_by_sources)
+        
+        Returns:
+            (query, bind parameters)
+        """
+        query = f"""
+            SELECT 
+                t.id,
+                t.reference_number as rrn,
+                t.amount,
+                CAST(t.amount_numeric AS double precision) AS amount_value,
+                t.date as transaction_date,
+                t.txn_ts,
+                t.account_number,
+                t.ccy as currency_code,
+                t.comment,
+                s.source_name,
+                {details_columns}
+            FROM tbl_txn_transactions t
+            JOIN tbl_cfg_source s ON t.source_id = s.id
+            WHERE s.source_name = :source_name
+        """
+        
+        params = {"source_name": source_name, **details_params}
+        if run_marker:
+            query += " AND t.recon_group_number = :run_marker AND t.match_status = 0"
+            params["run_marker"] = run_marker
+        else:
+            query += " AND (t.match_status IS NULL OR t.match_status = 0)"
+            query += candidate_filter
+            params.update(candidate_params or {})
+        
+        if channel_id:
+            query += " AND t.channel_id = :channel_id"
+            params["channel_id"] = channel_id
+        
+        query += partition_filter
+        params.update(partition_params or {})
+        
+        return query, params
+    
+    def _other_details_columns(
+        self, fields: Optional[Set[str]]
+    ) -> Tuple[str, Dict[str, Any], List[Tuple[str, str]]]:
+        """
+        SELECT expressions for the otherDetails part of the fetch
+        
+        Raw file columns a rule reads are pushed down as JSONB lookups
+        ("otherDetails" ->> key), so only those values cross the wire. The
+        whole otherDetails is only read when the rule compares it (or no
+        fields are given), the legacy pipe-separated text only when the rule
+        reads one of its parts.
+        
+        Returns:
+            (select list, bind parameters, [(field, result column)] of the
+            pushed-down raw fields)
+        """
+        if fields is None:
+            return f'{OTHER_DETAILS_TEXT} AS "otherDetails", {LEGACY_DETAILS_TEXT} AS legacy_details', {}, []
+        
+        raw_fields = sorted(field for field in fields if field not in TRANSACTION_FIELDS)
+        columns = [
+            f'{OTHER_DETAILS_TEXT if "otherDetails" in fields else "NULL"} AS "otherDetails"',
+            f'{LEGACY_DETAILS_TEXT if LEGACY_DETAIL_FIELDS & set(raw_fields) else "NULL"} AS legacy_details',
+        ]
+        params = {}
+        raw_columns = []
+        for index, field in enumerate(raw_fields):
+            params[f"raw_key_{index}"] = field
+            columns.append(f't."otherDetails" ->> :raw_key_{index} AS raw_{index}')
+            raw_columns.append((field, f"raw_{index}"))
+        return ",\n                    ".join(columns), params, raw_columns
+    
+    def _row_to_transaction(
+        self, row, raw_columns: List[Tuple[str, str]] = ()
+    ) -> Dict[str, Any]:
+        """Build the transaction dict the matcher works with from a result row"""
+        transaction = {
+            "id": row.id,
+            "rrn": row.rrn,
+            "reference_number": row.rrn,
+            # amount_numeric arrives as a float; only rows not backfilled yet
+            # still need the string parsed
+            "amount": row.amount_value if row.amount_value is not None else (float(row.amount) if row.amount else None),
+            "transaction_date": row.transaction_date,
+            "date": row.transaction_date,
+            "txn_ts": row.txn_ts,
+            "account_number": row.account_number,
+            "currency_code": row.currency_code,
+            "otherDetails": row.otherDetails,
+            "comment": row.comment,
+            "source_name": row.source_name,
+        }
+        # Raw file columns; a key the row does not have stays absent (a rule
+        # reading it rejects the row, as for any missing field)
+        for field, column in raw_columns:
+            value = getattr(row, column)
+            if value is not None:
+                transaction[field] = value
+        if row.legacy_details:
+            # Rows stored before otherDetails became JSONB
+            # Format: CARD|TERMINAL|MERCHANT
+            transaction.update(self._parse_other_details(row.legacy_details))
+        return transaction
+    
+    def _fields_to_fetch(self, tree: ast.Expression) -> Set[str]:
+        """
+        Transaction fields a rule reads: every `SOURCE.field` of the logic
+        expression plus reference_number (used by partial matching)
+        """
+        fields = {"reference_number"}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+                fields.add(node.attr)
+        return fields
+    
     def _parse_other_details(self, other_details: str) -> Dict[str, Any]:
         """
         Parse otherDetails field which may contain pipe-separated values
@@ -1157,21 +1673,42 @@ class ApplicationMatcher:
             logger.warning(f"Error parsing otherDetails '{other_details}': {e}")
             return {}
     
-    def _find_matching_groups(
-        self,
-        transactions_by_source: Dict[str, List[Dict[str, Any]]],
-        condition_groups: List[Dict[str, Any]],
-        tolerance: Optional[Dict[str, Any]],
-        min_sources: int
-    ) -> List[Dict[str, Any]]:
+    def compile_rule(self, rule: Dict[str, Any]) -> CompiledRule:
         """
-        Find matching groups of transactions across sources.
+        Parse, validate and compile a rule once (see rule_cache)
         
-        Supports partial matching when min_sources < total_sources.
-        Groups transactions by reference_number (RRN) and validates conditions.
+        Args:
+            rule: Rule dict with id and conditions, optionally rule_name,
+                  channel_id, tolerance, updated_at and version_number
         """
-        from itertools import combinations
+        conditions = rule["conditions"]
+        tree = self._parse_logic_expression(conditions.get("logic_expression", []))
+        source_names = sorted({
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+        })
+        
+        return CompiledRule(
+            rule_id=rule["id"],
+            version=(rule.get("updated_at"), rule.get("version_number")),
+            rule_name=rule.get("rule_name"),
+            channel_id=rule.get("channel_id"),
+            conditions=conditions,
+            tolerance=rule.get("tolerance"),
+            tree=tree,
+            source_names=source_names,
+            matching_fields=self._extract_matching_fields(tree),
+            fetch_fields=self._fields_to_fetch(tree),
+            predicate=compile_predicate(tree, source_names)
+        )
+    
+    def _parse_logic_expression(self, condition_groups) -> ast.Expression:
+        """
+        Parse and validate a rule's logic_expression into an AST
         
+        Raises:
+            ValueError: If the expression contains anything besides
+                        SOURCE.field comparisons combined with and/or
+        """
         # Convert single = to == for Python comparison (frontend sends single =)
         # Example: "ATM.reference_number = SWITCH.reference_number" → "ATM.reference_number == SWITCH.reference_number"
         if isinstance(condition_groups, str):
@@ -1205,27 +1742,18 @@ class ApplicationMatcher:
 
         validate_ast(tree)
         
-        class SourceCollector(ast.NodeVisitor):
-            def __init__(self):
-                self.sources = set()
-
-            def visit_Name(self, node):
-                self.sources.add(node.id)
-
-        collector = SourceCollector()
-        collector.visit(tree)
-        source_names = sorted(collector.sources)
-        
-        logger.info(f"🔍 Finding matches: min_sources={min_sources}, total_sources={len(source_names)}, sources={source_names}")
-        
-        # Group transactions by matching key using ALL fields from equality conditions
-        # Extract fields that need to match from the logic expression
+        return tree
+    
+    def _extract_matching_fields(self, tree: ast.Expression) -> Set[str]:
+        """
+        Fields that make up the composite matching key: every field on the
+        left of an `==` in the logic expression
+        """
         matching_fields = set()
         
         # Parse the expression to find ALL equality fields
         # Look for patterns like "source1.field == source2.field"
-        import re
-        logic_expr_str = ast.unparse(tree) if hasattr(ast, 'unparse') else condition_expr
+        logic_expr_str = ast.unparse(tree)
         
         # Find all field comparisons - this captures any field used in equality checks
         # Pattern matches: "source.field ==" (captures "field")
@@ -1240,8 +1768,50 @@ class ApplicationMatcher:
             logger.warning("⚠️  No equality fields found in condition, defaulting to reference_number only")
             matching_fields.add("reference_number")
         
+        return matching_fields
+    
+    def _find_matching_groups(
+        self,
+        transactions_by_source: Dict[str, List[Dict[str, Any]]],
+        condition_groups: List[Dict[str, Any]],
+        tolerance: Optional[Dict[str, Any]],
+        min_sources: int,
+        compiled: Optional[CompiledRule] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find matching groups of transactions across sources.
+        
+        Supports partial matching when min_sources < total_sources.
+        Groups transactions by reference_number (RRN) and validates conditions.
+        `compiled` (the rule's CompiledRule) skips re-parsing condition_groups.
+        """
+        from itertools import combinations
+        
+        if compiled is None:
+            compiled = self.compile_rule({"id": None, "conditions": {"logic_expression": condition_groups}})
+        
+        tree = compiled.tree
+        source_names = compiled.source_names
+        
+        logger.info(f"🔍 Finding matches: min_sources={min_sources}, total_sources={len(source_names)}, sources={source_names}")
+        
+        # Group transactions by matching key using ALL fields from equality conditions
+        matching_fields = compiled.matching_fields
+        
         logger.info(f"   Grouping transactions by composite key with fields: {sorted(matching_fields)}")
 
+        # Vectorized hash join over the composite key (same groups, same order)
+        if self.engine == "columnar" and ColumnarJoinEngine.supports(tree):
+            columnar_engine = ColumnarJoinEngine(
+                tree,
+                source_names,
+                sorted(matching_fields),
+                min_sources,
+                max_candidates_per_key=settings.MATCHING_MAX_CANDIDATES_PER_KEY
+            )
+            matched_groups = columnar_engine.find_matching_groups(transactions_by_source)
+            logger.info(f"Found {len(matched_groups)} matching groups")
+            return matched_groups
         
         # Group transactions by composite key using ALL matching fields
         txns_by_key = {}
@@ -1285,7 +1855,7 @@ class ApplicationMatcher:
         
         # Find matching groups
         matched_groups = []
-        compiled_expr = compile(tree, "<rule>", "eval")
+        predicate = compiled.predicate
         
         for composite_key, sources_dict in txns_by_key.items():
             # Check if we have enough sources for this key
@@ -1304,25 +1874,14 @@ class ApplicationMatcher:
                 source_lists = [sources_dict[src] for src in source_names]
                 
                 for txn_tuple in product(*source_lists):
-                    context = {
-                        src: SimpleNamespace(**txn)
-                        for src, txn in zip(source_names, txn_tuple)
-                    }
-                    
-                    try:
-                        if eval(compiled_expr, {}, context):
-                            # Extract RRN from composite key for logging
-                            rrn_value = composite_key.split("|")[0] if "|" in composite_key else composite_key
-                            logger.info(f"✅ Match Found (FULL) --> Key={composite_key}, IDs={[context[src].id for src in source_names]}")
-                            matched_groups.append({
-                                "transactions": [txn for txn in txn_tuple],
-                                "match_key": composite_key,
-                                "sources_matched": source_names
-                            })
-                            break  # Take first matching combination for this key
-                    except Exception as e:
-                        logger.debug(f"Condition evaluation error for key {composite_key}: {e}")
-                        continue
+                    if predicate(txn_tuple):
+                        logger.info(f"✅ Match Found (FULL) --> Key={composite_key}, IDs={[txn.get('id') for txn in txn_tuple]}")
+                        matched_groups.append({
+                            "transactions": [txn for txn in txn_tuple],
+                            "match_key": composite_key,
+                            "sources_matched": source_names
+                        })
+                        break  # Take first matching combination for this key
             
             else:
                 # Partial match - we have min_sources <= num_sources < total_sources
@@ -1337,35 +1896,16 @@ class ApplicationMatcher:
                         source_lists = [sources_dict[src] for src in source_combo]
                         
                         for txn_tuple in product(*source_lists):
-                            # Build context for only the available sources
-                            context = {
-                                src: SimpleNamespace(**txn)
-                                for src, txn in zip(source_combo, txn_tuple)
-                            }
-                            
-                            # Build a simplified expression for partial match
-                            # Check if all available sources have matching reference numbers
-                            try:
-                                # Create a chain of equality checks: src1.reference_number == src2.reference_number == src3.reference_number
-                                partial_expr = " and ".join([
-                                    f"{source_combo[i]}.reference_number == {source_combo[i+1]}.reference_number"
-                                    for i in range(len(source_combo) - 1)
-                                ])
-                                
-                                logger.debug(f"         Evaluating: {partial_expr}")
-                                if eval(partial_expr, {}, context):
-                                    logger.warning(f"✅ Match Found (PARTIAL) --> Key={composite_key}, sources={source_combo}, IDs={[context[src].id for src in source_combo]}")
-                                    matched_groups.append({
-                                        "transactions": [txn for txn in txn_tuple],
-                                        "match_key": composite_key,
-                                        "sources_matched": list(source_combo)
-                                    })
-                                    break  # Take first matching combination
-                                else:
-                                    logger.debug(f"         Expression evaluated to False")
-                            except Exception as e:
-                                logger.warning(f"Partial match evaluation error for key {composite_key}: {e}")
-                                continue
+                            # Partial match: src1.reference_number == src2.reference_number == ...
+                            # across the available sources
+                            if ColumnarJoinEngine._reference_chain_matches(txn_tuple):
+                                logger.warning(f"✅ Match Found (PARTIAL) --> Key={composite_key}, sources={source_combo}, IDs={[txn.get('id') for txn in txn_tuple]}")
+                                matched_groups.append({
+                                    "transactions": [txn for txn in txn_tuple],
+                                    "match_key": composite_key,
+                                    "sources_matched": list(source_combo)
+                                })
+                                break  # Take first matching combination
                         else:
                             continue
                         break  # Found a match, stop trying smaller combinations
@@ -1474,6 +2014,11 @@ class ApplicationMatcher:
         
         # Get values for this field
         values = [txn.get(field) for txn in txns_to_compare]
+        if operator == "date_within_days" and FIELD_ALIASES.get(field, field) == "date":
+            # Typed timestamps when every side has one (no string parsing)
+            typed = [txn.get("txn_ts") for txn in txns_to_compare]
+            if None not in typed:
+                values = typed
         
         # Apply operator
         if operator == "equals":
@@ -1831,6 +2376,9 @@ class ApplicationMatcher:
         Update all matched transactions in database
         Set match_status, reconciled_status, matched_with_txn_id
         
+        Assignments are written set-based in chunks of
+        MATCHING_WRITEBACK_CHUNK_SIZE transactions (see MatchWriteBack).
+        
         Args:
             matched_groups: List of matched transaction groups
             rule_id: ID of the matching rule
@@ -1840,6 +2388,26 @@ class ApplicationMatcher:
         """
         all_txn_ids = []
         
+        # All group assignments go out as unnest() arrays, one UPDATE per chunk
+        writer = MatchWriteBack(
+            self.db,
+            columns={
+                "match_status": "integer",
+                "reconciled_status": "boolean",
+                "reconciled_mode": "integer",
+                "recon_reference_number": "text",
+                "match_conditon": "text",
+            },
+            constants={
+                "match_rule_id": rule_id,
+                "recon_group_number": recon_group_number,
+            },
+            chunk_size=settings.MATCHING_WRITEBACK_CHUNK_SIZE,
+            commit_per_chunk=settings.MATCHING_WRITEBACK_COMMIT_PER_CHUNK,
+            update_rollup=settings.RECON_ROLLUP
+        )
+        status_counts = {1: 0, 2: 0}
+        
         for group in matched_groups:
             transactions = group["transactions"]
             txn_ids = [txn["id"] for txn in transactions]
@@ -1860,111 +2428,58 @@ class ApplicationMatcher:
             else:
                 match_status = 1  # Full match
                 actual_match_type = "FULL"
-                reconciled_mode = True
+                reconciled_mode = 1
                 recon_reference_number = self.generate_reference()
                 reconciled_status = True
             
-            logger.warning(
-                f"💾 Updating {len(txn_ids)} transactions: sources_matched={sources_matched}, "
-                f"total_sources={total_sources}, match_status={match_status} ({actual_match_type})"
-            )
+            status_counts[match_status] += len(txn_ids)
             
             # Create match condition description
             match_condition = f"Matched by rule {rule_id} ({actual_match_type}: {sources_matched} sources) - Application Layer"
             
-            # Update each transaction
-            update_query = """
-                UPDATE tbl_txn_transactions
-                SET 
-                    match_status = :match_status,
-                    reconciled_status = :reconciled_status,
-                    reconciled_mode = :reconciled_mode,
-                    recon_reference_number = :recon_reference_number,
-                    match_rule_id = :rule_id,
-                    match_conditon = :match_condition,
-                    recon_group_number = :recon_group_number,
-                    updated_at = NOW()
-                WHERE id = ANY(:txn_ids)
-            """
-            
-            await self.db.execute(
-                text(update_query),
-                {
-                    "match_status": match_status,
-                    "reconciled_mode": reconciled_mode,
-                    "reconciled_status": reconciled_status,
-                    "recon_reference_number": recon_reference_number,
-                    "rule_id": rule_id,
-                    "match_condition": match_condition,
-                    "recon_group_number": recon_group_number,
-                    "txn_ids": txn_ids
-                }
+            await writer.add(
+                txn_ids,
+                match_status=match_status,
+                reconciled_status=reconciled_status,
+                reconciled_mode=reconciled_mode,
+                recon_reference_number=recon_reference_number,
+                match_conditon=match_condition
             )
         
+        await writer.flush()
+        
+        logger.warning(
+            f"💾 Updated {len(all_txn_ids)} transactions in {writer.chunks_written} chunk(s): "
+            f"{status_counts[1]} FULL, {status_counts[2]} PARTIAL, total_sources={total_sources}"
+        )
+        
         await self.db.commit()
         logger.info(f"Updated {len(all_txn_ids)} matched transactions")
         
         return all_txn_ids
     
-    async def _update_unmatched_transactions(
+    def _count_unmatched_transactions(
         self,
         transactions_by_source: Dict[str, List[Dict[str, Any]]],
-        matched_txn_ids: List[int],
-        rule_id: int,
-        recon_group_number: str
+        matched_txn_ids: List[int]
     ) -> int:
         """
-        Update all unmatched transactions with recon_group_number
+        Count the unmatched transactions of this run
+        
+        Nothing is written here: _mark_run_transactions already reset every
+        fetched row to match_status = 0 with the run's recon_group_number, and
+        _update_matched_transactions has overwritten the matched ones.
         
         Args:
             transactions_by_source: All fetched transactions
             matched_txn_ids: IDs of transactions that were matched
-            rule_id: ID of the matching rule
-            recon_group_number: Recon group number for this run
             
         Returns:
-            Count of unmatched transactions updated
-        """
-        # Collect all transaction IDs from all sources
-        all_txn_ids = []
-        for source_txns in transactions_by_source.values():
-            all_txn_ids.extend([txn["id"] for txn in source_txns])
-        
-        # Find unmatched transactions (those NOT in matched_txn_ids)
-        unmatched_txn_ids = [tid for tid in all_txn_ids if tid not in matched_txn_ids]
-        
-        if not unmatched_txn_ids:
-            logger.info("No unmatched transactions to update")
-            return 0
-        
-        logger.info(f"📝 Updating {len(unmatched_txn_ids)} unmatched transactions with recon_group_number")
-        
-        # Update unmatched transactions
-        update_query = """
-            UPDATE tbl_txn_transactions
-            SET 
-                match_status = 0,
-                reconciled_status = NULL,
-                reconciled_mode = NULL,
-                recon_reference_number = NULL,
-                match_rule_id = NULL,
-                match_conditon = NULL,
-                recon_group_number = :recon_group_number,
-                updated_at = NOW()
-            WHERE id = ANY(:txn_ids)
+            Count of unmatched transactions
         """
+        fetched_count = sum(len(source_txns) for source_txns in transactions_by_source.values())
+        unmatched_count = fetched_count - len(set(matched_txn_ids))
         
-        # match_condition = f"Processed by rule {rule_id} (UNMATCHED) - Application Layer"
-        
-        await self.db.execute(
-            text(update_query),
-            {
-                "recon_group_number": recon_group_number,
-                "txn_ids": unmatched_txn_ids
-            }
-        )
-        
-        await self.db.commit()
-        logger.info(f"✅ Updated {len(unmatched_txn_ids)} unmatched transactions")
+        logger.info(f"✅ {unmatched_count} unmatched transactions left with this run's recon_group_number")
         
-        return len(unmatched_txn_ids)
+        return unmatched_count
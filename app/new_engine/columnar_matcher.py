@@ -0,0 +1,554 @@
+"""
+Columnar Join Engine
+Vectorized replacement for the per-key product/eval loop of
+ApplicationMatcher._find_matching_groups.
+
+How it works:
+- Every referenced field of every source is laid out as a NumPy object column
+- The composite key (all `field ==` equality fields of the logic_expression)
+  is built column-wise and factorized into one integer code per transaction
+- Keys present in ALL sources are hash-joined with pandas merge, which yields
+  exactly the candidate tuples the row-wise path walks with itertools.product
+- The logic_expression is evaluated once per column instead of once per tuple
+- Partial keys (min_sources <= sources < total) and keys whose candidate
+  product is too large keep the row-wise evaluation
+
+The output is identical to the row-wise path: same groups in the same order,
+same match_key strings and the first matching combination for every key.
+"""
+
+from typing import Dict, Any, List, Tuple
+from itertools import combinations, product
+import ast
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.new_engine.transaction_columns import SourceColumns
+from app.new_engine.rule_compiler import compile_predicate
+
+logger = logging.getLogger(__name__)
+
+# Marks a field the transaction does not have (SimpleNamespace would raise AttributeError)
+_MISSING = object()
+
+# Fields that are keyed on "rrn or reference_number" (same aliasing as the row-wise path)
+REFERENCE_FIELDS = ("rrn", "reference_number")
+
+# Keys whose candidate product exceeds this are evaluated row-wise with early exit
+DEFAULT_MAX_CANDIDATES_PER_KEY = 10_000
+
+# Upper bound of candidate tuples materialized per merge batch
+DEFAULT_CANDIDATE_BATCH_SIZE = 2_000_000
+
+
+class ColumnarJoinEngine:
+    """
+    Hash-join based matcher for a single parsed logic_expression
+    """
+
+    def __init__(
+        self,
+        tree: ast.Expression,
+        source_names: List[str],
+        matching_fields: List[str],
+        min_sources: int,
+        max_candidates_per_key: int = DEFAULT_MAX_CANDIDATES_PER_KEY,
+        candidate_batch_size: int = DEFAULT_CANDIDATE_BATCH_SIZE
+    ):
+        """
+        Args:
+            tree: Validated logic_expression AST (mode="eval")
+            source_names: Sorted source names referenced by the expression
+            matching_fields: Equality fields that make up the composite key
+            min_sources: Minimum sources required for partial matching
+            max_candidates_per_key: Row-wise fallback threshold per key
+            candidate_batch_size: Max candidate tuples per merge batch
+        """
+        self.tree = tree
+        self.source_names = source_names
+        self.key_fields = sorted(matching_fields)
+        self.min_sources = min_sources
+        self.max_candidates_per_key = max_candidates_per_key
+        self.candidate_batch_size = candidate_batch_size
+        self.predicate = compile_predicate(tree, source_names)
+        self.referenced_fields = self._collect_referenced_fields(tree)
+
+    # ------------------------------------------------------------------
+    # Expression support
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def supports(tree: ast.Expression) -> bool:
+        """
+        Check whether every operand of the expression is a plain `SOURCE.field`
+        attribute, which is what the column evaluator understands.
+        Anything else (e.g. `ATM.field.attr` or a bare source compared to
+        something) is left to the row-wise path.
+        """
+        def operand_ok(node) -> bool:
+            return isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+
+        def node_ok(node) -> bool:
+            if isinstance(node, ast.Expression):
+                return node_ok(node.body)
+            if isinstance(node, ast.BoolOp):
+                return all(node_ok(value) for value in node.values)
+            if isinstance(node, ast.Compare):
+                return (
+                    all(isinstance(op, ast.Eq) for op in node.ops)
+                    and operand_ok(node.left)
+                    and all(operand_ok(c) for c in node.comparators)
+                )
+            if isinstance(node, (ast.Attribute, ast.Name)):
+                return isinstance(node, ast.Name) or operand_ok(node)
+            return False
+
+        return node_ok(tree)
+
+    @staticmethod
+    def _collect_referenced_fields(tree: ast.Expression) -> Dict[str, List[str]]:
+        """Return {source_name: [field, ...]} for every `SOURCE.field` in the expression"""
+        fields: Dict[str, List[str]] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+                source_fields = fields.setdefault(node.value.id, [])
+                if node.attr not in source_fields:
+                    source_fields.append(node.attr)
+        return fields
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    def find_matching_groups(
+        self,
+        transactions_by_source: Dict[str, List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Find matching groups of transactions across sources.
+
+        transactions_by_source values may be lists of transaction dicts or
+        SourceColumns stores (streaming fetch); only transactions that end up
+        in a group or in a row-wise fallback are materialized as dicts.
+
+        Returns the same structure as ApplicationMatcher._find_matching_groups:
+        [{"transactions": [...], "match_key": str, "sources_matched": [...]}, ...]
+        """
+        source_txns = {
+            src: transactions_by_source.get(src, []) for src in self.source_names
+        }
+
+        # Step 1: composite key per transaction, factorized across all sources
+        # in first-appearance order (= insertion order of the row-wise dict)
+        source_codes, key_values = self._factorize_composite_keys(source_txns)
+        n_keys = len(key_values)
+
+        logger.info(
+            f"   Columnar engine: {sum(len(t) for t in source_txns.values())} transactions, "
+            f"{n_keys} unique matching keys, key fields={self.key_fields}"
+        )
+
+        if n_keys == 0:
+            return []
+
+        # Step 2: per-key source presence and multiplicity
+        counts = np.zeros((len(self.source_names), n_keys), dtype=np.int64)
+        for i, src in enumerate(self.source_names):
+            codes = source_codes[src]
+            counts[i] = np.bincount(codes[codes >= 0], minlength=n_keys)
+
+        num_sources = (counts > 0).sum(axis=0)
+        candidate_counts = counts.astype(np.float64).prod(axis=0)
+
+        full_mask = (
+            (num_sources == len(self.source_names))
+            & (num_sources >= self.min_sources)
+        )
+        heavy_mask = full_mask & (candidate_counts > self.max_candidates_per_key)
+        join_mask = full_mask & ~heavy_mask
+        partial_mask = (
+            (num_sources >= self.min_sources)
+            & (num_sources < len(self.source_names))
+        )
+
+        logger.info(
+            f"   Keys: {int(join_mask.sum())} hash-joined, {int(heavy_mask.sum())} row-wise (large product), "
+            f"{int(partial_mask.sum())} partial, "
+            f"{int(n_keys - join_mask.sum() - heavy_mask.sum() - partial_mask.sum())} skipped (< {self.min_sources} sources)"
+        )
+
+        groups_by_key: Dict[int, List[Dict[str, Any]]] = {}
+
+        # Step 3: vectorized join + predicate for full keys
+        if join_mask.any():
+            columns = self._build_columns(source_txns)
+            for code, positions in self._join_full_keys(
+                source_codes, join_mask, candidate_counts, columns
+            ):
+                groups_by_key[code] = [{
+                    "transactions": [
+                        source_txns[src][pos] for src, pos in zip(self.source_names, positions)
+                    ],
+                    "match_key": key_values[code],
+                    "sources_matched": self.source_names
+                }]
+
+        # Step 4: row-wise evaluation for the remaining keys
+        rowwise_mask = heavy_mask | partial_mask
+        if rowwise_mask.any():
+            rows_by_key = self._group_rows_by_key(source_txns, source_codes, rowwise_mask)
+            for code, sources_dict in rows_by_key.items():
+                if heavy_mask[code]:
+                    groups = self._match_full_key_rowwise(key_values[code], sources_dict)
+                else:
+                    groups = self._match_partial_key(key_values[code], sources_dict)
+                if groups:
+                    groups_by_key[code] = groups
+
+        matched_groups = []
+        for code in sorted(groups_by_key):
+            matched_groups.extend(groups_by_key[code])
+        return matched_groups
+
+    # ------------------------------------------------------------------
+    # Key factorization
+    # ------------------------------------------------------------------
+
+    def _factorize_composite_keys(
+        self,
+        source_txns: Dict[str, List[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        Build the "field=value|field=value" composite key column-wise and
+        factorize it into integer codes shared by all sources.
+
+        Returns:
+            ({source_name: codes (-1 = no key, skipped)}, key_values)
+        """
+        key_arrays = []
+        for src in self.source_names:
+            key_arrays.append(self._composite_key_column(source_txns[src]))
+
+        all_keys = np.concatenate(key_arrays) if key_arrays else np.empty(0, dtype=object)
+        codes, uniques = pd.factorize(all_keys, use_na_sentinel=True)
+
+        source_codes = {}
+        offset = 0
+        for src, keys in zip(self.source_names, key_arrays):
+            source_codes[src] = codes[offset:offset + len(keys)].astype(np.int64)
+            offset += len(keys)
+
+        return source_codes, np.asarray(uniques, dtype=object)
+
+    def _composite_key_column(self, txns: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Composite key for every transaction of one source.
+        None values are left out of the key, transactions without any key
+        part get None (factorized to -1 and skipped), as in the row-wise path.
+        """
+        n = len(txns)
+        keys = np.full(n, None, dtype=object)
+        has_key = np.zeros(n, dtype=bool)
+
+        for field in self.key_fields:
+            if field in REFERENCE_FIELDS:
+                values = np.fromiter(
+                    (
+                        rrn or reference_number
+                        for rrn, reference_number in zip(
+                            _field_column(txns, "rrn"), _field_column(txns, "reference_number")
+                        )
+                    ),
+                    dtype=object, count=n
+                )
+            else:
+                values = _field_column(txns, field)
+
+            present = np.not_equal(values, None).astype(bool)
+            if not present.any():
+                continue
+
+            parts = np.full(n, None, dtype=object)
+            parts[present] = np.add(f"{field}=", values[present].astype(str).astype(object))
+
+            append = present & has_key
+            first = present & ~has_key
+            keys[append] = keys[append] + "|" + parts[append]
+            keys[first] = parts[first]
+            has_key |= present
+
+        return keys
+
+    # ------------------------------------------------------------------
+    # Vectorized join for full keys
+    # ------------------------------------------------------------------
+
+    def _build_columns(
+        self,
+        source_txns: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[Tuple[str, str], np.ndarray]:
+        """Object column per (source, field) referenced in the expression"""
+        columns = {}
+        for src, fields in self.referenced_fields.items():
+            txns = source_txns.get(src, [])
+            for field in fields:
+                columns[(src, field)] = _field_column(txns, field, _MISSING)
+        return columns
+
+    def _join_full_keys(
+        self,
+        source_codes: Dict[str, np.ndarray],
+        join_mask: np.ndarray,
+        candidate_counts: np.ndarray,
+        columns: Dict[Tuple[str, str], np.ndarray]
+    ):
+        """
+        Yield (key_code, (pos_source_1, pos_source_2, ...)) for the first
+        candidate tuple of every key that satisfies the expression.
+
+        Keys are processed in batches so a batch never materializes more than
+        candidate_batch_size candidate tuples.
+        """
+        join_codes = np.flatnonzero(join_mask)
+        cumulative = np.cumsum(candidate_counts[join_codes])
+
+        start = 0
+        while start < len(join_codes):
+            budget = (cumulative[start - 1] if start else 0) + self.candidate_batch_size
+            end = max(start + 1, int(np.searchsorted(cumulative, budget, side="right")))
+            batch_mask = np.zeros(len(join_mask), dtype=bool)
+            batch_mask[join_codes[start:end]] = True
+            yield from self._join_batch(source_codes, batch_mask, columns)
+            start = end
+
+    def _join_batch(
+        self,
+        source_codes: Dict[str, np.ndarray],
+        batch_mask: np.ndarray,
+        columns: Dict[Tuple[str, str], np.ndarray]
+    ):
+        # Multi-way hash join on the key code -> every candidate tuple per key
+        candidates = None
+        for i, src in enumerate(self.source_names):
+            codes = source_codes[src]
+            rows = np.flatnonzero((codes >= 0) & batch_mask[np.maximum(codes, 0)])
+            frame = pd.DataFrame({"_k": codes[rows], f"_p{i}": rows})
+            candidates = frame if candidates is None else candidates.merge(
+                frame, on="_k", how="inner", sort=False
+            )
+
+        if candidates is None or candidates.empty:
+            return
+
+        # Same order as itertools.product within a key: lexicographic by position
+        position_cols = [f"_p{i}" for i in range(len(self.source_names))]
+        order = np.lexsort(
+            [candidates[col].to_numpy() for col in reversed(position_cols)]
+            + [candidates["_k"].to_numpy()]
+        )
+        key_codes = candidates["_k"].to_numpy()[order]
+        positions = {
+            src: candidates[col].to_numpy()[order]
+            for src, col in zip(self.source_names, position_cols)
+        }
+
+        mask = _ColumnEvaluator(columns, positions, len(order)).evaluate(self.tree)
+
+        matched_codes = key_codes[mask]
+        if len(matched_codes) == 0:
+            return
+
+        # First matching combination for every key
+        unique_codes, first_index = np.unique(matched_codes, return_index=True)
+        matched_positions = [positions[src][mask][first_index] for src in self.source_names]
+
+        for j, code in enumerate(unique_codes):
+            yield int(code), tuple(int(p[j]) for p in matched_positions)
+
+    # ------------------------------------------------------------------
+    # Row-wise fallbacks (same semantics as the original loop)
+    # ------------------------------------------------------------------
+
+    def _group_rows_by_key(
+        self,
+        source_txns: Dict[str, List[Dict[str, Any]]],
+        source_codes: Dict[str, np.ndarray],
+        key_mask: np.ndarray
+    ) -> Dict[int, Dict[str, List[Dict[str, Any]]]]:
+        """{key_code: {source_name: [txn, ...]}} for the selected keys only"""
+        rows_by_key: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+        for src in self.source_names:
+            codes = source_codes[src]
+            txns = source_txns[src]
+            for row in np.flatnonzero((codes >= 0) & key_mask[np.maximum(codes, 0)]):
+                rows_by_key.setdefault(int(codes[row]), {}).setdefault(src, []).append(txns[row])
+        return rows_by_key
+
+    def _match_full_key_rowwise(
+        self,
+        composite_key: str,
+        sources_dict: Dict[str, List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Cartesian product with early exit, for keys with very large products"""
+        source_lists = [sources_dict[src] for src in self.source_names]
+
+        for txn_tuple in product(*source_lists):
+            if self.predicate(txn_tuple):
+                return [{
+                    "transactions": [txn for txn in txn_tuple],
+                    "match_key": composite_key,
+                    "sources_matched": self.source_names
+                }]
+
+        return []
+
+    def _match_partial_key(
+        self,
+        composite_key: str,
+        sources_dict: Dict[str, List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Partial match - min_sources <= available sources < total sources.
+        Tries source combinations from largest to smallest and requires a
+        reference_number chain equality across the combination.
+        """
+        groups = []
+        available_sources = list(sources_dict.keys())
+
+        for combo_size in range(len(available_sources), self.min_sources - 1, -1):
+            for source_combo in combinations(available_sources, combo_size):
+                source_combo = sorted(source_combo)
+                source_lists = [sources_dict[src] for src in source_combo]
+
+                matched_tuple = None
+                for txn_tuple in product(*source_lists):
+                    if self._reference_chain_matches(txn_tuple):
+                        matched_tuple = txn_tuple
+                        break
+
+                if matched_tuple is not None:
+                    groups.append({
+                        "transactions": [txn for txn in matched_tuple],
+                        "match_key": composite_key,
+                        "sources_matched": list(source_combo)
+                    })
+                    break  # Found a match, stop trying other combinations of this size
+
+        return groups
+
+    @staticmethod
+    def _reference_chain_matches(txn_tuple: Tuple[Dict[str, Any], ...]) -> bool:
+        """src1.reference_number == src2.reference_number == ... (needs 2+ sources)"""
+        if len(txn_tuple) < 2:
+            return False
+        for left, right in zip(txn_tuple, txn_tuple[1:]):
+            if "reference_number" not in left or "reference_number" not in right:
+                return False
+            if not (left["reference_number"] == right["reference_number"]):
+                return False
+        return True
+
+
+def _field_column(txns, field: str, missing: Any = None) -> np.ndarray:
+    """Object column of one field from transaction dicts or a SourceColumns store"""
+    if isinstance(txns, SourceColumns):
+        return txns.column(field, missing)
+    return np.fromiter((t.get(field, missing) for t in txns), dtype=object, count=len(txns))
+
+
+class _ColumnEvaluator:
+    """
+    Evaluates a logic_expression over aligned candidate columns with Python
+    semantics: `and`/`or` short-circuit, and a missing attribute on an
+    evaluated operand makes that candidate fail (AttributeError in eval).
+    """
+
+    def __init__(
+        self,
+        columns: Dict[Tuple[str, str], np.ndarray],
+        positions: Dict[str, np.ndarray],
+        size: int
+    ):
+        self.columns = columns
+        self.positions = positions
+        self.size = size
+        self._cache: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def evaluate(self, tree: ast.Expression) -> np.ndarray:
+        truth, error = self._truth(tree.body)
+        return truth & ~error
+
+    def _operand(self, node: ast.Attribute) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, missing) for a `SOURCE.field` operand"""
+        cache_key = (node.value.id, node.attr)
+        if cache_key not in self._cache:
+            column = self.columns.get(cache_key)
+            if column is None:
+                values = np.full(self.size, _MISSING, dtype=object)
+            else:
+                values = column[self.positions[node.value.id]]
+            missing = np.fromiter((v is _MISSING for v in values), dtype=bool, count=self.size)
+            self._cache[cache_key] = (values, missing)
+        return self._cache[cache_key]
+
+    def _truth(self, node) -> Tuple[np.ndarray, np.ndarray]:
+        """(truth, error) of a node in boolean context"""
+        if isinstance(node, ast.BoolOp):
+            return self._bool_op(node)
+        if isinstance(node, ast.Compare):
+            return self._compare(node)
+        if isinstance(node, ast.Attribute):
+            values, missing = self._operand(node)
+            truth = np.zeros(self.size, dtype=bool)
+            present = ~missing
+            truth[present] = np.fromiter(
+                (bool(v) for v in values[present]), dtype=bool, count=int(present.sum())
+            )
+            return truth, missing
+        if isinstance(node, ast.Name):
+            # A bare source reference is a SimpleNamespace, which is always truthy
+            return np.ones(self.size, dtype=bool), np.zeros(self.size, dtype=bool)
+        raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+    def _bool_op(self, node: ast.BoolOp) -> Tuple[np.ndarray, np.ndarray]:
+        is_and = isinstance(node.op, ast.And)
+        truth = np.zeros(self.size, dtype=bool)
+        error = np.zeros(self.size, dtype=bool)
+        undecided = np.ones(self.size, dtype=bool)
+
+        for value in node.values:
+            value_truth, value_error = self._truth(value)
+            error |= undecided & value_error
+            undecided &= ~value_error
+            if is_and:
+                # `and` stops at the first falsy operand
+                undecided &= value_truth
+            else:
+                # `or` stops at the first truthy operand
+                truth |= undecided & value_truth
+                undecided &= ~value_truth
+
+        if is_and:
+            truth = undecided
+        return truth, error
+
+    def _compare(self, node: ast.Compare) -> Tuple[np.ndarray, np.ndarray]:
+        left_values, left_missing = self._operand(node.left)
+        error = left_missing.copy()
+        active = ~left_missing
+
+        for comparator in node.comparators:
+            right_values, right_missing = self._operand(comparator)
+            error |= active & right_missing
+            active &= ~right_missing
+
+            equal = np.zeros(self.size, dtype=bool)
+            if active.any():
+                equal[active] = np.equal(left_values[active], right_values[active]).astype(bool)
+            # A chained comparison stops at the first False
+            active &= equal
+            left_values = right_values
+
+        return active, error
@@ -0,0 +1,132 @@
+"""
+Match Write-Back
+Set-based write-back of matching results to tbl_txn_transactions.
+
+Instead of one `UPDATE ... WHERE id = ANY(:txn_ids)` per matched group, the
+per-transaction assignments (status, reference, condition, ...) are shipped
+as parallel arrays and applied with a single
+
+    UPDATE tbl_txn_transactions t SET ... FROM unnest(:ids, :statuses, ...) v
+    WHERE t.id = v.id
+
+per chunk. Values shared by the whole run (rule id, recon group number) are
+plain bind parameters.
+
+When match_status is written, the chunk's status change is applied to the
+reconciliation rollup right before its UPDATE, in the same transaction.
+"""
+
+from typing import Dict, Any, List, Optional
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.db.repositories.recon_rollup_repository import ReconRollupRepository
+
+logger = logging.getLogger(__name__)
+
+
+class MatchWriteBack:
+    """
+    Buffers per-transaction match assignments and flushes them in chunks
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        columns: Dict[str, str],
+        constants: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50000,
+        commit_per_chunk: bool = False,
+        touch_updated_at: bool = True,
+        update_rollup: bool = False
+    ):
+        """
+        Args:
+            db: Database session
+            columns: {column_name: postgres_type} assigned per transaction,
+                     e.g. {"match_status": "integer", "match_conditon": "text"}
+            constants: {column_name: value} assigned to every transaction
+            chunk_size: Transactions per UPDATE statement
+            commit_per_chunk: Commit after every chunk instead of leaving the
+                              transaction open until the caller commits
+            touch_updated_at: Also set updated_at = NOW()
+            update_rollup: Move the rows between tbl_txn_recon_rollup buckets
+                           (needs a per-transaction match_status column)
+        """
+        self.db = db
+        self.columns = columns
+        self.constants = constants or {}
+        self.chunk_size = max(1, int(chunk_size))
+        self.commit_per_chunk = commit_per_chunk
+        self.touch_updated_at = touch_updated_at
+        self.update_rollup = update_rollup and "match_status" in columns
+
+        self._ids: List[int] = []
+        self._values: Dict[str, List[Any]] = {column: [] for column in columns}
+        self.rows_written = 0
+        self.chunks_written = 0
+        self._update_query = self._build_update_query()
+
+    def _build_update_query(self) -> str:
+        assignments = [f"{column} = v.{column}" for column in self.columns]
+        assignments += [f"{column} = :const_{column}" for column in self.constants]
+        if self.touch_updated_at:
+            assignments.append("updated_at = NOW()")
+
+        arrays = ["CAST(:ids AS bigint[])"] + [
+            f"CAST(:col_{column} AS {pg_type}[])" for column, pg_type in self.columns.items()
+        ]
+
+        set_clause = ",\n                ".join(assignments)
+
+        return f"""
+            UPDATE tbl_txn_transactions AS t
+            SET
+                {set_clause}
+            FROM unnest({", ".join(arrays)})
+                AS v(id, {", ".join(self.columns)})
+            WHERE t.id = v.id
+        """
+
+    async def add(self, txn_ids: List[int], **values):
+        """
+        Queue the same assignment for every transaction of one group and
+        flush once a full chunk is buffered.
+        """
+        for txn_id in txn_ids:
+            self._ids.append(txn_id)
+            for column in self.columns:
+                self._values[column].append(values.get(column))
+
+        while len(self._ids) >= self.chunk_size:
+            await self._flush_chunk(self.chunk_size)
+
+    async def flush(self):
+        """Write everything still buffered"""
+        while self._ids:
+            await self._flush_chunk(self.chunk_size)
+
+    async def _flush_chunk(self, size: int):
+        ids = self._ids[:size]
+        params = {"ids": ids}
+        for column in self.columns:
+            params[f"col_{column}"] = self._values[column][:size]
+            del self._values[column][:size]
+        for column, value in self.constants.items():
+            params[f"const_{column}"] = value
+        del self._ids[:size]
+
+        if self.update_rollup:
+            await ReconRollupRepository.apply_status_change(self.db, ids, params["col_match_status"])
+        await self.db.execute(text(self._update_query), params)
+        if self.commit_per_chunk:
+            await self.db.commit()
+
+        self.rows_written += len(ids)
+        self.chunks_written += 1
+        logger.info(
+            f"💾 Write-back chunk {self.chunks_written}: {len(ids)} transactions "
+            f"({self.rows_written} total)"
+        )
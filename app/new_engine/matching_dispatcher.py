@@ -21,11 +21,14 @@ The complexity analysis is still performed for:
 from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from datetime import datetime
 import logging
 import json
 
 from app.new_engine.rule_complexity_analyzer import RuleComplexityAnalyzer, RuleComplexity
 from app.new_engine.application_matcher import ApplicationMatcher
+from app.new_engine.matching_locks import source_locks
+from app.new_engine.rule_cache import CompiledRule, compiled_rules
 
 logger = logging.getLogger(__name__)
 
@@ -44,19 +47,29 @@ class MatchingRuleDispatcher:
         rule_id: int,
         channel_id: Optional[int] = None,
         dry_run: bool = False,
-        min_sources: Optional[int] = None
+        min_sources: Optional[int] = None,
+        since: Optional[datetime] = None,
+        matched_since: Optional[datetime] = None,
+        key_index: Optional[str] = None,
+        lock_sources: bool = True
     ) -> Dict[str, Any]:
-       
+        """
+        Execute a matching rule on the application layer
+
+        Unless lock_sources is False (the caller already holds them), a
+        non-dry run holds the advisory locks of the rule's sources, so manual,
+        API and auto-triggered runs over the same sources never claim the
+        same unmatched rows concurrently.
+        """
         try:
-            # Step 1: Fetch matching rule
-            rule = await self._fetch_matching_rule(rule_id, channel_id)
-            logger.info(f"Fetched matching rule {rule_id}: {rule}")
+            # Step 1: Fetch matching rule (compiled, cached per rule version)
+            rule = await self._get_compiled_rule(rule_id, channel_id)
             if not rule:
                 raise ValueError(f"Matching rule {rule_id} not found or inactive")
             
-            # Step 2: Analyze complexity
-            complexity = RuleComplexityAnalyzer.analyze(rule["conditions"])
-            strategy = RuleComplexityAnalyzer.get_execution_strategy(rule["conditions"])
+            # Step 2: Complexity analysis (done once per rule version)
+            complexity = rule.complexity
+            strategy = rule.strategy
             
             logger.info(
                 f"Rule {rule_id} analyzed: {complexity} complexity, "
@@ -80,14 +93,35 @@ class MatchingRuleDispatcher:
             #     result = await self._execute_via_application_layer(...)
             
             # New unified approach - always use application layer
-            result = await self._execute_via_application_layer(
-                rule_id=rule_id,
-                conditions=rule["conditions"],
-                tolerance=rule["tolerance"],
-                channel_id=channel_id,
-                dry_run=dry_run,
-                min_sources=min_sources
-            )
+            if lock_sources and not dry_run:
+                async with source_locks(
+                    self.db.bind, channel_id, rule.conditions.get("sources", [])
+                ):
+                    result = await self._execute_via_application_layer(
+                        rule_id=rule_id,
+                        conditions=rule.conditions,
+                        tolerance=rule.tolerance,
+                        channel_id=channel_id,
+                        dry_run=dry_run,
+                        min_sources=min_sources,
+                        since=since,
+                        matched_since=matched_since,
+                        key_index=key_index,
+                        compiled_rule=rule
+                    )
+            else:
+                result = await self._execute_via_application_layer(
+                    rule_id=rule_id,
+                    conditions=rule.conditions,
+                    tolerance=rule.tolerance,
+                    channel_id=channel_id,
+                    dry_run=dry_run,
+                    min_sources=min_sources,
+                    since=since,
+                    matched_since=matched_since,
+                    key_index=key_index,
+                    compiled_rule=rule
+                )
             result["executor"] = "application_layer"
             
             # Add complexity info for monitoring/optimization
@@ -118,7 +152,9 @@ class MatchingRuleDispatcher:
                 channel_id,
                 conditions,
                 tolerance,
-                status
+                status,
+                updated_at,
+                version_number
             FROM tbl_cfg_matching_rule
             WHERE id = :rule_id
               AND status = 1
@@ -152,9 +188,55 @@ class MatchingRuleDispatcher:
             "channel_id": row.channel_id,
             "conditions": conditions,
             "tolerance": row.tolerance,
-            "status": row.status
+            "status": row.status,
+            "updated_at": row.updated_at,
+            "version_number": row.version_number
         }
     
+    async def _get_compiled_rule(
+        self,
+        rule_id: int,
+        channel_id: Optional[int]
+    ) -> Optional[CompiledRule]:
+        """
+        Compiled form of an active rule
+        
+        Only the rule's version columns are read when the process already
+        holds a CompiledRule for that version; otherwise the rule is fetched,
+        analyzed and compiled, and the result is cached.
+        """
+        query = """
+            SELECT updated_at, version_number
+            FROM tbl_cfg_matching_rule
+            WHERE id = :rule_id
+              AND status = 1
+        """
+        params = {"rule_id": rule_id}
+        if channel_id:
+            query += " AND channel_id = :channel_id"
+            params["channel_id"] = channel_id
+        
+        result = await self.db.execute(text(query), params)
+        row = result.fetchone()
+        if not row:
+            return None
+        
+        compiled = compiled_rules.get(rule_id, (row.updated_at, row.version_number))
+        if compiled:
+            return compiled
+        
+        rule = await self._fetch_matching_rule(rule_id, channel_id)
+        logger.info(f"Fetched matching rule {rule_id}: {rule}")
+        if not rule:
+            return None
+        
+        compiled = self.application_matcher.compile_rule(rule)
+        compiled.complexity = RuleComplexityAnalyzer.analyze(rule["conditions"])
+        compiled.strategy = RuleComplexityAnalyzer.get_execution_strategy(rule["conditions"])
+        compiled_rules.put(compiled)
+        
+        return compiled
+    
     async def _execute_via_stored_procedure(
         self,
         rule_id: int,
@@ -208,7 +290,11 @@ class MatchingRuleDispatcher:
         tolerance: Optional[Dict[str, Any]],
         channel_id: Optional[int],
         dry_run: bool,
-        min_sources: Optional[int]
+        min_sources: Optional[int],
+        since: Optional[datetime] = None,
+        matched_since: Optional[datetime] = None,
+        key_index: Optional[str] = None,
+        compiled_rule: Optional[CompiledRule] = None
     ) -> Dict[str, Any]:
         """
         Execute via Python application layer
@@ -222,7 +308,11 @@ class MatchingRuleDispatcher:
             tolerance=tolerance,
             channel_id=channel_id,
             dry_run=dry_run,
-            min_sources=min_sources
+            min_sources=min_sources,
+            since=since,
+            matched_since=matched_since,
+            key_index=key_index,
+            compiled_rule=compiled_rule
         )
         
         return result
@@ -0,0 +1,76 @@
+"""
+Matching Source Locks
+Postgres advisory locks that serialize matching runs over the same
+(channel, source) pairs.
+
+Two rules that read the same source claim the same unmatched rows, so they
+must not run at the same time; rules over disjoint sources can. Locks are
+two-level, since a run without a channel claims the rows of every channel:
+
+- a run without a channel takes the exclusive (0, source) lock of each source
+- a channel run takes the shared (0, source) lock plus the exclusive
+  (channel_id, source) lock of each source
+
+so channel runs over different channels still run side by side, but none of
+them overlaps an all-channel run over the same source. All (0, source) locks
+are taken before the channel locks, each level in sorted source order, so
+overlapping runs queue behind each other instead of deadlocking.
+
+The locks are session-level locks on a dedicated autocommit connection:
+they outlive the run's own commits (write-back may commit per chunk) and
+are released when the connection closes, even if the worker dies.
+"""
+
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def source_locks(
+    engine: AsyncEngine,
+    channel_id: Optional[int],
+    source_names: List[str]
+):
+    """
+    Hold the advisory locks of all (channel_id, source_name) pairs
+
+    Args:
+        engine: Engine to open the lock connection on
+        channel_id: Channel of the run (None = all channels: exclusive
+            (0, source) locks instead of shared ones)
+        source_names: Sources the run reads
+    """
+    keys = sorted(set(source_names))
+    conn = await engine.connect()
+    try:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        all_channels_lock = "pg_advisory_lock_shared" if channel_id else "pg_advisory_lock"
+        for source_name in keys:
+            await conn.execute(
+                text(f"SELECT {all_channels_lock}(0, hashtext(:source_name))"),
+                {"source_name": source_name}
+            )
+        if channel_id:
+            for source_name in keys:
+                await conn.execute(
+                    text("SELECT pg_advisory_lock(:channel_id, hashtext(:source_name))"),
+                    {"channel_id": channel_id, "source_name": source_name}
+                )
+        logger.info(f"🔒 Locked sources {keys} of channel {channel_id}")
+        yield
+    finally:
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock_all()"))
+        except Exception as e:
+            # e.g. cancelled while waiting for a lock: drop the connection
+            # instead of pooling it, its locks end with the session
+            logger.warning(f"⚠️ Could not release source locks ({e}), dropping the lock connection")
+            await conn.invalidate()
+        finally:
+            await conn.close()
@@ -0,0 +1,146 @@
+"""
+Matching Watermark Store
+Per-rule high-water mark for incremental matching.
+
+After every successful auto-matching run the newest created_at the run could
+see is stored per rule, together with the database time the run started.
+The next run only probes
+- transactions ingested after that mark (minus an overlap window, see
+  MATCHING_INCREMENTAL_OVERLAP_SECONDS), and
+- keys where transactions were matched since the last run started (a match
+  takes rows out of a key, so its leftovers can now form a partial match)
+against the outstanding unmatched keys of the other sources.
+
+The watermark is tied to the rule's updated_at: editing a rule invalidates it
+and the next run is a full run over the whole unmatched backlog.
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MatchingWatermarkStore:
+    """
+    Reads and advances tbl_txn_matching_watermark
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def snapshot(
+        self,
+        sources: List[str],
+        channel_id: Optional[int]
+    ) -> Dict[str, Optional[datetime]]:
+        """
+        Newest created_at among the rule's source transactions right now, and
+        the current transaction's NOW() (the updated_at this run's matches get).
+        Read before the run, so rows ingested during the run stay "new".
+
+        Returns:
+            {"high_water": datetime | None, "run_at": datetime}
+        """
+        query = """
+            SELECT MAX(t.created_at) AS high_water, NOW()::timestamp AS run_at
+            FROM tbl_txn_transactions t
+            JOIN tbl_cfg_source s ON t.source_id = s.id
+            WHERE s.source_name = ANY(:sources)
+        """
+        params = {"sources": list(sources)}
+        if channel_id:
+            query += " AND t.channel_id = :channel_id"
+            params["channel_id"] = channel_id
+
+        result = await self.db.execute(text(query), params)
+        row = result.fetchone()
+        return {"high_water": row.high_water, "run_at": row.run_at}
+
+    async def get_window(
+        self,
+        rule_id: int,
+        rule_updated_at: Optional[datetime]
+    ) -> Optional[Dict[str, Optional[datetime]]]:
+        """
+        Incremental window for the next run of this rule
+
+        Returns:
+            {"since": created_at lower bound, "matched_since": last run start,
+             "key_index": key columns of the rule's unmatched key index},
+            or None when a full run is needed (no watermark yet, or the rule
+            changed since it was written)
+        """
+        query = """
+            SELECT last_created_at, rule_updated_at, last_run_at, key_index
+            FROM tbl_txn_matching_watermark
+            WHERE rule_id = :rule_id
+        """
+        result = await self.db.execute(text(query), {"rule_id": rule_id})
+        row = result.fetchone()
+
+        if not row or row.last_created_at is None:
+            logger.info(f"No watermark for rule {rule_id}, running full match")
+            return None
+
+        if row.rule_updated_at != rule_updated_at:
+            logger.info(f"Rule {rule_id} changed since its watermark, running full match")
+            return None
+
+        # Rows are stamped with created_at before their batch commits, so a
+        # batch still in flight at the last run can carry an older timestamp
+        overlap = timedelta(seconds=settings.MATCHING_INCREMENTAL_OVERLAP_SECONDS)
+        return {
+            "since": row.last_created_at - overlap,
+            "matched_since": row.last_run_at,
+            "key_index": row.key_index
+        }
+
+    async def advance(
+        self,
+        rule_id: int,
+        channel_id: Optional[int],
+        snapshot: Dict[str, Optional[datetime]],
+        rule_updated_at: Optional[datetime],
+        key_index: Optional[str] = None
+    ):
+        """
+        Store the snapshot of a successful run (committed by the caller)
+        
+        Args:
+            key_index: Key columns the run left tbl_txn_unmatched_key
+                       maintained for (None = no index for this rule)
+        """
+        if snapshot.get("high_water") is None:
+            return
+
+        query = """
+            INSERT INTO tbl_txn_matching_watermark
+                (rule_id, channel_id, last_created_at, rule_updated_at, last_run_at, key_index, created_at, updated_at)
+            VALUES
+                (:rule_id, :channel_id, :high_water, :rule_updated_at, :run_at, :key_index, NOW(), NOW())
+            ON CONFLICT (rule_id) DO UPDATE SET
+                channel_id = EXCLUDED.channel_id,
+                last_created_at = GREATEST(tbl_txn_matching_watermark.last_created_at, EXCLUDED.last_created_at),
+                rule_updated_at = EXCLUDED.rule_updated_at,
+                last_run_at = EXCLUDED.last_run_at,
+                key_index = EXCLUDED.key_index,
+                updated_at = NOW()
+        """
+        await self.db.execute(
+            text(query),
+            {
+                "rule_id": rule_id,
+                "channel_id": channel_id,
+                "high_water": snapshot["high_water"],
+                "run_at": snapshot["run_at"],
+                "rule_updated_at": rule_updated_at,
+                "key_index": key_index
+            }
+        )
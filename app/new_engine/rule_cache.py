@@ -0,0 +1,85 @@
+"""
+Compiled Rule Cache
+Process-wide cache of matching rules in their executable form.
+
+Executing a rule used to re-fetch it, re-run the complexity analysis and
+re-do the `=` -> `==` rewrite, ast.parse, AST validation, equality-field
+extraction and compile() on every run. A CompiledRule holds all of that once
+per rule version.
+
+Entries are keyed by rule id and checked against the rule's
+(updated_at, version_number): the dispatcher reads only those two columns on
+a hit, so an edit made by any process is picked up on the next run. The
+matching_rules routers additionally invalidate the entry in their own
+process on update / delete.
+"""
+
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+import ast
+import logging
+
+from app.new_engine.rule_compiler import Predicate
+
+logger = logging.getLogger(__name__)
+
+# Rules kept per process (least recently used are evicted)
+MAX_CACHED_RULES = 512
+
+
+@dataclass
+class CompiledRule:
+    rule_id: int
+    version: Tuple[Optional[datetime], Optional[int]]  # (updated_at, version_number)
+    rule_name: Optional[str]
+    channel_id: Optional[int]
+    conditions: Dict[str, Any]
+    tolerance: Optional[Dict[str, Any]]
+    tree: ast.Expression  # validated logic_expression
+    source_names: List[str]  # sorted sources referenced by the expression
+    matching_fields: Set[str]  # equality fields of the composite key
+    fetch_fields: Set[str]  # fields the streaming fetch keeps
+    predicate: Predicate  # logic_expression closure over txn tuples in source_names order
+    complexity: Optional[str] = None
+    strategy: Dict[str, Any] = field(default_factory=dict)
+
+
+class CompiledRuleCache:
+    """
+    LRU map of rule_id -> CompiledRule
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_RULES):
+        self.max_size = max_size
+        self._rules: "OrderedDict[int, CompiledRule]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, rule_id: int, version: Tuple[Optional[datetime], Optional[int]]) -> Optional[CompiledRule]:
+        """Cached rule if it was compiled from this version, else None"""
+        compiled = self._rules.get(rule_id)
+        if compiled is None or compiled.version != version:
+            self.misses += 1
+            return None
+        self._rules.move_to_end(rule_id)
+        self.hits += 1
+        return compiled
+
+    def put(self, compiled: CompiledRule):
+        self._rules[compiled.rule_id] = compiled
+        self._rules.move_to_end(compiled.rule_id)
+        while len(self._rules) > self.max_size:
+            self._rules.popitem(last=False)
+
+    def invalidate(self, rule_id: int):
+        if self._rules.pop(rule_id, None) is not None:
+            logger.info(f"Compiled rule {rule_id} invalidated")
+
+    def clear(self):
+        self._rules.clear()
+
+
+# Shared by every dispatcher of this process
+compiled_rules = CompiledRuleCache()
@@ -0,0 +1,104 @@
+"""
+Rule Compiler
+Turns a validated logic_expression AST into a plain Python closure over a
+tuple of transaction dicts (one per source, in source order).
+
+Replaces the row-wise path's per-candidate
+    context = {src: SimpleNamespace(**txn) ...}
+    eval(compiled_expr, {}, context)
+which allocated one namespace per source per candidate tuple and went
+through the interpreter's eval machinery every time.
+
+Semantics are those of the eval path:
+- `SOURCE.field` reads txn["field"]; a missing field fails the whole
+  candidate (eval raised AttributeError and the tuple was skipped), but
+  only when it is actually evaluated (and/or short-circuit)
+- `a == b == c` is a chained comparison
+- `and` / `or` return operand values, truthiness decides the match
+- a bare `SOURCE` is the transaction itself
+"""
+
+from typing import Any, Callable, Dict, List, Sequence
+import ast
+
+
+Predicate = Callable[[Sequence[Dict[str, Any]]], bool]
+
+
+def compile_predicate(tree: ast.Expression, source_names: List[str]) -> Predicate:
+    """
+    Compile an expression into predicate(txn_tuple) -> bool
+
+    Args:
+        tree: Validated logic_expression AST (mode="eval")
+        source_names: Order of the transactions in the tuples passed in
+    """
+    positions = {src: i for i, src in enumerate(source_names)}
+    evaluate = _compile_node(tree.body, positions)
+
+    def predicate(txn_tuple: Sequence[Dict[str, Any]]) -> bool:
+        try:
+            return bool(evaluate(txn_tuple))
+        except Exception:
+            # Same as the eval path: an evaluation error rejects the candidate
+            return False
+
+    return predicate
+
+
+def _compile_node(node: ast.AST, positions: Dict[str, int]) -> Callable[[Sequence[Dict[str, Any]]], Any]:
+    if isinstance(node, ast.Attribute):
+        if isinstance(node.value, ast.Name):
+            position = positions[node.value.id]
+            field = node.attr
+            # KeyError on a missing field rejects the candidate
+            return lambda rows: rows[position][field]
+        inner = _compile_node(node.value, positions)
+        attr = node.attr
+        return lambda rows: getattr(inner(rows), attr)
+
+    if isinstance(node, ast.Name):
+        position = positions[node.id]
+        return lambda rows: rows[position]
+
+    if isinstance(node, ast.Compare):
+        if not all(isinstance(op, ast.Eq) for op in node.ops):
+            raise ValueError("Only == comparisons are supported")
+        operands = [_compile_node(node.left, positions)] + [
+            _compile_node(comparator, positions) for comparator in node.comparators
+        ]
+        if len(operands) == 2:
+            left, right = operands
+            return lambda rows: left(rows) == right(rows)
+
+        def chained(rows):
+            left = operands[0](rows)
+            for operand in operands[1:]:
+                right = operand(rows)
+                result = left == right
+                if not result:
+                    return result
+                left = right
+            return result
+        return chained
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile_node(value, positions) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def all_of(rows):
+                for value in values:
+                    result = value(rows)
+                    if not result:
+                        return result
+                return result
+            return all_of
+
+        def any_of(rows):
+            for value in values:
+                result = value(rows)
+                if result:
+                    return result
+            return result
+        return any_of
+
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
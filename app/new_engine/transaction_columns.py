@@ -0,0 +1,192 @@
+"""
+Transaction Column Store
+Compact, dictionary-encoded columns for the unmatched transactions of one
+source, filled from a server-side cursor by the matchers' streaming fetch.
+
+Memory layout per source:
+- ids: one int64 per transaction
+- every retained field: one int32 code per transaction plus the distinct
+  values of that field (so memory follows key cardinality, not row payload)
+- only the fields the rule needs are retained; otherDetails and other
+  payload columns are dropped after parsing
+
+Rows are materialized as plain dicts only on demand (`columns[i]`,
+iteration), so matched groups and row-wise fallbacks see the same
+transaction dicts as before.
+"""
+
+from array import array
+from typing import Dict, Any, List, Optional, Iterable, Iterator
+
+import numpy as np
+
+# Code of a field the transaction does not have (kept apart from None values)
+_ABSENT = -1
+
+# Sentinel for "alias not present in the appended dict"
+_MISSING_VALUE = object()
+
+# Fields every materialized row carries without a column of their own
+_IMPLICIT_FIELDS = ("id", "source_name")
+
+
+class SourceColumns:
+    """
+    Column store for the transactions of one source
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        fields: Optional[Iterable[str]] = None,
+        aliases: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            source_name: Source the transactions belong to
+            fields: Fields to retain (None = every field of the appended rows)
+            aliases: {alias: field} for fields that carry the same column
+                     (e.g. "rrn" -> "reference_number"), stored only once
+        """
+        self.source_name = source_name
+        self.aliases = dict(aliases or {})
+        self.fields: Optional[List[str]] = None
+        if fields is not None:
+            self.fields = []
+            for field in fields:
+                field = self.aliases.get(field, field)
+                if field not in _IMPLICIT_FIELDS and field not in self.fields:
+                    self.fields.append(field)
+
+        self._ids = array("q")
+        self._codes: Dict[str, array] = {}
+        self._lookup: Dict[str, Dict[Any, int]] = {}
+        self._values: Dict[str, List[Any]] = {}
+        self._size = 0
+        self._finalized = False
+
+        for field in self.fields or []:
+            self._add_field(field)
+
+    def _add_field(self, field: str):
+        self._codes[field] = array("i", [_ABSENT]) * self._size
+        self._lookup[field] = {}
+        self._values[field] = []
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def append(self, txn: Dict[str, Any]):
+        """Append one transaction dict (must contain "id")"""
+        if self._finalized:
+            raise RuntimeError("SourceColumns is finalized")
+
+        if self.fields is None:
+            for field in txn:
+                field = self.aliases.get(field, field)
+                if field not in _IMPLICIT_FIELDS and field not in self._codes:
+                    self._add_field(field)
+
+        self._ids.append(txn["id"])
+        for field, codes in self._codes.items():
+            if field in txn:
+                value = txn[field]
+            else:
+                value = self._aliased_value(txn, field)
+                if value is _MISSING_VALUE:
+                    codes.append(_ABSENT)
+                    continue
+
+            lookup = self._lookup[field]
+            code = lookup.get(value)
+            if code is None:
+                code = len(self._values[field])
+                lookup[value] = code
+                self._values[field].append(value)
+            codes.append(code)
+
+        self._size += 1
+
+    def _aliased_value(self, txn: Dict[str, Any], field: str):
+        for alias, target in self.aliases.items():
+            if target == field and alias in txn:
+                return txn[alias]
+        return _MISSING_VALUE
+
+    def finalize(self) -> "SourceColumns":
+        """Freeze the columns into NumPy arrays and drop the value lookups"""
+        if self._finalized:
+            return self
+        self.ids = np.frombuffer(self._ids, dtype=np.int64) if self._size else np.empty(0, dtype=np.int64)
+        self._codes = {
+            field: (np.frombuffer(codes, dtype=np.int32) if self._size else np.empty(0, dtype=np.int32))
+            for field, codes in self._codes.items()
+        }
+        self._lookup = {}
+        if self.fields is None:
+            self.fields = list(self._codes)
+        self._finalized = True
+        return self
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def has_field(self, field: str) -> bool:
+        return self.aliases.get(field, field) in self._codes
+
+    def column(self, field: str, missing: Any = None) -> np.ndarray:
+        """
+        Decoded object column for a field; transactions without the field
+        (or fields that are not retained) get `missing`.
+        """
+        self.finalize()
+        if field == "id":
+            return self.ids.astype(object)
+        if field == "source_name":
+            return np.full(self._size, self.source_name, dtype=object)
+
+        field = self.aliases.get(field, field)
+        if field not in self._codes:
+            return np.full(self._size, missing, dtype=object)
+
+        # Code -1 (absent) indexes the trailing `missing` entry
+        values = np.empty(len(self._values[field]) + 1, dtype=object)
+        values[:-1] = self._values[field]
+        values[-1] = missing
+        return values[self._codes[field]]
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        """Materialize one transaction as a dict"""
+        self.finalize()
+        position = int(position)
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError(position)
+
+        txn: Dict[str, Any] = {"id": int(self.ids[position])}
+        for field, codes in self._codes.items():
+            code = codes[position]
+            if code == _ABSENT:
+                continue
+            txn[field] = self._values[field][code]
+        for alias, field in self.aliases.items():
+            if field in txn:
+                txn[alias] = txn[field]
+        txn.setdefault("source_name", self.source_name)
+        return txn
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for position in range(self._size):
+            yield self[position]
+
+    def memory_bytes(self) -> int:
+        """Approximate size of ids + codes (distinct values not included)"""
+        self.finalize()
+        return int(self.ids.nbytes + sum(codes.nbytes for codes in self._codes.values()))
+
@@ -0,0 +1,295 @@
+"""
+Unmatched Key Index
+Persistent per-rule index of outstanding unmatched transactions, keyed by
+the rule's composite equality key (tbl_txn_unmatched_key).
+
+The key is built from the raw tbl_txn_transactions columns among the rule's
+`field ==` key fields, in the same "field=value|field=value" form as the
+matcher's composite key (NULL parts left out). Derived fields (amount is
+compared as float, otherDetails parts) are not part of it, so the index key
+is a coarsening of the matcher's key: two transactions with equal composite
+keys always have equal index keys.
+
+Maintenance:
+- upload path (UploadRepository.saveFileDetails): new transactions are
+  indexed for every active rule of the channel that reads their source
+- matcher: full runs rebuild the rule's index, every run indexes the new
+  rows it probes and drops the transactions it matched
+- manual match / unmatch (TransactionService.patch)
+
+An incremental run then reads the older unmatched rows it needs by key
+lookups on (rule_id, match_key) instead of re-reading the other sources'
+backlog.
+"""
+
+from typing import Dict, Any, List, Optional, Set, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Key fields whose row value is the raw tbl_txn_transactions column
+RAW_KEY_COLUMNS = {
+    "reference_number": "reference_number",
+    "rrn": "reference_number",
+    "account_number": "account_number",
+    "date": "date",
+    "transaction_date": "date",
+    "currency_code": "ccy",
+}
+
+# Most selective first
+RAW_KEY_PRIORITY = (
+    "reference_number", "rrn", "account_number", "date", "transaction_date", "currency_code"
+)
+
+
+class UnmatchedKeyIndex:
+    """
+    Reads and maintains tbl_txn_unmatched_key
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Key definition
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key_columns(matching_fields: Set[str]) -> List[str]:
+        """Distinct raw columns among a rule's key fields (most selective first)"""
+        columns = []
+        for field in RAW_KEY_PRIORITY:
+            column = RAW_KEY_COLUMNS[field]
+            if field in matching_fields and column not in columns:
+                columns.append(column)
+        return columns
+
+    @staticmethod
+    def signature(columns: List[str]) -> str:
+        """Stored in tbl_txn_matching_watermark.key_index for the rule"""
+        return ",".join(columns)
+
+    @staticmethod
+    def parse_signature(signature: Optional[str]) -> List[str]:
+        """Key columns of a stored signature (unknown names are rejected)"""
+        if not signature:
+            return []
+        columns = signature.split(",")
+        allowed = set(RAW_KEY_COLUMNS.values())
+        if not all(column in allowed for column in columns):
+            raise ValueError(f"Invalid key index signature: {signature}")
+        return columns
+
+    @staticmethod
+    def key_expression(columns: List[str], alias: str = "t") -> str:
+        """SQL for the index key of a transaction row"""
+        parts = [f"'{column}=' || {alias}.{column}" for column in columns]
+        return f"concat_ws('|', {', '.join(parts)})"
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def rebuild(
+        self,
+        rule_id: int,
+        columns: List[str],
+        sources: List[str],
+        channel_id: Optional[int]
+    ) -> int:
+        """
+        Replace the rule's index with its current unmatched transactions
+
+        Returns:
+            Number of transactions indexed
+        """
+        await self.db.execute(
+            text("DELETE FROM tbl_txn_unmatched_key WHERE rule_id = :rule_id"),
+            {"rule_id": rule_id}
+        )
+        indexed = await self._index_rows(
+            rule_id, columns, sources, channel_id,
+            "(t.match_status IS NULL OR t.match_status = 0)", {}
+        )
+        logger.info(f"🗂️ Rebuilt unmatched key index for rule {rule_id}: {indexed} transactions")
+        return indexed
+
+    async def index_new(
+        self,
+        rule_id: int,
+        columns: List[str],
+        sources: List[str],
+        channel_id: Optional[int],
+        since: datetime
+    ) -> int:
+        """Index the unmatched transactions created after `since` (idempotent)"""
+        return await self._index_rows(
+            rule_id, columns, sources, channel_id,
+            "t.created_at > :since AND (t.match_status IS NULL OR t.match_status = 0)",
+            {"since": since}
+        )
+
+    async def index_transactions(
+        self,
+        channel_id: int,
+        source_id: int,
+        transaction_ids: List[int]
+    ) -> int:
+        """
+        Index freshly inserted transactions for every active rule of the
+        channel whose index is built and that reads their source
+
+        Returns:
+            Number of index rows written
+        """
+        if not transaction_ids:
+            return 0
+
+        query = """
+            SELECT r.id AS rule_id, w.key_index
+            FROM tbl_cfg_matching_rule r
+            JOIN tbl_txn_matching_watermark w ON w.rule_id = r.id
+            JOIN tbl_cfg_source s ON s.id = :source_id
+            WHERE r.channel_id = :channel_id
+              AND r.status = 1
+              AND w.key_index IS NOT NULL
+              AND CAST(r.conditions AS jsonb) -> 'sources' @> jsonb_build_array(s.source_name)
+        """
+        result = await self.db.execute(
+            text(query), {"channel_id": channel_id, "source_id": source_id}
+        )
+
+        written = 0
+        for rule in result.fetchall():
+            columns = self.parse_signature(rule.key_index)
+            insert = f"""
+                INSERT INTO tbl_txn_unmatched_key
+                    (rule_id, transaction_id, source_id, match_key, created_at)
+                SELECT :rule_id, t.id, t.source_id, {self.key_expression(columns)}, t.created_at
+                FROM tbl_txn_transactions t
+                WHERE t.id = ANY(:ids)
+                  AND (t.match_status IS NULL OR t.match_status = 0)
+                ON CONFLICT (transaction_id, rule_id) DO NOTHING
+            """
+            insert_result = await self.db.execute(
+                text(insert), {"rule_id": rule.rule_id, "ids": list(transaction_ids)}
+            )
+            written += insert_result.rowcount
+        return written
+
+    async def add(self, transaction_ids: List[int]) -> int:
+        """
+        Re-index transactions that became unmatched again, for every rule
+        with a built index that reads their source and channel
+        """
+        if not transaction_ids:
+            return 0
+
+        query = """
+            SELECT DISTINCT t.channel_id, t.source_id
+            FROM tbl_txn_transactions t
+            WHERE t.id = ANY(:ids)
+        """
+        result = await self.db.execute(text(query), {"ids": list(transaction_ids)})
+
+        written = 0
+        for row in result.fetchall():
+            written += await self.index_transactions(row.channel_id, row.source_id, transaction_ids)
+        return written
+
+    async def remove(self, transaction_ids: List[int]) -> int:
+        """Drop matched transactions from every rule's index"""
+        if not transaction_ids:
+            return 0
+        result = await self.db.execute(
+            text("DELETE FROM tbl_txn_unmatched_key WHERE transaction_id = ANY(:ids)"),
+            {"ids": list(transaction_ids)}
+        )
+        return result.rowcount
+
+    async def _index_rows(
+        self,
+        rule_id: int,
+        columns: List[str],
+        sources: List[str],
+        channel_id: Optional[int],
+        condition: str,
+        params: Dict[str, Any]
+    ) -> int:
+        query = f"""
+            INSERT INTO tbl_txn_unmatched_key
+                (rule_id, transaction_id, source_id, match_key, created_at)
+            SELECT :rule_id, t.id, t.source_id, {self.key_expression(columns)}, t.created_at
+            FROM tbl_txn_transactions t
+            JOIN tbl_cfg_source s ON t.source_id = s.id
+            WHERE s.source_name = ANY(:sources)
+              AND {condition}
+        """
+        params = {**params, "rule_id": rule_id, "sources": list(sources)}
+        if channel_id:
+            query += " AND t.channel_id = :channel_id"
+            params["channel_id"] = channel_id
+        query += " ON CONFLICT (transaction_id, rule_id) DO NOTHING"
+
+        result = await self.db.execute(text(query), params)
+        return result.rowcount
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    def probe_filter(
+        self,
+        rule_id: int,
+        columns: List[str],
+        sources: List[str],
+        channel_id: Optional[int],
+        since: datetime,
+        matched_since: Optional[datetime] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        SQL restriction (on alias t) for an incremental run: transactions
+        created after `since`, plus indexed ones whose key occurs among
+        - the new unmatched rows, or
+        - rows matched since `matched_since` (a match takes rows out of a
+          key, which can leave a partial match among the rest)
+
+        The probe keys are computed from tbl_txn_transactions itself, so new
+        rows are probed even when the upload path did not index them.
+        """
+        changed = "(n.created_at > :inc_since AND (n.match_status IS NULL OR n.match_status = 0))"
+        params = {"inc_rule_id": rule_id, "inc_sources": list(sources), "inc_since": since}
+        if matched_since is not None:
+            changed = f"({changed} OR (n.match_status IN (1, 2) AND n.updated_at >= :inc_matched_since))"
+            params["inc_matched_since"] = matched_since
+
+        probe_keys = f"""
+            SELECT {self.key_expression(columns, alias="n")}
+            FROM tbl_txn_transactions n
+            JOIN tbl_cfg_source ns ON n.source_id = ns.id
+            WHERE ns.source_name = ANY(:inc_sources)
+              AND {changed}
+        """
+        if channel_id:
+            probe_keys += " AND n.channel_id = :inc_channel_id"
+            params["inc_channel_id"] = channel_id
+
+        candidate_filter = f"""
+            AND (
+                t.created_at > :inc_since
+                OR t.id IN (
+                    SELECT k.transaction_id
+                    FROM tbl_txn_unmatched_key k
+                    WHERE k.rule_id = :inc_rule_id
+                      AND k.match_key IN ({probe_keys})
+                )
+            )
+        """
+        logger.info(f"🔁 Incremental run since {since}, probing unmatched key index on {columns}")
+
+        return candidate_filter, params
@@ -5,9 +5,12 @@ Automatically triggers matching rules when file uploads complete
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
+from app.config import settings
 from app.new_engine.matching_dispatcher import MatchingRuleDispatcher
+from app.new_engine.matching_watermark import MatchingWatermarkStore
+from app.new_engine.matching_locks import source_locks
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +23,15 @@ class AutoMatchingService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.dispatcher = MatchingRuleDispatcher(db)
+        self.watermarks = MatchingWatermarkStore(db)
     
     async def trigger_matching_for_channel(
         self,
         channel_id: int,
         source_id: int,
-        dry_run: bool = False
+        dry_run: bool = False,
+        incremental: Optional[bool] = None,
+        rule_ids: Optional[List[int]] = None
     ) -> Dict[str, Any]:
         """
         Automatically trigger all active matching rules for a channel
@@ -34,6 +40,9 @@ class AutoMatchingService:
             channel_id: Channel ID that just received new transactions
             source_id: Source ID of the uploaded file
             dry_run: If True, only analyze without updating
+            incremental: Only probe rows ingested since each rule's last run
+                         (defaults to MATCHING_INCREMENTAL)
+            rule_ids: Only execute these rules (one batch of plan_rule_batches)
             
         Returns:
             {
@@ -44,14 +53,21 @@ class AutoMatchingService:
                 "message": str
             }
         """
+        if incremental is None:
+            incremental = settings.MATCHING_INCREMENTAL
+        incremental = incremental and not dry_run
+        
         try:
             logger.info(
                 f"Auto-matching triggered for channel {channel_id}, "
-                f"source {source_id}"
+                f"source {source_id} (incremental={incremental})"
             )
             
             # Step 1: Get all active matching rules for this channel
             rules = await self._get_active_rules_for_channel(channel_id)
+            if rule_ids is not None:
+                wanted = set(rule_ids)
+                rules = [rule for rule in rules if rule["id"] in wanted]
             
             if not rules or len(rules) == 0:
                 logger.warning(f"No active matching rules found for channel {channel_id}")
@@ -87,19 +103,46 @@ class AutoMatchingService:
                         f"- {match_type} matching (min_sources={min_sources})"
                     )
                     
-                    # Execute the matching rule
-                    result = await self.dispatcher.execute_matching_rule(
-                        rule_id=rule_id,
-                        channel_id=channel_id,
-                        dry_run=dry_run,
-                        min_sources=min_sources
-                    )
-                    
+                    # Rules sharing a source claim the same rows: serialize them
+                    async with source_locks(
+                        self.db.bind, channel_id, rule["conditions"].get("sources", [])
+                    ):
+                        # Incremental: probe only rows newer than the rule's watermark.
+                        # The high-water mark is read before the run so rows
+                        # ingested meanwhile are still "new" next time.
+                        window = None
+                        snapshot = None
+                        if incremental:
+                            snapshot = await self.watermarks.snapshot(
+                                rule["conditions"].get("sources", []), channel_id
+                            )
+                            window = await self.watermarks.get_window(rule_id, rule["updated_at"])
+                        
+                        # Execute the matching rule
+                        result = await self.dispatcher.execute_matching_rule(
+                            rule_id=rule_id,
+                            channel_id=channel_id,
+                            dry_run=dry_run,
+                            min_sources=min_sources,
+                            since=window["since"] if window else None,
+                            matched_since=window["matched_since"] if window else None,
+                            key_index=window["key_index"] if window else None,
+                            lock_sources=False
+                        )
+                        
+                        if incremental:
+                            await self.watermarks.advance(
+                                rule_id, channel_id, snapshot, rule["updated_at"],
+                                key_index=result.get("key_index")
+                            )
+                            await self.db.commit()
+                        
                     results.append({
                         "rule_id": rule_id,
                         "rule_name": rule_name,
                         "match_type": match_type,
                         "status": "success",
+                        "incremental": window is not None,
                         "matched_count": result.get("matched_count", 0),
                         "execution_time_ms": result.get("execution_time_ms", 0)
                     })
@@ -143,6 +186,40 @@ class AutoMatchingService:
                 "error": str(e)
             }
     
+    @staticmethod
+    def plan_rule_batches(rules: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Split rules into batches that can run in parallel
+        
+        Rules that share a source compete for the same unmatched rows, so
+        they end up in the same batch and run one after another (by rule
+        id, as in a sequential run); batches share no source.
+        
+        Returns:
+            List of rule id lists
+        """
+        parent = {}
+        
+        def find(item):
+            while parent[item] != item:
+                parent[item] = parent[parent[item]]
+                item = parent[item]
+            return item
+        
+        for rule in rules:
+            node = ("rule", rule["id"])
+            parent.setdefault(node, node)
+            for source in rule["conditions"].get("sources", []):
+                source_node = ("source", source)
+                parent.setdefault(source_node, source_node)
+                parent[find(source_node)] = find(node)
+        
+        batches: Dict[Any, List[int]] = {}
+        for rule in sorted(rules, key=lambda r: r["id"]):
+            batches.setdefault(find(("rule", rule["id"])), []).append(rule["id"])
+        
+        return list(batches.values())
+    
     async def _get_active_rules_for_channel(
         self,
         channel_id: int
@@ -151,7 +228,8 @@ class AutoMatchingService:
         Fetch all active matching rules for a channel
         
         Returns:
-            List of rules with id, rule_name, and match_type (2-way, 3-way, etc.)
+            List of rules with id, rule_name, match_type (2-way, 3-way, etc.)
+            and updated_at (invalidates incremental watermarks)
         """
         query = """
             SELECT 
@@ -160,7 +238,8 @@ class AutoMatchingService:
                 channel_id,
                 conditions,
                 tolerance,
-                status
+                status,
+                updated_at
             FROM tbl_cfg_matching_rule
             WHERE channel_id = :channel_id
             AND status = 1
@@ -194,7 +273,8 @@ class AutoMatchingService:
                 "channel_id": row.channel_id,
                 "match_type": match_type,
                 "conditions": conditions,
-                "tolerance": row.tolerance
+                "tolerance": row.tolerance,
+                "updated_at": row.updated_at
             })
         
         return rules
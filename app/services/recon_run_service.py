@@ -19,6 +19,8 @@ from app.db.models.user_config import UserConfig as User
 from app.db.models.source_config import SourceConfig as Source
 from app.db.models.upload_file import UploadFile
 from app.db.models.matching_rule_config import MatchingRuleConfig as MatchingRule
+from app.utils.typed_columns import txn_ts_conditions
+from app.config import settings
 
 
 async def get_reconciliation_runs(
@@ -37,11 +39,14 @@ async def get_reconciliation_runs(
 
     where_filters = []
 
-    if from_date:
-        where_filters.append(Transaction.date >= from_date)
+    if settings.TXN_TYPED_COLUMNS:
+        where_filters.extend(txn_ts_conditions(Transaction.txn_ts, from_date, to_date))
+    else:
+        if from_date:
+            where_filters.append(Transaction.date >= from_date)
 
-    if to_date:
-        where_filters.append(Transaction.date <= to_date)
+        if to_date:
+            where_filters.append(Transaction.date <= to_date)
 
     if channel_id:
         where_filters.append(Transaction.channel_id == channel_id)
@@ -335,10 +340,8 @@ async def get_transactions_by_recon_and_mode(
     }
 
 
-async def get_full_transactions_by_recon_reference(
-    db: AsyncSession,
-    recon_reference_number: str,
-):
+def _recon_reference_query(recon_reference_number: str):
+    """All transactions of one recon reference, with source and reconciler"""
     Reconciler = aliased(User)
 
     stmt = (
@@ -378,6 +381,14 @@ async def get_full_transactions_by_recon_reference(
         .order_by(Source.source_name, Transaction.created_at)
     )
 
+    return stmt
+
+
+async def get_full_transactions_by_recon_reference(
+    db: AsyncSession,
+    recon_reference_number: str,
+):
+    stmt = _recon_reference_query(recon_reference_number)
     rows = (await db.execute(stmt)).mappings().all()
 
     return {
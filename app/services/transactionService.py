@@ -2,6 +2,9 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.db.models.transactions import Transaction
 from sqlalchemy import select
+from app.config import settings
+from app.new_engine.unmatched_key_index import UnmatchedKeyIndex
+from app.db.repositories.recon_rollup_repository import ReconRollupRepository
 
 class TransactionService:
 
@@ -68,6 +71,10 @@ class TransactionService:
 
         # await db.commit()
         # return txns
+        if settings.RECON_ROLLUP:
+            # Out of their current rollup buckets before the patch ...
+            await ReconRollupRepository.remove_transactions(db, [txn.id for txn in txns])
+
         for txn in txns:
             # Apply allowed field updates
             for field, value in payload.items():
@@ -80,6 +87,20 @@ class TransactionService:
             if patch_type == "Manual" and match_status is not None:
                 txn.match_status = match_status
 
+        # Keep the matching rules' unmatched key index in step
+        if settings.MATCHING_KEY_INDEX and patch_type == "Manual" and match_status is not None:
+            await db.flush()
+            key_index = UnmatchedKeyIndex(db)
+            if match_status:
+                await key_index.remove([txn.id for txn in txns])
+            else:
+                await key_index.add([txn.id for txn in txns])
+
+        if settings.RECON_ROLLUP:
+            # ... and into the buckets of the patched values
+            await db.flush()
+            await ReconRollupRepository.add_transactions(db, [txn.id for txn in txns])
+
         await db.commit()
         return txns
 
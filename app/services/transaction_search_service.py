@@ -6,9 +6,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from typing import Optional, List, Dict, Any
 from collections import defaultdict
+import asyncio
 import math
 import json
 
+from app.db.session import AsyncSessionLocal
 from app.db.models.transactions import Transaction
 from app.db.models.source_config import SourceConfig
 from app.db.models.channel_config import ChannelConfig
@@ -23,6 +25,9 @@ from app.schemas.transaction_search_schemas import (
     SummaryStats
 )
 from app.utils.smart_search_detector import SmartSearchDetector
+from app.utils.other_details import other_details_text
+from app.utils.typed_columns import parse_amount, txn_ts_conditions
+from app.config import settings
 
 
 class TransactionSearchService:
@@ -39,6 +44,27 @@ class TransactionSearchService:
             return "Unmatched"
         return "Unknown"
 
+    @staticmethod
+    def _amount_condition(amount: str):
+        """Exact amount filter (numeric comparison on amount_numeric when enabled)"""
+        if settings.TXN_TYPED_COLUMNS:
+            value = parse_amount(amount)
+            if value is not None:
+                return Transaction.amount_numeric == value
+        return Transaction.amount == amount
+
+    @staticmethod
+    def _reference_condition(rrn: str):
+        """
+        Smart search condition for one reference number token
+        
+        A complete RRN (12 digits) uses = (btree index), anything else an
+        ILIKE '%value%' substring match (pg_trgm GIN index of the column).
+        """
+        if settings.SEARCH_EXACT_FAST_PATHS and SmartSearchDetector.is_full_rrn(rrn):
+            return Transaction.reference_number == rrn
+        return Transaction.reference_number.ilike(f"%{rrn}%")
+
     @staticmethod
     def _transform_transaction(
         transaction: Transaction, 
@@ -72,7 +98,7 @@ class TransactionSearchService:
             account_number=transaction.account_number,
             currency=transaction.ccy,
             match_status=transaction.match_status,
-            other_details=transaction.otherDetails,
+            other_details=other_details_text(transaction.otherDetails),
             match_status_label=match_status_label,
             match_rule_id=transaction.match_rule_id,
             match_rule_name=rule_name,
@@ -139,21 +165,21 @@ class TransactionSearchService:
         return result
 
     @staticmethod
-    def _calculate_summary(transactions: List[tuple]) -> SummaryStats:
-        """Calculate summary statistics"""
-        total_matched = 0
-        total_partial = 0
-        total_unmatched = 0
-        
-        for row in transactions:
-            transaction = row[0]
-            if transaction.match_status == 1:
-                total_matched += 1
-            elif transaction.match_status == 2:
-                total_partial += 1
-            elif transaction.match_status == 0:
-                total_unmatched += 1
+    async def _summarize(filters: List[Any], db: AsyncSession) -> SummaryStats:
+        """Match status counts of all transactions matching the filters (one aggregate)"""
+        summary_query = (
+            select(
+                func.count().filter(Transaction.match_status == 1),
+                func.count().filter(Transaction.match_status == 2),
+                func.count().filter(Transaction.match_status == 0)
+            )
+            .select_from(Transaction)
+        )
+        if filters:
+            summary_query = summary_query.where(*filters)
         
+        result = await db.execute(summary_query)
+        total_matched, total_partial, total_unmatched = result.one()
         return SummaryStats(
             total_matched=total_matched,
             total_partial=total_partial,
@@ -161,34 +187,122 @@ class TransactionSearchService:
         )
 
     @staticmethod
-    async def smart_search(
-        search_params: SmartSearchRequest,
+    async def _summarize_on_own_connection(filters: List[Any]) -> SummaryStats:
+        async with AsyncSessionLocal() as summary_db:
+            return await TransactionSearchService._summarize(filters, summary_db)
+
+    @staticmethod
+    def _recon_refs_query(filters: List[Any], offset: int, limit: int):
+        """One page of the distinct recon_reference_numbers matching the filters"""
+        recon_refs_query = (
+            select(func.distinct(Transaction.recon_reference_number))
+            .select_from(Transaction)
+        )
+        if filters:
+            recon_refs_query = recon_refs_query.where(*filters)
+        
+        return (
+            recon_refs_query
+            .order_by(Transaction.recon_reference_number.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+
+    @staticmethod
+    async def _search_grouped(
+        filters: List[Any],
+        page: int,
+        page_size: int,
         db: AsyncSession
     ) -> TransactionSearchResponse:
         """
-        Smart search that auto-detects field types from comma-separated input
+        One page of matching transactions grouped by recon_reference_number,
+        plus the match status summary of everything matching the filters
         
-        Args:
-            search_params: Smart search parameters with auto-detection
-            db: Database session
-            
-        Returns:
-            TransactionSearchResponse with matching records grouped by recon_reference_number
+        With SEARCH_CONCURRENT_SUMMARY the summary runs on a second pooled
+        connection while the page is fetched.
         """
-        # Build base query with joins
-        query = (
-            select(
-                Transaction,
-                SourceConfig.source_name,
-                ChannelConfig.channel_name,
-                MatchingRuleConfig.rule_name
+        summary_task = None
+        if settings.SEARCH_CONCURRENT_SUMMARY:
+            summary_task = asyncio.create_task(
+                TransactionSearchService._summarize_on_own_connection(filters)
             )
-            .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
-            .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
-            .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
+        
+        try:
+            # Get total count of unique recon_reference_numbers
+            count_query = (
+                select(func.count(func.distinct(Transaction.recon_reference_number)))
+                .select_from(Transaction)
+            )
+            if filters:
+                count_query = count_query.where(*filters)
+            
+            result = await db.execute(count_query)
+            total_groups = result.scalar_one()
+            
+            # Calculate pagination for groups
+            total_pages = math.ceil(total_groups / page_size) if total_groups > 0 else 0
+            offset = (page - 1) * page_size
+            
+            # Get distinct recon_reference_numbers with pagination
+            recon_refs_query = TransactionSearchService._recon_refs_query(filters, offset, page_size)
+            
+            result = await db.execute(recon_refs_query)
+            paginated_recon_refs = [row[0] for row in result.all()]
+            
+            # Fetch all transactions for the paginated recon_reference_numbers
+            if paginated_recon_refs:
+                transactions_query = (
+                    select(
+                        Transaction,
+                        SourceConfig.source_name,
+                        ChannelConfig.channel_name,
+                        MatchingRuleConfig.rule_name
+                    )
+                    .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
+                    .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
+                    .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
+                    .where(Transaction.recon_reference_number.in_(paginated_recon_refs))
+                    .order_by(Transaction.recon_reference_number.desc(), Transaction.source_id)
+                )
+                
+                result = await db.execute(transactions_query)
+                all_transactions = result.all()
+                
+                # Group transactions
+                grouped_transactions = TransactionSearchService._group_transactions_by_recon_ref(all_transactions)
+            else:
+                grouped_transactions = []
+            
+            # Summary of all matching transactions (not just paginated)
+            if summary_task is not None:
+                summary = await summary_task
+            else:
+                summary = await TransactionSearchService._summarize(filters, db)
+        except BaseException:
+            if summary_task is not None and not summary_task.done():
+                summary_task.cancel()
+            raise
+        
+        # Build pagination metadata
+        pagination = PaginationMeta(
+            page=page,
+            page_size=page_size,
+            total_records=total_groups,
+            total_pages=total_pages,
+            has_next=page < total_pages,
+            has_previous=page > 1
         )
         
-        # Apply filters
+        return TransactionSearchResponse(
+            transactions=grouped_transactions,
+            pagination=pagination,
+            summary=summary
+        )
+
+    @staticmethod
+    def _smart_search_filters(search_params: SmartSearchRequest) -> List[Any]:
+        """WHERE conditions of a smart search (see smart_search)"""
         filters = []
         
         # Parse search query if provided
@@ -201,17 +315,17 @@ class TransactionSearchService:
             # Add amount filters
             if categorized['amounts']:
                 for amount in categorized['amounts']:
-                    or_conditions.append(Transaction.amount == amount)
+                    or_conditions.append(TransactionSearchService._amount_condition(amount))
             
             # Add account number filters (partial match)
             if categorized['account_numbers']:
                 for account in categorized['account_numbers']:
                     or_conditions.append(Transaction.account_number.ilike(f"%{account}%"))
             
-            # Add reference number filters (partial match)
+            # Add reference number filters (exact if a complete RRN, else partial match)
             if categorized['reference_numbers']:
                 for rrn in categorized['reference_numbers']:
-                    or_conditions.append(Transaction.reference_number.ilike(f"%{rrn}%"))
+                    or_conditions.append(TransactionSearchService._reference_condition(rrn))
             
             # Add unknown values as wildcard search across all text fields
             if categorized['unknown']:
@@ -235,111 +349,43 @@ class TransactionSearchService:
                 filters.append(or_(*rrn_conditions))
         
         # Date range filter
-        if search_params.date_from:
-            filters.append(Transaction.date >= search_params.date_from)
-        
-        if search_params.date_to:
-            filters.append(Transaction.date <= search_params.date_to)
+        if settings.TXN_TYPED_COLUMNS:
+            filters.extend(txn_ts_conditions(
+                Transaction.txn_ts, search_params.date_from, search_params.date_to
+            ))
+        else:
+            if search_params.date_from:
+                filters.append(Transaction.date >= search_params.date_from)
+            
+            if search_params.date_to:
+                filters.append(Transaction.date <= search_params.date_to)
         
         # Source ID filter
         if search_params.source_id is not None:
             filters.append(Transaction.source_id == search_params.source_id)
         
-        # Apply all filters to query
-        if filters:
-            query = query.where(*filters)
-        
-        # Get total count of unique recon_reference_numbers
-        count_query = (
-            select(func.count(func.distinct(Transaction.recon_reference_number)))
-            .select_from(Transaction)
-        )
-        if filters:
-            count_query = count_query.where(*filters)
-        
-        result = await db.execute(count_query)
-        total_groups = result.scalar_one()
-        
-        # Calculate pagination for groups
-        total_pages = math.ceil(total_groups / search_params.page_size) if total_groups > 0 else 0
-        offset = (search_params.page - 1) * search_params.page_size
-        
-        # Get distinct recon_reference_numbers with pagination
-        recon_refs_query = (
-            select(func.distinct(Transaction.recon_reference_number))
-            .select_from(Transaction)
-        )
-        if filters:
-            recon_refs_query = recon_refs_query.where(*filters)
-        
-        recon_refs_query = (
-            recon_refs_query
-            .order_by(Transaction.recon_reference_number.desc())
-            .offset(offset)
-            .limit(search_params.page_size)
-        )
-        
-        result = await db.execute(recon_refs_query)
-        paginated_recon_refs = [row[0] for row in result.all()]
+        return filters
+
+    @staticmethod
+    async def smart_search(
+        search_params: SmartSearchRequest,
+        db: AsyncSession
+    ) -> TransactionSearchResponse:
+        """
+        Smart search that auto-detects field types from comma-separated input
         
-        # Fetch all transactions for the paginated recon_reference_numbers
-        if paginated_recon_refs:
-            transactions_query = (
-                select(
-                    Transaction,
-                    SourceConfig.source_name,
-                    ChannelConfig.channel_name,
-                    MatchingRuleConfig.rule_name
-                )
-                .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
-                .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
-                .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
-                .where(Transaction.recon_reference_number.in_(paginated_recon_refs))
-                .order_by(Transaction.recon_reference_number.desc(), Transaction.source_id)
-            )
-            
-            result = await db.execute(transactions_query)
-            all_transactions = result.all()
-            
-            # Group transactions
-            grouped_transactions = TransactionSearchService._group_transactions_by_recon_ref(all_transactions)
-            
-            # Calculate summary from all matching transactions (not just paginated)
-            summary_query = (
-                select(
-                    Transaction,
-                    SourceConfig.source_name,
-                    ChannelConfig.channel_name,
-                    MatchingRuleConfig.rule_name
-                )
-                .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
-                .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
-                .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
-            )
-            if filters:
-                summary_query = summary_query.where(*filters)
+        Args:
+            search_params: Smart search parameters with auto-detection
+            db: Database session
             
-            result = await db.execute(summary_query)
-            all_matching_transactions = result.all()
-            summary = TransactionSearchService._calculate_summary(all_matching_transactions)
-        else:
-            grouped_transactions = []
-            summary = SummaryStats()
-        
-        # Build pagination metadata
-        pagination = PaginationMeta(
-            page=search_params.page,
-            page_size=search_params.page_size,
-            total_records=total_groups,
-            total_pages=total_pages,
-            has_next=search_params.page < total_pages,
-            has_previous=search_params.page > 1
-        )
+        Returns:
+            TransactionSearchResponse with matching records grouped by recon_reference_number
+        """
+        # Apply filters
+        filters = TransactionSearchService._smart_search_filters(search_params)
         
-        return TransactionSearchResponse(
-            transactions=grouped_transactions,
-            pagination=pagination,
-            summary=summary
+        return await TransactionSearchService._search_grouped(
+            filters, search_params.page, search_params.page_size, db
         )
 
     @staticmethod
@@ -357,19 +403,6 @@ class TransactionSearchService:
         Returns:
             TransactionSearchResponse with matching records grouped by recon_reference_number
         """
-        # Build base query with joins
-        query = (
-            select(
-                Transaction,
-                SourceConfig.source_name,
-                ChannelConfig.channel_name,
-                MatchingRuleConfig.rule_name
-            )
-            .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
-            .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
-            .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
-        )
-        
         # Apply filters
         filters = []
         
@@ -386,113 +419,25 @@ class TransactionSearchService:
             )
         
         # Date range filter
-        if search_params.date_from:
-            filters.append(Transaction.date >= search_params.date_from)
-        
-        if search_params.date_to:
-            filters.append(Transaction.date <= search_params.date_to)
+        if settings.TXN_TYPED_COLUMNS:
+            filters.extend(txn_ts_conditions(
+                Transaction.txn_ts, search_params.date_from, search_params.date_to
+            ))
+        else:
+            if search_params.date_from:
+                filters.append(Transaction.date >= search_params.date_from)
+            
+            if search_params.date_to:
+                filters.append(Transaction.date <= search_params.date_to)
         
         # Amount filter (exact match)
         if search_params.amount is not None:
-            filters.append(Transaction.amount == search_params.amount)
+            filters.append(TransactionSearchService._amount_condition(search_params.amount))
         
         # Source ID filter
         if search_params.source_id is not None:
             filters.append(Transaction.source_id == search_params.source_id)
         
-        # Apply all filters to query
-        if filters:
-            query = query.where(*filters)
-        
-        # Get total count of unique recon_reference_numbers
-        count_query = (
-            select(func.count(func.distinct(Transaction.recon_reference_number)))
-            .select_from(Transaction)
-        )
-        if filters:
-            count_query = count_query.where(*filters)
-        
-        result = await db.execute(count_query)
-        total_groups = result.scalar_one()
-        
-        # Calculate pagination for groups
-        total_pages = math.ceil(total_groups / search_params.page_size) if total_groups > 0 else 0
-        offset = (search_params.page - 1) * search_params.page_size
-        
-        # Get distinct recon_reference_numbers with pagination
-        recon_refs_query = (
-            select(func.distinct(Transaction.recon_reference_number))
-            .select_from(Transaction)
-        )
-        if filters:
-            recon_refs_query = recon_refs_query.where(*filters)
-        
-        recon_refs_query = (
-            recon_refs_query
-            .order_by(Transaction.recon_reference_number.desc())
-            .offset(offset)
-            .limit(search_params.page_size)
-        )
-        
-        result = await db.execute(recon_refs_query)
-        paginated_recon_refs = [row[0] for row in result.all()]
-        
-        # Fetch all transactions for the paginated recon_reference_numbers
-        if paginated_recon_refs:
-            transactions_query = (
-                select(
-                    Transaction,
-                    SourceConfig.source_name,
-                    ChannelConfig.channel_name,
-                    MatchingRuleConfig.rule_name
-                )
-                .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
-                .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
-                .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
-                .where(Transaction.recon_reference_number.in_(paginated_recon_refs))
-                .order_by(Transaction.recon_reference_number.desc(), Transaction.source_id)
-            )
-            
-            result = await db.execute(transactions_query)
-            all_transactions = result.all()
-            
-            # Group transactions
-            grouped_transactions = TransactionSearchService._group_transactions_by_recon_ref(all_transactions)
-            
-            # Calculate summary from all matching transactions (not just paginated)
-            summary_query = (
-                select(
-                    Transaction,
-                    SourceConfig.source_name,
-                    ChannelConfig.channel_name,
-                    MatchingRuleConfig.rule_name
-                )
-                .outerjoin(SourceConfig, Transaction.source_id == SourceConfig.id)
-                .outerjoin(ChannelConfig, Transaction.channel_id == ChannelConfig.id)
-                .outerjoin(MatchingRuleConfig, Transaction.match_rule_id == MatchingRuleConfig.id)
-            )
-            if filters:
-                summary_query = summary_query.where(*filters)
-            
-            result = await db.execute(summary_query)
-            all_matching_transactions = result.all()
-            summary = TransactionSearchService._calculate_summary(all_matching_transactions)
-        else:
-            grouped_transactions = []
-            summary = SummaryStats()
-        
-        # Build pagination metadata
-        pagination = PaginationMeta(
-            page=search_params.page,
-            page_size=search_params.page_size,
-            total_records=total_groups,
-            total_pages=total_pages,
-            has_next=search_params.page < total_pages,
-            has_previous=search_params.page > 1
-        )
-        
-        return TransactionSearchResponse(
-            transactions=grouped_transactions,
-            pagination=pagination,
-            summary=summary
+        return await TransactionSearchService._search_grouped(
+            filters, search_params.page, search_params.page_size, db
         )
@@ -365,19 +365,20 @@
 #             "message": "Failed to delete the record",
 #             "result": []
 #         }
-import io
+import asyncio
 import os
 from random import random
 import secrets
 import string
 import time
 from fastapi import HTTPException
-import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.repositories.upload import UploadRepository
 from app.db.repositories.userRepository import UserRepository
 from app.services.batch_config_service import BatchConfigService
+from app.utils.upload_reader import UploadLayout, file_size, iter_chunks, scan_upload
+from app.utils.upload_staging import discard_upload, stage_batch, staging_enabled
 from app.workers.tasks import start_recon_job, process_upload_batch
 
 # from app.workers.tasks import process_batch
@@ -406,29 +407,22 @@ class UploadService:
                     status_code=400, detail="Only CSV, XLS, and XLSX files are allowed"
                 )
 
-            contents = await file.read()
             ext = os.path.splitext(file.filename)[1].lower()
 
-            if ext == ".csv":
-                df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
-            else:
-                df = pd.read_excel(io.BytesIO(contents))
+            # STREAMING: the body is already spooled to a temporary file; count
+            # the rows chunk by chunk instead of loading and parsing it whole
+            # (process_file_in_chunks builds the batches in a second pass)
+            upload_size = file_size(file.file)
+            layout = await asyncio.to_thread(scan_upload, file.file, ext)
+            total_records = layout.total_rows
 
             # Use authenticated user_id instead of fetching from repository
             print(f"[UPLOAD SERVICE] Using authenticated user_id: {user_id}")
-            # Replace NaN with None (JSON safe)
-            df = df.where(pd.notnull(df), "")
-
-            # columns = df.columns.tolist()
-            total_records = len(df)
-            # fileData = df.head(5).to_dict(orient="records")
-            df.columns = [str(col).strip().lower() for col in df.columns]
-            fileData = df.to_dict(orient="records")
             fileDetails = {
                 "file_name": file.filename,
                 "file_details": {
                     "file_type": source_id,
-                    "file_size": "{:.2f} KB".format(len(contents) / 1024),
+                    "file_size": "{:.2f} KB".format(upload_size / 1024),
                 },
                 "channel_id": channel_id,
                 "status": 0,
@@ -523,6 +517,7 @@ class UploadService:
                 channel_id=channel_id,
                 source_id=source_id,
                 user_detail=user_id,  # CHANGED: Use authenticated user_id
+                layout=layout,
                 column_mappings={
                     "date": getDateTimeColumnName,
                     "amount": getAmountColumnName,
@@ -561,6 +556,7 @@ class UploadService:
         source_id: int,
         user_detail: int,
         column_mappings: dict,
+        layout: UploadLayout | None = None,
     ):
         """
         OPTIMIZED: Process large files using chunked reading and optimized batches.
@@ -608,6 +604,7 @@ class UploadService:
                 source_id=source_id,
                 user_detail=user_detail,
                 column_mappings=column_mappings,
+                layout=layout,
             )
 
             return result
@@ -631,17 +628,16 @@ class UploadService:
         source_id: int,
         user_detail: int,
         column_mappings: dict,
+        layout: UploadLayout | None = None,
     ):
         """
         MEMORY OPTIMIZATION: Read file in chunks instead of loading all at once.
 
         This prevents memory overflow for large files (500K+ records).
-        Uses pandas chunksize parameter to stream data.
+        Streams the spooled upload (pandas chunksize for CSV, openpyxl
+        read-only mode for XLSX); only one batch is parsed at a time.
         """
         try:
-            # Reset file pointer to beginning
-            await file.seek(0)
-            contents = await file.read()
             ext = os.path.splitext(file.filename)[1].lower()
 
             task_ids = []
@@ -658,27 +654,25 @@ class UploadService:
             }
 
             # CHUNKED PROCESSING: Read and process file in batches
-            if ext == ".csv":
-                # CSV: Use chunksize for streaming
-                chunks = pd.read_csv(
-                    io.StringIO(contents.decode("utf-8")), chunksize=batch_size
-                )
-            else:
-                # Excel: Read once (Excel doesn't support chunking well)
-                df = pd.read_excel(io.BytesIO(contents))
-                df = df.where(pd.notnull(df), "")
-                df.columns = [str(col).strip().lower() for col in df.columns]
-
-                # Split into chunks manually
-                chunks = [df[i : i + batch_size] for i in range(0, len(df), batch_size)]
+            # (parsing runs in a worker thread so the event loop stays free)
+            chunks = iter_chunks(file.file, ext, batch_size, layout)
 
             # Submit Celery tasks for each batch
-            for chunk in chunks:
-                if ext == ".csv":
-                    chunk = chunk.where(pd.notnull(chunk), "")
-                    chunk.columns = [str(col).strip().lower() for col in chunk.columns]
-
-                batch_data = chunk.to_dict(orient="records")
+            first_row = 0
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+
+                batch_data = None
+                batch_ref = None
+                if staging_enabled():
+                    # CLAIM CHECK: stage the rows on shared storage, send only the reference
+                    batch_ref = await asyncio.to_thread(
+                        stage_batch, file_id, batch_number, first_row, chunk
+                    )
+                else:
+                    batch_data = chunk.to_dict(orient="records")
 
                 # Submit task with correct signature
                 task = process_upload_batch.delay(
@@ -688,18 +682,20 @@ class UploadService:
                     batch_number=batch_number,
                     total_batches=num_batches,
                     column_mappings=column_mappings,
+                    batch_ref=batch_ref,
                 )
 
                 task_ids.append(
                     {
                         "task_id": task.id,
                         "batch_number": batch_number,
-                        "batch_size": len(batch_data),
+                        "batch_size": len(chunk),
                         "status": "QUEUED",
                     }
                 )
 
                 batch_number += 1
+                first_row += len(chunk)
 
             return {
                 "status": "success",
@@ -747,6 +743,8 @@ class UploadService:
     async def deleteFileAndTransactions(self, file_id: int):
         getResult = await UploadRepository.deleteFileAndTransactions(self.db, file_id)
         if getResult:
+            # Batches of the upload still waiting on shared storage
+            discard_upload(file_id)
             return {
                 "status": "success",
                 "errors": False,
@@ -0,0 +1,193 @@
+"""
+Two-tier cache of the upload network mapping
+
+Every API and Celery worker process keeps the mapping built by
+UploadRepository._build_network_mapping in memory. With REDIS_URL set, that
+copy is backed by a versioned snapshot in Redis:
+
+    recon:network_mapping:version           bumped by invalidate()
+    recon:network_mapping:snapshot          mapping JSON, tagged with the
+    recon:network_mapping:snapshot_version  version it was built for
+
+A process re-checks the two version keys at most every
+NETWORK_CACHE_CHECK_SECONDS (one MGET). When its copy is behind, it loads the
+snapshot. Only when the snapshot itself is behind (or has expired) is the
+database read, by the one process holding a short Redis lock; the others
+wait for its snapshot, so restarting every worker at once costs one rebuild.
+A snapshot is tagged with the version read before the rebuild started, so an
+invalidation that races with a rebuild is never lost.
+
+invalidate() bumps the version: every process picks up network / channel
+changes within NETWORK_CACHE_CHECK_SECONDS. Snapshots expire after CACHE_TTL,
+which bounds staleness when the tables are edited without an invalidation.
+
+Without REDIS_URL, or while Redis is unreachable, the in-process copy is
+used on its own and expires after CACHE_TTL, as before.
+"""
+
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import time
+import uuid
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+CACHE_TTL = timedelta(hours=1)
+
+# Rebuild lock: held while one process reads the database
+REBUILD_LOCK_SECONDS = 30
+# How long the other processes wait for that snapshot before reading the
+# database themselves
+REBUILD_WAIT_SECONDS = 5.0
+REBUILD_POLL_SECONDS = 0.1
+
+_client = None
+_client_loop = None
+
+
+def _redis() -> Optional[aioredis.Redis]:
+    """Redis client of the running event loop (None without REDIS_URL)"""
+    global _client, _client_loop
+    if not settings.REDIS_URL:
+        return None
+    # Celery workers run tasks on their own loop; a client is bound to one
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = aioredis.Redis.from_url(
+            settings.REDIS_URL, socket_connect_timeout=2, socket_timeout=2
+        )
+        _client_loop = loop
+    return _client
+
+
+class SharedSnapshotCache:
+    """
+    In-process value backed by a versioned Redis snapshot
+
+    Args:
+        name: Redis key prefix (recon:<name>:...)
+        ttl: Lifetime of a snapshot (and of the in-process copy without Redis)
+    """
+
+    def __init__(self, name: str, ttl: timedelta = CACHE_TTL):
+        self.version_key = f"recon:{name}:version"
+        self.snapshot_key = f"recon:{name}:snapshot"
+        self.snapshot_version_key = f"recon:{name}:snapshot_version"
+        self.lock_key = f"recon:{name}:rebuild_lock"
+        self.ttl = ttl
+
+        self._value: Any = None
+        self._version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    async def get(
+        self,
+        load: Callable[[], Awaitable[Dict[str, Any]]],
+        prepare: Callable[[Dict[str, Any]], Any],
+    ) -> Any:
+        """
+        Current value
+
+        Args:
+            load: Reads the data from the database (JSON-serializable dict)
+            prepare: Turns loaded or snapshot data into the in-process value
+
+        Returns:
+            prepare() of the newest data
+        """
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < settings.NETWORK_CACHE_CHECK_SECONDS:
+            return self._value
+
+        client = _redis()
+        if client is not None:
+            try:
+                return await self._get_shared(client, load, prepare)
+            except RedisError as e:
+                print(f"⚠️ Shared cache {self.version_key} unavailable: {e}")
+
+        # Process-local only
+        self._checked_at = now
+        if self._value is not None and now - self._loaded_at < self.ttl.total_seconds():
+            return self._value
+        return self._keep(prepare(await load()), None)
+
+    async def invalidate(self) -> None:
+        """Drop this process's copy and bump the shared version"""
+        self._value = None
+        self._version = None
+        client = _redis()
+        if client is None:
+            return
+        try:
+            await client.incr(self.version_key)
+        except RedisError as e:
+            print(f"⚠️ Could not bump {self.version_key}: {e}")
+
+    async def _get_shared(self, client, load, prepare) -> Any:
+        version, snapshot_version = await client.mget(
+            self.version_key, self.snapshot_version_key
+        )
+        version = int(version or 0)
+        snapshot_current = snapshot_version is not None and int(snapshot_version) == version
+
+        if snapshot_current and self._version == version and self._value is not None:
+            self._checked_at = time.monotonic()
+            return self._value
+
+        if snapshot_current:
+            data = await self._read_snapshot(client, version)
+            if data is not None:
+                return self._keep(prepare(data), version)
+
+        return await self._rebuild(client, version, load, prepare)
+
+    async def _read_snapshot(self, client, version: int) -> Optional[Dict[str, Any]]:
+        raw = await client.get(self.snapshot_key)
+        if raw is None:
+            return None
+        snapshot = json.loads(raw)
+        return snapshot["data"] if snapshot.get("version") == version else None
+
+    async def _rebuild(self, client, version: int, load, prepare) -> Any:
+        token = uuid.uuid4().hex
+        if not await client.set(self.lock_key, token, nx=True, ex=REBUILD_LOCK_SECONDS):
+            # Another process is rebuilding: wait for its snapshot
+            deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(REBUILD_POLL_SECONDS)
+                data = await self._read_snapshot(client, version)
+                if data is not None:
+                    return self._keep(prepare(data), version)
+            print(f"⚠️ No snapshot for {self.version_key}={version} in time, loading locally")
+            return self._keep(prepare(await load()), None)
+
+        try:
+            data = await load()
+            snapshot = json.dumps({"version": version, "data": data})
+            ttl = int(self.ttl.total_seconds())
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(self.snapshot_key, snapshot, ex=ttl)
+                pipe.set(self.snapshot_version_key, version, ex=ttl)
+                await pipe.execute()
+            return self._keep(prepare(data), version)
+        finally:
+            if await client.get(self.lock_key) == token.encode():
+                await client.delete(self.lock_key)
+
+    def _keep(self, value: Any, version: Optional[int]) -> Any:
+        now = time.monotonic()
+        self._value = value
+        self._version = version
+        self._loaded_at = now
+        self._checked_at = now
+        return value
+
+
+network_mapping_cache = SharedSnapshotCache("network_mapping")
@@ -0,0 +1,222 @@
+"""
+Precompiled network lookup for uploaded transactions
+
+_build_network_mapping turns every network name into a set of lower-cased
+patterns ("airtel", "nfs airtel", ...). A transaction is mapped to a network
+from its card number first (the card type detected from the BIN, looked up
+as a pattern) and otherwise from its service name: an exact pattern, else
+the longest pattern contained in the name (the first one built on a tie).
+
+NetworkResolver compiles the patterns once per mapping refresh:
+
+- service names: Aho-Corasick automaton over the patterns, so a name is
+  scanned once instead of being tested against every pattern
+- card numbers: digit trie over the BIN prefixes below, each node holding
+  the card type of the highest-priority rule matching its prefix
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# BIN rules in priority order: (card type, prefix length, first, last).
+# A card number matches when its first `length` digits lie in [first, last].
+BIN_RULES: List[Tuple[str, int, int, int]] = [
+    ("visa", 1, 4, 4),
+    ("mastercard", 2, 51, 55),
+    ("mastercard", 4, 2221, 2720),
+    ("amex", 2, 34, 34),
+    ("amex", 2, 37, 37),
+    ("discover", 4, 6011, 6011),
+    ("discover", 2, 65, 65),
+    ("discover", 4, 6440, 6499),
+    ("discover", 6, 622126, 622925),
+    ("diners", 2, 36, 36),
+    ("diners", 2, 38, 38),
+    ("diners", 3, 300, 305),
+    ("jcb", 4, 3528, 3589),
+    ("unionpay", 2, 62, 62),
+    ("rupay", 2, 60, 60),
+    ("rupay", 4, 6521, 6522),
+]
+
+
+class _BinTrie:
+    """Digit trie of the BIN rule prefixes"""
+
+    def __init__(self, rules: List[Tuple[str, int, int, int]]):
+        self._children: List[Dict[str, int]] = [{}]
+        # Priority (rule index) of the best rule matching each node's prefix
+        priorities: List[int] = [len(rules)]
+
+        for priority, (_, length, first, last) in enumerate(rules):
+            for value in range(first, last + 1):
+                node = 0
+                for digit in str(value).zfill(length):
+                    child = self._children[node].get(digit)
+                    if child is None:
+                        child = len(self._children)
+                        self._children[node][digit] = child
+                        self._children.append({})
+                        priorities.append(len(rules))
+                    node = child
+                priorities[node] = min(priorities[node], priority)
+
+        # A prefix also matches every rule of its own prefixes
+        self._card_types: List[Optional[str]] = [None] * len(self._children)
+        stack = [(0, len(rules))]
+        while stack:
+            node, inherited = stack.pop()
+            best = min(priorities[node], inherited)
+            self._card_types[node] = rules[best][0] if best < len(rules) else None
+            stack.extend((child, best) for child in self._children[node].values())
+
+    def card_type(self, card_number: Any) -> Optional[str]:
+        if not card_number:
+            return None
+
+        card_str = str(card_number).strip()
+        # Masked cards ("453789******7041"): the BIN is before the asterisks
+        if "*" in card_str:
+            card_str = card_str.split("*")[0]
+
+        node = 0
+        for char in card_str:
+            # Separators (spaces, dashes) are skipped
+            if not char.isdigit():
+                continue
+            child = self._children[node].get(char)
+            if child is None:
+                break
+            node = child
+        return self._card_types[node]
+
+
+_BIN_TRIE = _BinTrie(BIN_RULES)
+
+
+def detect_card_type(card_number: Any) -> Optional[str]:
+    """
+    Card type (visa, mastercard, amex, ...) of a full or masked card number
+
+    Returns:
+        Card type name, or None if no BIN rule matches
+    """
+    return _BIN_TRIE.card_type(card_number)
+
+
+class NetworkResolver:
+    """
+    network_id lookup for one set of network patterns
+
+    Args:
+        patterns: Pattern -> network_id, in the order _build_network_mapping
+            built them (that order breaks ties between equally long patterns)
+    """
+
+    def __init__(self, patterns: Dict[str, int]):
+        self.patterns = patterns
+        self._network_ids: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+
+        ranked = sorted(enumerate(patterns), key=lambda item: (-len(item[1]), item[0]))
+        no_match = len(ranked)
+        node_rank = [no_match]
+        for rank, (_, pattern) in enumerate(ranked):
+            self._network_ids.append(patterns[pattern])
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    node_rank.append(no_match)
+                node = child
+            node_rank[node] = min(node_rank[node], rank)
+
+        # Failure links breadth-first. _best: rank (lower is better) of the
+        # best pattern ending at each node, its failure chain included
+        self._best = list(node_rank)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while char not in self._goto[fallback] and fallback:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._best[child] = min(node_rank[child], self._best[self._fail[child]])
+                queue.append(child)
+
+        self._no_match = no_match
+
+    def match_service(self, service_name: Any) -> Optional[int]:
+        """network_id of the best pattern found in a service name (None if none)"""
+        if not service_name:
+            return None
+
+        goto = self._goto
+        fail = self._fail
+        best = self._best
+        node = 0
+        found = best[0]
+        for char in str(service_name).lower().strip():
+            while char not in goto[node] and node:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if best[node] < found:
+                found = best[node]
+        return self._network_ids[found] if found < self._no_match else None
+
+    def match_card(self, card_number: Any) -> Optional[int]:
+        """network_id of the card type detected from a card number (None if none)"""
+        if not card_number:
+            return None
+        card_type = detect_card_type(card_number)
+        return self.patterns.get(card_type) if card_type else None
+
+    def resolve(self, service_name: Any, card_number: Any = None) -> Optional[int]:
+        """network_id from the card number first, otherwise from the service name"""
+        network_id = self.match_card(card_number)
+        if network_id is not None:
+            return network_id
+        return self.match_service(service_name)
+
+    def resolve_many(
+        self, service_names: Iterable[Any], card_numbers: Optional[Iterable[Any]] = None
+    ) -> List[Optional[int]]:
+        """
+        resolve() for a whole column; each distinct service name and card
+        number is looked up once
+
+        Args:
+            service_names: Service name per row (list or pandas Series)
+            card_numbers: Card number per row (same length), or None
+
+        Returns:
+            network_id (or None) per row
+        """
+        service_names = _as_list(service_names)
+        by_service = _map_distinct(service_names, self.match_service)
+        if card_numbers is None:
+            return by_service
+
+        by_card = _map_distinct(_as_list(card_numbers), self.match_card)
+        return [
+            card if card is not None else service
+            for card, service in zip(by_card, by_service)
+        ]
+
+
+def _as_list(values: Iterable[Any]) -> List[Any]:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def _map_distinct(values: List[Any], func) -> List[Any]:
+    results = {}
+    for value in values:
+        if value not in results:
+            results[value] = func(value)
+    return [results[value] for value in values]
@@ -0,0 +1,44 @@
+"""
+tbl_txn_transactions.otherDetails (JSONB): the raw file row of a transaction
+
+Uploads store the row as a JSON object, so single raw columns can be read
+(->>) or filtered (@>, GIN jsonb_path_ops index) in SQL. Rows written before
+the column became JSONB may hold other JSON values, e.g. the legacy
+"card|terminal|merchant" text as a JSON string.
+"""
+
+import json
+import math
+from typing import Any, Dict, Optional
+
+
+def dumps_other_details(row: Dict[str, Any]) -> str:
+    """
+    JSON text of a raw row that PostgreSQL accepts as jsonb
+
+    json.dumps as before (default=str), except that NaN / Infinity (e.g.
+    amounts the normalizer could not parse) become null and NUL characters
+    are dropped: jsonb has neither.
+    """
+    try:
+        text = json.dumps(row, default=str, allow_nan=False)
+    except ValueError:
+        text = None
+    if text is None or "\\u0000" in text:
+        text = json.dumps({key: _jsonb_value(value) for key, value in row.items()}, default=str)
+    return text
+
+
+def other_details_text(value: Any) -> Optional[str]:
+    """otherDetails as the text the APIs return (legacy strings unquoted)"""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _jsonb_value(value: Any) -> Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, str) and "\x00" in value:
+        return value.replace("\x00", "")
+    return value
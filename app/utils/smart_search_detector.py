@@ -8,6 +8,9 @@ from typing import Dict, List, Set
 class SmartSearchDetector:
     """Intelligently detect whether a value is RRN, account number, or amount"""
     
+    # Complete RRNs are looked up exactly instead of by substring
+    FULL_RRN_LENGTH = 12
+    
     @staticmethod
     def detect_field_type(value: str) -> str:
         """
@@ -53,6 +56,20 @@ class SmartSearchDetector:
         
         return 'unknown'
     
+    @staticmethod
+    def is_full_rrn(value: str) -> bool:
+        """
+        Check whether a reference number is a complete RRN (exactly 12
+        digits, ISO 8583) rather than a fragment of one
+        
+        Args:
+            value: The search value
+            
+        Returns:
+            True if the value can be matched with equality
+        """
+        return bool(value) and value.isdigit() and len(value) == SmartSearchDetector.FULL_RRN_LENGTH
+    
     @staticmethod
     def parse_search_query(search_query: str) -> Dict[str, List[str]]:
         """
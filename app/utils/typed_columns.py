@@ -0,0 +1,104 @@
+"""
+Typed shadow values of tbl_txn_transactions.amount / .date
+
+amount and date are stored as strings (exactly as uploaded). amount_numeric
+and txn_ts hold the same values as NUMERIC(20,4) / TIMESTAMPTZ so that
+summaries, range filters and the matcher work on typed, indexable columns.
+
+The parsing mirrors ReconDataNormalizer: currency symbols and thousands
+separators are dropped from amounts, dates are read ISO first and day-first
+otherwise. Timestamps without a zone are taken as UTC, and so are the
+YYYY-MM-DD bounds of the API filters (txn_ts_conditions), so a filter day
+covers the same wall-clock day that was uploaded.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional
+import re
+
+_AMOUNT_NOISE = re.compile(r"[₹$,\s]")
+
+# NUMERIC(20,4)
+_AMOUNT_QUANTUM = Decimal("0.0001")
+_AMOUNT_LIMIT = Decimal("1e16")
+
+_DAY_FIRST_FORMATS = (
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y%m%d%H%M%S",
+    "%Y%m%d",
+)
+
+
+def parse_amount(value: Any) -> Optional[Decimal]:
+    """Amount string -> Decimal rounded to 4 places (None if not a number)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        text_value = str(value)
+    else:
+        text_value = _AMOUNT_NOISE.sub("", str(value))
+    if not text_value or text_value.lower() in ("nan", "none", "null"):
+        return None
+    try:
+        amount = Decimal(text_value)
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or abs(amount) >= _AMOUNT_LIMIT:
+        return None
+    return amount.quantize(_AMOUNT_QUANTUM)
+
+
+def parse_txn_ts(value: Any) -> Optional[datetime]:
+    """Date / datetime string -> timezone-aware datetime (None if unparseable)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text_value = str(value).strip()
+        if not text_value or text_value in ("nan", "NaT", "None"):
+            return None
+        parsed = None
+        try:
+            parsed = datetime.fromisoformat(text_value.replace("Z", "+00:00"))
+        except ValueError:
+            for fmt in _DAY_FIRST_FORMATS:
+                try:
+                    parsed = datetime.strptime(text_value, fmt)
+                    break
+                except ValueError:
+                    continue
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def txn_ts_conditions(column, date_from: Optional[str], date_to: Optional[str]) -> List[Any]:
+    """
+    Range conditions on txn_ts for the API's date_from / date_to filters
+
+    A bare YYYY-MM-DD date_to covers that whole day.
+    """
+    conditions = []
+    if date_from:
+        lower = parse_txn_ts(date_from)
+        if lower is None:
+            raise ValueError(f"Invalid date_from: {date_from}")
+        conditions.append(column >= lower)
+    if date_to:
+        upper = parse_txn_ts(date_to)
+        if upper is None:
+            raise ValueError(f"Invalid date_to: {date_to}")
+        if len(date_to.strip()) == 10:
+            conditions.append(column < upper + timedelta(days=1))
+        else:
+            conditions.append(column <= upper)
+    return conditions
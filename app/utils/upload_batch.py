@@ -0,0 +1,395 @@
+"""
+Column-wise preparation of an upload batch
+
+saveFileDetails receives a batch as a list of row dicts, all taken from one
+DataFrame chunk, so every row has the same keys. Instead of walking the alias
+lists below for every row, the candidate source columns of each field are
+resolved once from that header, and the transaction values are built a whole
+column at a time:
+
+- explicit mapping present in the header: that column for every row
+  (reference_number / date fall back to the aliases where it is empty,
+  txn_id does not)
+- otherwise: the first alias column with a value in the row, as before,
+  evaluated as a coalesce over the candidate columns
+
+Values keep their Python types (object arrays), so str() / strftime give
+exactly what the per-row code produced.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+AMOUNT_FIELDS = [
+    "amount",
+    "transaction_amount",
+    "transaction amount",
+    "amt",
+    "txn_amt",
+    "txn amt",
+    "txn-amount",
+    "txn_amount",
+    "homeamount",
+    "home_amount",
+    "home amount",
+    "localamount",
+    "local_amount",
+    "local amount",
+    "baseamount",
+    "base_amount",
+    "base amount",
+    "debit",
+    "credit",
+    "dramount",
+    "cramount",
+    "dr amount",
+    "cr amount",
+]
+
+DATE_FIELDS = [
+    "date",
+    "txn_date",
+    "txn date",
+    "txndate",
+    "txndatetime",
+    "txn_datetime",
+    "txn datetime",
+    "transaction_date",
+    "transaction date",
+    "transactiondatetime",
+    "transaction_datetime",
+    "transaction datetime",
+    "postingdate",
+    "posting_date",
+    "posting date",
+    "value_date",
+    "valuedate",
+    "value date",
+    "datetime",
+    "timestamp",
+    "created_at",
+    "created at",
+    "entry_date",
+    "entrydate",
+    "entry date",
+]
+
+ACCOUNT_FIELDS = [
+    "account_number",
+    "accountnumber",
+    "account number",
+    "acct_number",
+    "acctnumber",
+    "acct number",
+    "accountno",
+    "account_no",
+    "account no",
+    "acctno",
+    "acct_no",
+    "acct no",
+    "accountno_masked",
+    "account_no_masked",
+    "account no masked",
+    "acctno_masked",
+    "acct_no_masked",
+    "acct no masked",
+    "customer_account",
+    "customeraccount",
+    "customer account",
+    "beneficiary_account",
+    "beneficiaryaccount",
+    "beneficiary account",
+    "payer_account",
+    "payeraccount",
+    "payer account",
+    "payee_account",
+    "payeeaccount",
+    "payee account",
+]
+
+REFERENCE_FIELDS = [
+    "transaction_id",
+    "transaction id",
+    "rrn",
+    "reference_number",
+    "reference number",
+    "referencenumber",
+    "ref_number",
+    "ref number",
+    "refnumber",
+    "retrieval_reference_number",
+    "retrieval reference number",
+]
+
+TXN_ID_FIELDS = [
+    "receipt_number",
+    "receipt number",
+    "payer_transaction_id",
+    "payer transaction id",
+    "stan",
+    "txn_id",
+    "txn id",
+    "transactionid",
+    "txnid",
+]
+
+# Card numbers (for card type detection); account columns sometimes hold them
+CARD_NUMBER_FIELDS = [
+    "card_number",
+    "card number",
+    "cardnumber",
+    "cardno_masked",
+    "cardno masked",
+    "card_no_masked",
+    "card no masked",
+    "pan",
+    "card_pan",
+    "cardpan",
+    "account_number",
+    "account number",
+    "accountno_masked",
+    "account_no_masked",
+]
+
+SERVICE_FIELDS = [
+    "service_name",
+    "service name",
+    "servicename",
+    "network",
+    "network_name",
+    "network name",
+    "provider",
+    "provider_name",
+    "provider name",
+    "operator",
+    "operator_name",
+    "operator name",
+    "payer_client",
+    "payer client",
+    "service",
+    "channel",
+    "card_type",
+    "card type",
+]
+
+_EMPTY_DATES = ["", "nan", "NaT", "None"]
+
+
+def prepare_batch(
+    rows: List[Dict[str, Any]],
+    amount_column: Optional[str] = None,
+    date_column: Optional[str] = None,
+    account_column: Optional[str] = None,
+    currency_column: Optional[str] = None,
+    reference_column: Optional[str] = None,
+    txn_id_column: Optional[str] = None,
+    service_name_column: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """
+    Transaction values of a batch, one column per field
+
+    Args:
+        rows: Row dicts of one chunk (lower-cased column names)
+        *_column: Explicitly mapped source columns (None = auto-detect)
+
+    Returns:
+        (frame, sources): frame has the columns amount, date, account_number,
+        ccy, reference_number, txn_id, service_name, card_number (None where
+        nothing was found) and key_amount, key_date, key_ccy (duplicate key
+        parts: str() of the mapped column, None if it is not mapped);
+        sources lists the header columns each field was taken from
+    """
+    count = len(rows)
+    header = set().union(*rows)
+    extracted: Dict[str, np.ndarray] = {}
+    sources: Dict[str, List[str]] = {}
+
+    def mapped(column: Optional[str]) -> bool:
+        return column is not None and column in header
+
+    def column(name: str) -> np.ndarray:
+        if name not in extracted:
+            extracted[name] = _array([row.get(name) for row in rows])
+        return extracted[name]
+
+    def candidates(field: str, names: List[Optional[str]]) -> List[np.ndarray]:
+        present = [name for name in names if mapped(name)]
+        sources[field] = present
+        return [column(name) for name in present]
+
+    def explicit(name: Optional[str]) -> np.ndarray:
+        # str() of the mapped column for every row (None if not mapped)
+        if not mapped(name):
+            return np.full(count, None, dtype=object)
+        return _array([str(value) for value in column(name)])
+
+    prepared = {}
+
+    if mapped(amount_column):
+        prepared["amount"] = explicit(amount_column)
+        sources["amount"] = [amount_column]
+    else:
+        prepared["amount"] = _coalesce(count, candidates("amount", AMOUNT_FIELDS), _stripped_text)
+
+    # The explicit date column skips "nan" / "NaT" / "None" strings too
+    if mapped(date_column):
+        date_columns = candidates("date", [date_column] + DATE_FIELDS)
+        prepared["date"] = _coalesce(count, date_columns, _date_text, first_convert=_explicit_date_text)
+    else:
+        prepared["date"] = _coalesce(count, candidates("date", DATE_FIELDS), _date_text)
+
+    if mapped(account_column):
+        prepared["account_number"] = explicit(account_column)
+        sources["account_number"] = [account_column]
+    else:
+        prepared["account_number"] = _coalesce(
+            count, candidates("account_number", ACCOUNT_FIELDS), _stripped_text
+        )
+
+    prepared["ccy"] = explicit(currency_column)
+    sources["ccy"] = [currency_column] if mapped(currency_column) else []
+
+    prepared["reference_number"] = _coalesce(
+        count, candidates("reference_number", [reference_column] + REFERENCE_FIELDS), _stripped_text
+    )
+
+    # An explicit txn_id column has no alias fallback
+    txn_id_columns = [txn_id_column] if mapped(txn_id_column) else TXN_ID_FIELDS
+    prepared["txn_id"] = _coalesce(count, candidates("txn_id", txn_id_columns), _stripped_text)
+
+    # Network lookup inputs: raw service name, stripped card number
+    prepared["service_name"] = _coalesce(
+        count, candidates("service_name", [service_name_column] + SERVICE_FIELDS), _truthy_raw
+    )
+    prepared["card_number"] = _coalesce(
+        count, candidates("card_number", CARD_NUMBER_FIELDS), _truthy_stripped
+    )
+
+    # Duplicate key parts come from the mapped columns only
+    prepared["key_amount"] = explicit(amount_column)
+    prepared["key_date"] = explicit(date_column)
+    prepared["key_ccy"] = prepared["ccy"]
+
+    return pd.DataFrame(prepared, dtype=object), sources
+
+
+def network_inputs(
+    rows: List[Dict[str, Any]], service_name_column: Optional[str] = None
+) -> Tuple[List[Any], List[Any]]:
+    """
+    Network lookup inputs of raw rows (e.g. stored otherDetails), found as
+    prepare_batch finds them
+
+    Rows may have different keys.
+
+    Returns:
+        (service_names, card_numbers): per row, None where nothing was found
+    """
+    count = len(rows)
+    header = set().union(*rows)
+
+    def columns(names: List[Optional[str]]) -> List[np.ndarray]:
+        return [
+            _array([row.get(name) for row in rows])
+            for name in names
+            if name is not None and name in header
+        ]
+
+    service_names = _coalesce(count, columns([service_name_column] + SERVICE_FIELDS), _truthy_raw)
+    card_numbers = _coalesce(count, columns(CARD_NUMBER_FIELDS), _truthy_stripped)
+    return service_names.tolist(), card_numbers.tolist()
+
+
+def map_unique(values: pd.Series, func: Callable[[Any], Any]) -> List[Any]:
+    """func applied to a column, called once per distinct value"""
+    values = values.tolist()
+    uniques = {}
+    for value in values:
+        if value not in uniques:
+            uniques[value] = func(value)
+    return [uniques[value] for value in values]
+
+
+def repeated_keys(batch: pd.DataFrame, with_ccy: bool) -> pd.Series:
+    """
+    Rows whose duplicate key already appeared earlier in the batch
+
+    Keys with an unmapped part (None) are never repeats, as they never
+    match a stored transaction either.
+    """
+    checkable = batch["key_amount"].notna() & batch["key_date"].notna()
+    if with_ccy:
+        checkable &= batch["key_ccy"].notna()
+    return checkable & batch.duplicated(subset=["key_amount", "key_date", "key_ccy"])
+
+
+# Converters: column values -> (valid mask, converted values). The element
+# work is plain str() / strip() in list comprehensions (pandas string
+# methods on object columns cost several times more); masks and the
+# coalesce run on NumPy arrays.
+Converter = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+def _coalesce(
+    count: int,
+    columns: List[np.ndarray],
+    convert: Converter,
+    first_convert: Optional[Converter] = None,
+) -> np.ndarray:
+    """Per row, the converted value of the first column whose value is valid"""
+    result = np.full(count, None, dtype=object)
+    missing = np.ones(count, dtype=bool)
+    for position, values in enumerate(columns):
+        if not missing.any():
+            break
+        valid, converted = (first_convert if position == 0 and first_convert else convert)(values)
+        take = missing & valid
+        result[take] = converted[take]
+        missing &= ~take
+    return result
+
+
+def _array(values: List[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _not_none(values: np.ndarray) -> np.ndarray:
+    return np.array([value is not None for value in values], dtype=bool)
+
+
+def _stripped_text(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # value is not None and str(value).strip() -> str(value).strip()
+    stripped = _array([str(value).strip() for value in values])
+    return _not_none(values) & (stripped != ""), stripped
+
+
+def _date_text(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # value is not None and str(value).strip() -> formatted, unstripped
+    valid, _ = _stripped_text(values)
+    return valid, _array([_format_date(value) for value in values])
+
+
+def _explicit_date_text(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    valid = _not_none(values) & np.array(
+        [str(value) not in _EMPTY_DATES for value in values], dtype=bool
+    )
+    return valid, _array([_format_date(value) for value in values])
+
+
+def _truthy_raw(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return np.array([bool(value) for value in values], dtype=bool), values
+
+
+def _truthy_stripped(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    truthy, _ = _truthy_raw(values)
+    return truthy, _array([str(value).strip() for value in values])
+
+
+def _format_date(value: Any) -> str:
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
@@ -0,0 +1,261 @@
+"""
+Streaming readers for uploaded CSV / Excel files
+
+FastAPI spools upload bodies over 1 MB to a temporary file; these helpers read
+that file object directly instead of loading the upload into memory. An
+upload is read twice, both times one chunk at a time: scan_upload() counts
+the rows (sizing the Celery batches) and gathers the facts about the whole
+file the chunks need, iter_chunks() then yields one batch DataFrame after
+another.
+
+- .csv: pandas read_csv with chunksize (UTF-8)
+- .xlsx: openpyxl read-only mode, first sheet, each chunk parsed by the
+  TextParser pandas.read_excel uses; column types are inferred over the
+  whole sheet in the scan (a blank or a 2.5 anywhere makes a whole-number
+  column float in every chunk, a text cell keeps the column as written), so
+  chunks hold exactly the values read_excel would
+- .xls: legacy format (max 65,536 rows) without a streaming reader, loaded
+  whole with pandas
+
+Chunks come back the way the upload path has always built them: column names
+stripped and lower-cased, missing values as "".
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+# Rows per chunk of the counting pass
+COUNT_CHUNK_SIZE = 50000
+
+
+@dataclass
+class UploadLayout:
+    total_rows: int  # data rows, header excluded
+    width: int = 0  # .xlsx: cells of the widest row (read_excel pads every row to it)
+    dtypes: Dict[int, Any] = field(default_factory=dict)  # .xlsx: column index -> whole-sheet dtype to coerce chunks to
+
+
+def file_size(fileobj) -> int:
+    """Size in bytes of a (spooled) file object; leaves it at position 0"""
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size
+
+
+def scan_upload(fileobj, ext: str) -> UploadLayout:
+    """
+    Count the data rows (header excluded) chunk by chunk
+
+    For .xlsx the scan also records the sheet width and the type every
+    column has over the whole sheet, which iter_chunks() applies to each
+    chunk.
+
+    Args:
+        fileobj: Binary file object of the upload
+        ext: File extension (.csv, .xlsx, .xls)
+
+    Returns:
+        UploadLayout; total_rows equals the total length of iter_chunks()
+    """
+    fileobj.seek(0)
+    if ext == ".csv":
+        reader = pd.read_csv(fileobj, encoding="utf-8", usecols=[0], chunksize=COUNT_CHUNK_SIZE)
+        return UploadLayout(total_rows=sum(len(chunk) for chunk in reader))
+    if ext == ".xlsx":
+        return _scan_xlsx(fileobj)
+    return UploadLayout(total_rows=len(pd.read_excel(fileobj)))
+
+
+def iter_chunks(
+    fileobj, ext: str, chunk_size: int, layout: Optional[UploadLayout] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the upload as DataFrames of at most chunk_size rows
+
+    Args:
+        fileobj: Binary file object of the upload
+        ext: File extension (.csv, .xlsx, .xls)
+        chunk_size: Rows per DataFrame
+        layout: scan_upload() result of the same file (scanned here if
+            missing for an .xlsx)
+    """
+    if ext == ".xlsx" and layout is None:
+        layout = scan_upload(fileobj, ext)
+    fileobj.seek(0)
+    if ext == ".csv":
+        for chunk in pd.read_csv(fileobj, encoding="utf-8", chunksize=chunk_size):
+            yield _clean_chunk(chunk)
+    elif ext == ".xlsx":
+        yield from _iter_xlsx_chunks(fileobj, chunk_size, layout)
+    else:
+        df = pd.read_excel(fileobj)
+        for start in range(0, len(df), chunk_size):
+            yield _clean_chunk(df[start : start + chunk_size])
+
+
+def _clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = chunk.where(pd.notnull(chunk), "")
+    chunk.columns = [str(col).strip().lower() for col in chunk.columns]
+    return chunk
+
+
+def _iter_xlsx_chunks(fileobj, chunk_size: int, layout: UploadLayout) -> Iterator[pd.DataFrame]:
+    for header, batch in _xlsx_batches(fileobj, chunk_size):
+        yield _clean_chunk(_xlsx_frame(header, batch, layout.width, layout.dtypes))
+
+
+def _scan_xlsx(fileobj) -> UploadLayout:
+    """
+    Row count, width and whole-sheet column types of the first sheet
+
+    Each batch is parsed the way read_excel parses the whole sheet and the
+    per-batch column types are combined into the type read_excel infers
+    over all rows: text anywhere keeps every value as written (object),
+    otherwise a blank or a non-whole number anywhere makes the column float.
+    """
+    total_rows = 0
+    width = 0
+    batch_widths = []
+    kinds: Dict[int, set] = {}
+    blank_columns = set()
+    for header, batch in _xlsx_batches(fileobj, COUNT_CHUNK_SIZE):
+        batch_width = max([len(header)] + [len(row) for row in batch])
+        frame = _xlsx_frame(header, batch, batch_width, {})
+        for index in range(batch_width):
+            values = frame.iloc[:, index]
+            blank = values.isna()
+            if blank.any():
+                blank_columns.add(index)
+            if not blank.all():
+                kinds.setdefault(index, set()).update(_column_kinds(values, batch, index))
+        total_rows += len(batch)
+        width = max(width, batch_width)
+        batch_widths.append(batch_width)
+
+    # Columns a batch does not reach are blank in all of its rows
+    blank_columns.update(range(min(batch_widths, default=width), width))
+
+    dtypes = {}
+    for index, column_kinds in kinds.items():
+        blanks = index in blank_columns
+        if column_kinds <= {"int", "float", "bool"}:
+            if blanks or "float" in column_kinds:
+                dtypes[index] = np.float64
+            elif column_kinds == {"int", "bool"}:
+                dtypes[index] = np.int64
+        elif column_kinds <= {"datetime"}:
+            if blanks:
+                # Batches with only blank dates stay dates (NaT)
+                dtypes[index] = "datetime64[ns]"
+        elif column_kinds <= {"bool", "bool_text"}:
+            # "True"/"False" text is read as bools in every batch
+            continue
+        else:
+            dtypes[index] = object
+    return UploadLayout(total_rows=total_rows, width=width, dtypes=dtypes)
+
+
+def _column_kinds(values: pd.Series, batch: List[List[Any]], index: int) -> set:
+    """Types read_excel gives the column's (non-blank) values in one batch"""
+    cells = [row[index] for row in batch if len(row) > index]
+    if values.dtype.kind in "iu":
+        # True/False cells among whole numbers are read as 1/0
+        return {"int", "bool"} if any(isinstance(cell, bool) for cell in cells) else {"int"}
+    if values.dtype.kind == "f":
+        return {"float"}
+    if values.dtype.kind == "M":
+        return {"datetime"}
+    if values.dtype.kind == "b":
+        # True/False cells are numbers to read_excel, "True"/"False" text is not
+        return {"bool_text"} if any(isinstance(cell, str) for cell in cells) else {"bool"}
+    if all(isinstance(value, bool) for value in values.dropna()):
+        # "True"/"False" text next to blanks
+        return {"bool_text"}
+    return {"object"}
+
+
+def _xlsx_batches(fileobj, batch_size: int) -> Iterator[tuple]:
+    """(header, rows) of the first sheet, at most batch_size rows at a time"""
+    rows = _xlsx_rows(fileobj)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    batch: List[List[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield header, batch
+            batch = []
+    if batch:
+        yield header, batch
+
+
+def _xlsx_rows(fileobj) -> Iterator[List[Any]]:
+    """
+    Cell values of the first sheet, row by row, converted as read_excel does
+
+    Trailing empty cells are trimmed. Empty rows are held back until a
+    non-empty row follows, so the empty rows at the end of the sheet are
+    dropped (as pandas.read_excel does).
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        pending_empty = 0
+        for cells in sheet.iter_rows():
+            row = [_xlsx_value(cell) for cell in cells]
+            while row and row[-1] == "":
+                row.pop()
+            if not row:
+                pending_empty += 1
+                continue
+            for _ in range(pending_empty):
+                yield []
+            pending_empty = 0
+            yield row
+    finally:
+        workbook.close()
+
+
+def _xlsx_value(cell) -> Any:
+    """Cell value as read_excel's openpyxl reader converts it"""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        if value == cell.value:
+            return value
+        return float(cell.value)
+    return cell.value
+
+
+def _xlsx_frame(header: List[Any], batch: List[List[Any]], width: int, dtypes: Dict[int, Any]) -> pd.DataFrame:
+    """
+    DataFrame of one batch, parsed by the TextParser read_excel uses
+
+    Rows are padded to the sheet width (cells right of the header get
+    "Unnamed: i" columns in every row, as in read_excel) and the columns in
+    dtypes are coerced to their whole-sheet type.
+    """
+    rows = [row + [""] * (width - len(row)) for row in [header] + batch]
+    parser = TextParser(rows, header=0, skip_blank_lines=False, dtype=dtypes or None)
+    frame = parser.read()
+    for index, dtype in dtypes.items():
+        # Dates of a batch without the column's text cells are still inferred
+        if dtype is object and frame.iloc[:, index].dtype.kind == "M":
+            frame.isetitem(index, frame.iloc[:, index].astype(object))
+    return frame
@@ -0,0 +1,85 @@
+"""
+Claim-check staging of upload batches
+
+Without staging, process_file_in_chunks ships every batch to Celery as a list
+of row dicts, so each row goes through Redis as JSON. With
+UPLOAD_STAGING_DIR set, the API writes each batch DataFrame to that directory
+and the task only receives a small reference:
+
+    {"path": ".../upload_42/batch_00007.jsonl", "first_row": 30000, "rows": 5000}
+
+The directory has to be shared by the API and the workers (local disk when
+they run on the same host, otherwise NFS or a mounted MinIO/S3 bucket).
+Batches are stored as JSON lines, one row per line, written with kombu's JSON
+codec: the rows load exactly as the broker payload did (datetimes included),
+and a staged file is only ever parsed as data, never executed.
+
+A batch file is removed once its task has saved the rows, or once its last
+retry has failed; failed batches stay for the Celery retry.
+"""
+
+from typing import Any, Dict, List
+import os
+import shutil
+
+import pandas as pd
+from kombu.utils.json import dumps, loads
+
+from app.config import settings
+
+
+def staging_enabled() -> bool:
+    return bool(settings.UPLOAD_STAGING_DIR)
+
+
+def _upload_dir(file_id: int) -> str:
+    return os.path.join(settings.UPLOAD_STAGING_DIR, f"upload_{file_id}")
+
+
+def stage_batch(file_id: int, batch_number: int, first_row: int, chunk: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Write one batch to the staging directory
+
+    Args:
+        file_id: Upload file ID
+        batch_number: Batch number (1-indexed)
+        first_row: Index of the batch's first data row in the file
+        chunk: Cleaned batch DataFrame
+
+    Returns:
+        Reference to pass to process_upload_batch (batch_ref)
+    """
+    directory = _upload_dir(file_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"batch_{batch_number:05d}.jsonl")
+
+    # Write under a temporary name so a worker never sees a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        for row in chunk.to_dict(orient="records"):
+            fh.write(dumps(row))
+            fh.write("\n")
+    os.replace(tmp_path, path)
+
+    return {"path": path, "first_row": first_row, "rows": len(chunk)}
+
+
+def load_batch(batch_ref: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rows of a staged batch, as the batch_data list the task used to receive"""
+    with open(batch_ref["path"], encoding="utf-8") as fh:
+        return [loads(line) for line in fh if line.strip()]
+
+
+def discard_batch(batch_ref: Dict[str, Any]) -> None:
+    """Remove a processed batch (and the upload's directory once it is empty)"""
+    try:
+        os.remove(batch_ref["path"])
+        os.rmdir(os.path.dirname(batch_ref["path"]))
+    except OSError:
+        pass
+
+
+def discard_upload(file_id: int) -> None:
+    """Remove everything staged for an upload"""
+    if staging_enabled():
+        shutil.rmtree(_upload_dir(file_id), ignore_errors=True)
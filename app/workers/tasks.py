@@ -1,13 +1,17 @@
 from app.celery_app import celery_app
+from celery import group
+from app.config import settings
 import asyncio, json
 from app.engine.reconciliation_engine import ReconciliationEngine
 from app.db.session import AsyncSessionLocal
 from app.db.repositories.upload import UploadRepository
 from app.services.auto_matching_service import AutoMatchingService
+from app.new_engine.application_matcher import ApplicationMatcher
 from sqlalchemy import text
 
 import pandas as pd
 from app.services.data_normalize_service import ReconDataNormalizer
+from app.utils.upload_staging import load_batch, discard_batch
 
 import asyncio
 from datetime import datetime
@@ -72,6 +76,7 @@ def process_upload_batch(
     batch_number: int,
     total_batches: int,
     column_mappings: dict,
+    batch_ref: dict = None,
 ):
     """
     Process a batch of uploaded transactions.
@@ -88,12 +93,17 @@ def process_upload_batch(
         batch_number: Current batch number (1-indexed)
         total_batches: Total number of batches
         column_mappings: Dict with keys: date, amount, account_number, currency
+        batch_ref: Staged batch (UPLOAD_STAGING_DIR) to load instead of batch_data
     """
-    print(
-        f"Processing batch {batch_number}/{total_batches} for file {file_id} ({len(batch_data)} records)"
-    )
-
     try:
+        # CLAIM CHECK: the rows were staged on shared storage by the API
+        if batch_ref:
+            batch_data = load_batch(batch_ref)
+
+        print(
+            f"Processing batch {batch_number}/{total_batches} for file {file_id} ({len(batch_data)} records)"
+        )
+
 
         async def process_batch():
             async with AsyncSessionLocal() as db:
@@ -232,10 +242,16 @@ def process_upload_batch(
         # Run async function using persistent event loop
         loop = get_or_create_event_loop()
         result = loop.run_until_complete(process_batch())
+
+        if batch_ref:
+            discard_batch(batch_ref)
         return result
 
     except Exception as exc:
         print(f"Error processing batch {batch_number}: {str(exc)}")
+        if batch_ref and self.request.retries >= self.max_retries:
+            # Last attempt failed: no retry will read the staged batch again
+            discard_batch(batch_ref)
         raise self.retry(exc=exc, countdown=30)
 
 
@@ -404,7 +420,34 @@ def auto_trigger_matching(
                     # Step 6: Initialize auto-matching service
                     auto_match_service = AutoMatchingService(db)
                     
-                    # Step 7: Trigger matching for the channel
+                    # Step 7: Fan independent rules out to parallel tasks.
+                    # Rules sharing a source stay in one batch (sequential)
+                    if settings.MATCHING_PARALLEL_RULES:
+                        active_rules = await auto_match_service._get_active_rules_for_channel(channel_id)
+                        batches = AutoMatchingService.plan_rule_batches(active_rules)
+                        
+                        if len(batches) > 1:
+                            group(
+                                execute_matching_rule_batch.s(
+                                    channel_id=channel_id,
+                                    source_id=source_id,
+                                    rule_ids=rule_ids,
+                                    file_id=file_id
+                                )
+                                for rule_ids in batches
+                            ).apply_async()
+                            print(
+                                f"Auto-matching fanned out for channel {channel_id}: "
+                                f"{len(batches)} parallel rule batches {batches}"
+                            )
+                            return {
+                                "status": "dispatched",
+                                "channel_id": channel_id,
+                                "batches": batches,
+                                "message": f"Dispatched {len(batches)} parallel rule batches"
+                            }
+                    
+                    # Step 8: Trigger matching for the channel
                     result = await auto_match_service.trigger_matching_for_channel(
                         channel_id=channel_id,
                         source_id=source_id,
@@ -437,6 +480,203 @@ def auto_trigger_matching(
         # Retry with backoff (30s, then 60s)
         raise self.retry(exc=exc, countdown=30)
 
+@celery_app.task(bind=True, max_retries=2, name="app.workers.tasks.execute_matching_rule_batch")
+def execute_matching_rule_batch(
+    self,
+    channel_id: int,
+    source_id: int,
+    rule_ids: list,
+    file_id: int
+):
+    """
+    Execute one batch of matching rules (see AutoMatchingService.plan_rule_batches)
+    
+    Batches of a channel share no source and run in parallel, each on its own
+    database session. Within the service every rule also holds the advisory
+    locks of its sources, so a batch still queues behind another run (e.g. of
+    a second upload) over the same sources instead of double-claiming rows.
+    
+    Args:
+        channel_id: Channel ID that received new transactions
+        source_id: Source ID of the uploaded file
+        rule_ids: Rules of this batch, executed in order
+        file_id: Upload file ID for logging/tracking
+    """
+    print(f"Matching rule batch {rule_ids} for channel {channel_id} (file {file_id})")
+    
+    try:
+        async def run_batch():
+            async with AsyncSessionLocal() as db:
+                return await AutoMatchingService(db).trigger_matching_for_channel(
+                    channel_id=channel_id,
+                    source_id=source_id,
+                    dry_run=False,
+                    rule_ids=rule_ids
+                )
+        
+        loop = get_or_create_event_loop()
+        result = loop.run_until_complete(run_batch())
+        print(
+            f"Rule batch {rule_ids} completed for channel {channel_id}: "
+            f"{result.get('total_matches', 0)} matches found"
+        )
+        return result
+    
+    except Exception as exc:
+        print(f"Error in rule batch {rule_ids}: {str(exc)}")
+        raise self.retry(exc=exc, countdown=30)
+
+
+@celery_app.task(
+    bind=True,
+    name="app.workers.tasks.match_rule_partition",
+    queue=settings.MATCHING_PARTITION_QUEUE,
+)
+def match_rule_partition(
+    self,
+    rule_id: int,
+    conditions: dict,
+    tolerance: dict,
+    channel_id: int,
+    min_sources: int,
+    recon_group_number: str,
+    partition: int,
+    partitions: int
+):
+    """
+    Match one key hash partition of a claimed matching run
+    (see ApplicationMatcher._execute_partitions)
+    
+    Returns:
+        {"partition": int, "matched_count": int, "transaction_ids": List[int]}
+    """
+    async def run_partition():
+        async with AsyncSessionLocal() as db:
+            return await ApplicationMatcher(db).execute_partition(
+                rule_id=rule_id,
+                conditions=conditions,
+                tolerance=tolerance,
+                channel_id=channel_id,
+                min_sources=min_sources,
+                recon_group_number=recon_group_number,
+                partition=partition,
+                partitions=partitions
+            )
+    
+    loop = get_or_create_event_loop()
+    return loop.run_until_complete(run_partition())
+
+
+@celery_app.task(
+    bind=True,
+    max_retries=5,
+    acks_late=True,
+    name="app.workers.tasks.backfill_network_ids",
+)
+def backfill_network_ids(
+    self,
+    channel_ids: list = None,
+    batch_size: int = 5000,
+    checkpoint: dict = None
+):
+    """
+    Re-resolve network_id of existing transactions, channel by channel
+    (UploadRepository.updateNetworkIdForChannel: keyset batches, one commit
+    per batch)
+
+    Every committed batch is reported as PROGRESS state, with the checkpoint
+    to resume from. Retries continue from that checkpoint, and so does a
+    redelivery after a worker crash (acks_late: the task reads its own last
+    PROGRESS state back).
+
+    Args:
+        channel_ids: Channels to update (default: every channel with networks)
+        batch_size: Transactions per batch
+        checkpoint: Where to resume (set by retries)
+    """
+    if checkpoint is None:
+        previous = self.AsyncResult(self.request.id)
+        if previous.state == "PROGRESS" and isinstance(previous.info, dict):
+            checkpoint = previous.info.get("checkpoint")
+            print(f"Resuming network_id backfill from {checkpoint}")
+
+    totals_keys = ("processed", "updated", "set_null", "unchanged", "unparsed")
+    state = checkpoint or {
+        "channel_ids": channel_ids,
+        "channel_index": 0,
+        "last_id": 0,
+        "totals": {key: 0 for key in totals_keys},
+    }
+
+    async def run_backfill():
+        async with AsyncSessionLocal() as db:
+            if state["channel_ids"] is None:
+                network_mapping = await UploadRepository._build_network_mapping(db)
+                state["channel_ids"] = [
+                    channel_id
+                    for channel_id, has_networks in network_mapping.get("channel_configs", {}).items()
+                    if has_networks
+                ]
+
+            while state["channel_index"] < len(state["channel_ids"]):
+                channel_id = state["channel_ids"][state["channel_index"]]
+                base = dict(state["totals"])
+
+                def report(stats):
+                    state["last_id"] = stats["last_id"]
+                    state["totals"] = {key: base[key] + stats[key] for key in totals_keys}
+                    self.update_state(
+                        state="PROGRESS",
+                        meta={
+                            "channel_id": channel_id,
+                            "channel": state["channel_index"] + 1,
+                            "channels": len(state["channel_ids"]),
+                            "channel_processed": stats["processed"],
+                            "channel_total": stats["total"],
+                            **state["totals"],
+                            "checkpoint": state,
+                        },
+                    )
+
+                result = await UploadRepository.updateNetworkIdForChannel(
+                    db,
+                    channel_id=channel_id,
+                    batch_size=batch_size,
+                    after_id=state["last_id"],
+                    progress=report,
+                )
+                if result.get("error"):
+                    raise RuntimeError(
+                        f"network_id backfill failed for channel {channel_id}: {result.get('message')}"
+                    )
+
+                state["channel_index"] += 1
+                state["last_id"] = 0
+
+            return {
+                "status": "success",
+                "channels": state["channel_ids"],
+                **state["totals"],
+            }
+
+    try:
+        loop = get_or_create_event_loop()
+        result = loop.run_until_complete(run_backfill())
+        print(
+            f"network_id backfill completed for channels {result['channels']}: "
+            f"{result['updated']:,} of {result['processed']:,} transactions updated"
+        )
+        return result
+
+    except Exception as exc:
+        print(f"Error in network_id backfill: {str(exc)}")
+        raise self.retry(
+            exc=exc,
+            countdown=60,
+            kwargs={"channel_ids": channel_ids, "batch_size": batch_size, "checkpoint": state},
+        )
+
+
 @celery_app.task(
     name="app.workers.tasks.file_pickup_scheduler.run",
     queue="file-pickup-scheduler",
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Re-resolve tbl_txn_transactions.network_id from the stored otherDetails
+Run after networks or channel network settings change (and after
+scripts/clear_network_cache.py). Works in keyset batches, one commit per
+batch; a stopped run resumes with --channel-id / --after-id. With --celery
+the backfill_network_ids task is queued instead (it reports PROGRESS state
+and resumes on its own after retries and worker restarts).
+
+Usage:
+    python scripts/backfill_network_ids.py                                # every channel with networks
+    python scripts/backfill_network_ids.py --channel-id 3 [--after-id 0] [--batch-size 5000]
+    python scripts/backfill_network_ids.py --celery [--channel-id 3]
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import contextlib
+import os
+
+from app.db.session import get_db
+from app.db.repositories.upload import UploadRepository
+
+
+async def backfill_network_ids(channel_id, after_id: int, batch_size: int):
+    async for db in get_db():
+        if channel_id is not None:
+            channel_ids = [channel_id]
+        else:
+            network_mapping = await UploadRepository._build_network_mapping(db)
+            channel_ids = [
+                cid for cid, has_networks in network_mapping.get("channel_configs", {}).items()
+                if has_networks
+            ]
+
+        for cid in channel_ids:
+            def report(stats):
+                # Real stdout: the repository's prints are muted below
+                if stats["processed"] % (batch_size * 20) == 0:
+                    print(
+                        f"   ... {stats['processed']:,}/{stats['total']:,} rows, last id {stats['last_id']}",
+                        file=sys.__stdout__, flush=True
+                    )
+
+            # updateNetworkIdForChannel logs every batch; keep the output readable
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = await UploadRepository.updateNetworkIdForChannel(
+                    db, channel_id=cid, batch_size=batch_size, after_id=after_id, progress=report
+                )
+            if result["error"]:
+                print(f"❌ Channel {cid} stopped: {result['message']}")
+                print(f"   Resume with --channel-id {cid} --after-id {result.get('last_id', after_id)}")
+                return
+            print(
+                f"✅ Channel {cid}: {result.get('total_processed', 0):,} rows, "
+                f"{result.get('updated_count', 0):,} updated "
+                f"({result.get('null_count', 0):,} set to NULL) - {result['status']}"
+            )
+            after_id = 0
+        break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill network_id of existing transactions")
+    parser.add_argument("--channel-id", type=int, default=None, help="Only this channel")
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this transaction id (inline runs)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per batch")
+    parser.add_argument("--celery", action="store_true", help="Queue the Celery task instead")
+    args = parser.parse_args()
+
+    if args.celery:
+        from app.workers.tasks import backfill_network_ids as backfill_task
+
+        task = backfill_task.delay(
+            channel_ids=[args.channel_id] if args.channel_id is not None else None,
+            batch_size=args.batch_size,
+        )
+        print(f"✅ Queued backfill_network_ids: task id {task.id}")
+        return
+
+    asyncio.run(backfill_network_ids(args.channel_id, args.after_id, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Backfill tbl_txn_transactions.amount_numeric / txn_ts for existing rows
+Runs online in small keyset batches (one commit per batch) and can be
+stopped and resumed with --after-id. When it is done, rebuild the
+reconciliation rollup and turn on TXN_TYPED_COLUMNS.
+
+Usage:
+    python scripts/backfill_typed_columns.py [--batch-size 5000] [--after-id 0] [--sleep 0.0]
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+from app.db.session import get_db
+from app.db.repositories.upload import UploadRepository
+
+
+async def backfill_typed_columns(after_id: int, batch_size: int, sleep: float):
+    async for db in get_db():
+        updated = 0
+        unparsed = 0
+        batches = 0
+        while True:
+            result = await UploadRepository.backfillTypedColumns(
+                db, after_id=after_id, batch_size=batch_size
+            )
+            if result["error"]:
+                print(f"❌ Stopped after id {after_id}: {result['message']}")
+                print(f"   Resume with --after-id {after_id}")
+                return
+            if result["last_id"] is None:
+                break
+
+            after_id = result["last_id"]
+            updated += result["updated"]
+            unparsed += result["unparsed"]
+            batches += 1
+            if batches % 20 == 0:
+                print(f"   ... {updated:,} rows, last id {after_id}")
+            if sleep:
+                await asyncio.sleep(sleep)
+
+        print(f"✅ Backfill complete: {updated:,} rows in {batches} batches, {unparsed:,} with unparseable amount/date")
+        break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill typed amount/date columns")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per batch")
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this transaction id")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Pause between batches (seconds)")
+    args = parser.parse_args()
+    asyncio.run(backfill_typed_columns(args.after_id, args.batch_size, args.sleep))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Rule Predicate Benchmark
+Per-candidate cost of evaluating a logic_expression the old way
+(SimpleNamespace per source + eval of the compiled code) against the
+closure built by app.new_engine.rule_compiler.
+
+Usage:
+    python scripts/bench_rule_predicates.py [--candidates 200000]
+"""
+
+import argparse
+import ast
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.new_engine.rule_compiler import compile_predicate  # noqa: E402
+
+
+EXPRESSIONS = [
+    "ATM.reference_number == SWITCH.reference_number",
+    "ATM.reference_number == SWITCH.reference_number == CBS.reference_number and ATM.amount == CBS.amount",
+    "(ATM.card_number == CBS.card_number or ATM.reference_number == CBS.reference_number) and SWITCH.amount == CBS.amount",
+]
+
+
+def make_candidates(source_names, count, seed=7):
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(count):
+        reference = f"R{rng.randint(0, 50)}"
+        candidates.append(tuple(
+            {
+                "id": i * 10 + position,
+                "reference_number": reference if rng.random() < 0.9 else f"X{i}",
+                "rrn": reference,
+                "amount": rng.choice([100.0, 200.0, 50.5]),
+                "date": "2026-01-01",
+                "account_number": "A1",
+                "card_number": rng.choice(["4111", "5111"]),
+                "source_name": source,
+            }
+            for position, source in enumerate(source_names)
+        ))
+    return candidates
+
+
+def run_eval(tree, source_names, candidates):
+    compiled_expr = compile(tree, "<rule>", "eval")
+    matches = 0
+    for txn_tuple in candidates:
+        context = {
+            src: SimpleNamespace(**txn)
+            for src, txn in zip(source_names, txn_tuple)
+        }
+        try:
+            if eval(compiled_expr, {}, context):
+                matches += 1
+        except Exception:
+            continue
+    return matches
+
+
+def run_closure(tree, source_names, candidates):
+    predicate = compile_predicate(tree, source_names)
+    matches = 0
+    for txn_tuple in candidates:
+        if predicate(txn_tuple):
+            matches += 1
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rule predicate evaluation")
+    parser.add_argument("--candidates", type=int, default=200000, help="Candidate tuples per expression")
+    args = parser.parse_args()
+
+    for expression in EXPRESSIONS:
+        tree = ast.parse(expression, mode="eval")
+        source_names = sorted({node.id for node in ast.walk(tree) if isinstance(node, ast.Name)})
+        candidates = make_candidates(source_names, args.candidates)
+
+        timings = {}
+        results = {}
+        for name, runner in (("eval", run_eval), ("closure", run_closure)):
+            start = time.perf_counter()
+            results[name] = runner(tree, source_names, candidates)
+            timings[name] = (time.perf_counter() - start) / len(candidates) * 1e9
+
+        print(f"\n📐 {expression}")
+        print(f"   eval + SimpleNamespace: {timings['eval']:8.0f} ns/candidate")
+        print(f"   compiled closure:       {timings['closure']:8.0f} ns/candidate")
+        print(f"   speedup: {timings['eval'] / timings['closure']:.1f}x, "
+              f"same matches: {results['eval'] == results['closure']} ({results['closure']:,})")
+
+
+if __name__ == "__main__":
+    main()
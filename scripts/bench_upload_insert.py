@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Upload Insert Benchmark
+Times the write step of UploadRepository.saveFileDetails in both
+UPLOAD_INSERT_MODE settings on synthetic batches: "orm" (Transaction objects
+added to the session and flushed) against "copy" (_copyTransactions). The
+duplicate check, column mapping and network lookup run the same way in both
+modes and are left out, so the numbers compare only the inserts. Each mode
+writes under its own upload file record, which is deleted again (with its
+transactions) afterwards.
+
+Runs against the configured DATABASE_URL; channel and source must exist.
+
+Usage:
+    python scripts/bench_upload_insert.py --channel-id 1 --source-id 1 [--rows 50000] [--batch-size 5000]
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.db.session import get_db
+from app.db.models.transactions import Transaction
+from app.db.repositories.upload import UploadRepository
+from app.utils.typed_columns import parse_amount, parse_txn_ts
+
+
+def make_rows(count: int, channel_id: int, source_id: int, seed: int = 7):
+    """Transaction rows shaped like the ones saveFileDetails builds"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        raw = {
+            "rrn": f"{rng.randint(10**11, 10**12 - 1)}",
+            "amount": f"{rng.randint(1, 99999)}.{rng.randint(0, 99):02d}",
+            "datetime": (datetime(2000, 1, 1) + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "account": f"{rng.randint(10**9, 10**10 - 1)}",
+            "currency": "KES",
+            "terminal": f"T{rng.randint(1, 500)}",
+            "narration": "bench row",
+        }
+        rows.append({
+            "channel_id": channel_id,
+            "source_id": source_id,
+            "otherDetails": json.dumps(raw),
+            "created_by": None,
+            "updated_by": None,
+            "version_number": 1,
+            "created_at": now,
+            "updated_at": now,
+            "amount": raw["amount"],
+            "date": raw["datetime"],
+            "account_number": raw["account"],
+            "ccy": raw["currency"],
+            "reference_number": raw["rrn"],
+            "network_id": None,
+            "amount_numeric": parse_amount(raw["amount"]),
+            "txn_ts": parse_txn_ts(raw["datetime"]),
+        })
+    return rows
+
+
+async def insert_batch(db, mode: str, batch):
+    if mode == "copy":
+        await UploadRepository._copyTransactions(db, batch)
+    else:
+        # As saveFileDetails: the ORM takes otherDetails as a dict (JSONB)
+        db.add_all([
+            Transaction(**{**data, "otherDetails": json.loads(data["otherDetails"])})
+            for data in batch
+        ])
+        await db.flush()
+    await db.commit()
+
+
+async def run_mode(db, mode: str, rows, batch_size: int, channel_id: int, source_id: int):
+    saved = await UploadRepository.saveUploadedFileDetails(db, {
+        "file_name": f"bench_upload_insert_{mode}.csv",
+        "file_details": {"file_type": source_id, "file_size": "0 KB"},
+        "channel_id": channel_id,
+        "status": 2,
+        "record_details": {"total_records": len(rows)},
+        "total_records": len(rows),
+        "version_number": 1,
+        "created_by": None,
+    })
+    if saved.get("error"):
+        raise RuntimeError(saved.get("message"))
+    file_id = saved["insertedId"]
+    for row in rows:
+        row["file_transactions_id"] = file_id
+
+    started = time.perf_counter()
+    try:
+        for start in range(0, len(rows), batch_size):
+            await insert_batch(db, mode, rows[start : start + batch_size])
+        return time.perf_counter() - started
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await UploadRepository.deleteFileAndTransactions(db, file_id)
+
+
+async def bench(rows_count: int, batch_size: int, channel_id: int, source_id: int):
+    async for db in get_db():
+        print(f"📊 {rows_count:,} rows in batches of {batch_size:,} (channel {channel_id}, source {source_id})\n")
+        results = {}
+        for mode in ["orm", "copy"]:
+            rows = make_rows(rows_count, channel_id, source_id)
+            elapsed = await run_mode(db, mode, rows, batch_size, channel_id, source_id)
+            results[mode] = elapsed
+            print(f"   {mode:<5} {rows_count:>10,} rows  {elapsed:8.2f}s  {rows_count / elapsed:>10,.0f} rows/s")
+
+        print(f"\n✅ copy is {results['orm'] / results['copy']:.1f}x faster than orm")
+        break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs COPY transaction inserts")
+    parser.add_argument("--channel-id", type=int, required=True, help="Existing channel id")
+    parser.add_argument("--source-id", type=int, required=True, help="Existing source id")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows per mode")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per saveFileDetails call")
+    args = parser.parse_args()
+    asyncio.run(bench(args.rows, args.batch_size, args.channel_id, args.source_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Upload Batch Preparation Benchmark
+Runs UploadRepository.saveFileDetails on synthetic batches whose reference,
+account, transaction id, service name and card number columns are
+auto-detected (amount, date and currency are mapped, as the upload screen
+sends them) and reports rows/s, plus the CPU time spent in this process
+(the part the database does not account for). Run it before and after a change to
+saveFileDetails to compare; the rows go under their own upload file record,
+which is deleted again (with its transactions) afterwards.
+
+Runs against the configured DATABASE_URL; channel and source must exist.
+Use a channel with networks to include the network lookup.
+
+Usage:
+    python scripts/bench_upload_prepare.py --channel-id 1 --source-id 1 [--rows 50000] [--batch-size 5000]
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.db.session import get_db
+from app.db.repositories.upload import UploadRepository
+
+SERVICES = ["NFS AIRTEL", "visa", "Mastercard", "airtel money", "MPESA", "unknown service", ""]
+CARD_PREFIXES = ["453789", "551234", "371234", "601100", "999999"]
+
+
+def make_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2000, 1, 1)
+    return [
+        {
+            "transaction amount": f"{rng.randint(1, 99999)}.{rng.randint(0, 99):02d}",
+            "posting date": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "currency": "KES",
+            "retrieval reference number": f"{rng.randint(10**11, 10**12 - 1)}",
+            "acctno": f"{rng.randint(10**9, 10**10 - 1)}",
+            "stan": f"{rng.randint(1, 999999):06d}",
+            "service name": rng.choice(SERVICES),
+            "cardno_masked": f"{rng.choice(CARD_PREFIXES)}******{rng.randint(0, 9999):04d}",
+            "terminal": f"T{rng.randint(1, 500)}",
+            "narration": "bench row",
+        }
+        for i in range(count)
+    ]
+
+
+async def bench(rows_count: int, batch_size: int, channel_id: int, source_id: int):
+    async for db in get_db():
+        rows = make_rows(rows_count)
+        saved = await UploadRepository.saveUploadedFileDetails(db, {
+            "file_name": "bench_upload_prepare.csv",
+            "file_details": {"file_type": source_id, "file_size": "0 KB"},
+            "channel_id": channel_id,
+            "status": 2,
+            "record_details": {"total_records": rows_count},
+            "total_records": rows_count,
+            "version_number": 1,
+            "created_by": None,
+        })
+        if saved.get("error"):
+            raise RuntimeError(saved.get("message"))
+        file_id = saved["insertedId"]
+        file_json = {
+            "channel_id": channel_id,
+            "source_id": source_id,
+            "file_transactions_id": file_id,
+            "created_by": None,
+            "updated_by": None,
+            "version_number": 1,
+        }
+
+        print(f"📊 {rows_count:,} rows in batches of {batch_size:,} (channel {channel_id}, source {source_id})\n")
+        inserted = 0
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            for start in range(0, rows_count, batch_size):
+                # saveFileDetails logs every batch in detail; keep the output readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = await UploadRepository.saveFileDetails(
+                        db=db,
+                        fileData=rows[start : start + batch_size],
+                        fileJson=file_json,
+                        getDateTimeColumnName="posting date",
+                        getAmountColumnName="transaction amount",
+                        getAcountNumberColumnName=None,
+                        getCurrencyColumnName="currency",
+                    )
+                if result.get("error"):
+                    raise RuntimeError(result.get("message"))
+                inserted += result["recordsSaved"]
+            elapsed = time.perf_counter() - started
+            cpu = time.process_time() - cpu_started
+        finally:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await UploadRepository.deleteFileAndTransactions(db, file_id)
+
+        print(f"✅ {inserted:,} rows saved in {elapsed:.2f}s ({inserted / elapsed:,.0f} rows/s)")
+        print(f"   Python CPU: {cpu:.2f}s ({cpu * 1e6 / inserted:,.1f} µs/row)")
+        break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark saveFileDetails batch preparation")
+    parser.add_argument("--channel-id", type=int, required=True, help="Existing channel id")
+    parser.add_argument("--source-id", type=int, required=True, help="Existing source id")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows to save")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per saveFileDetails call")
+    args = parser.parse_args()
+    asyncio.run(bench(args.rows, args.batch_size, args.channel_id, args.source_id))
+
+
+if __name__ == "__main__":
+    main()
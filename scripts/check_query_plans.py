@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Check that the matching / search hot queries use their indexes
+Builds each hot query with the application's own query builders (matcher
+claim and fetch, upload duplicate check, listing, search), EXPLAINs its
+generic plan and checks that the expected index shows up in the plan.
+Exits with status 1 if any query does not use its index.
+
+The app runs its statements through asyncpg as prepared statements with
+bound parameters, so Postgres may switch them to a generic plan (no
+parameter values known). Each query is therefore PREPAREd and explained
+with plan_cache_mode = force_generic_plan: an index that only a literal
+value would make usable (e.g. a partial index on a bound match_status)
+fails the check.
+
+On small or freshly loaded databases the planner rightly prefers sequential
+scans; --force-index disables them for the session to check that the
+indexes are at least usable. Run ANALYZE tbl_txn_transactions first on
+real data.
+
+Usage:
+    python scripts/check_query_plans.py [--force-index] [--verbose]
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import json
+from sqlalchemy import text
+from app.config import settings
+from app.db.session import get_db
+from app.db.repositories.upload import UploadRepository
+from app.new_engine.application_matcher import ApplicationMatcher
+from app.services.recon_run_service import _recon_reference_query
+from app.services.transaction_search_service import TransactionSearchService
+from app.schemas.transaction_search_schemas import SmartSearchRequest
+from app.utils.smart_search_detector import SmartSearchDetector
+from app.api.v1.routers.transactions import _group_keys_query, _match_status_condition
+
+
+def _hot_queries(matcher: ApplicationMatcher, sample: dict) -> list:
+    """(name, expected index, statement) of every hot query"""
+    details_columns, details_params, _ = matcher._other_details_columns(None)
+    claim_query, _ = ApplicationMatcher._claim_query(
+        [sample["source_name"]], sample["channel_id"], sample["recon_group_number"]
+    )
+    fetch_query, _ = ApplicationMatcher._fetch_query(
+        sample["source_name"], sample["channel_id"], details_columns, details_params
+    )
+    run_fetch_query, _ = ApplicationMatcher._fetch_query(
+        sample["source_name"], sample["channel_id"], details_columns, details_params,
+        run_marker=sample["recon_group_number"]
+    )
+    dedup_query, _ = UploadRepository._existingKeysQuery(
+        sample["channel_id"], sample["source_id"],
+        [sample["amount"]], [sample["date"]], [sample["ccy"]], with_ccy=True
+    )
+    search_complete = TransactionSearchService._smart_search_filters(
+        SmartSearchRequest(search_query=sample["rrn"])
+    )
+    search_fragment = TransactionSearchService._smart_search_filters(
+        SmartSearchRequest(rrn_list=[sample["reference_fragment"]])
+    )
+
+    return [
+        (
+            "matcher claim (unmatched rows of the rule's sources)",
+            "idx_txn_unmatched_channel_source",
+            text(claim_query),
+        ),
+        (
+            "matcher fetch (claimed run)",
+            "idx_txn_recon_group_number",
+            text(run_fetch_query),
+        ),
+        (
+            "matcher fetch (dry run, unclaimed rows)",
+            "idx_txn_unmatched_channel_source",
+            text(fetch_query),
+        ),
+        (
+            "upload duplicate check",
+            "idx_txn_dedup_key",
+            text(dedup_query),
+        ),
+        (
+            "recon reference lookup",
+            "idx_txn_recon_reference_number",
+            _recon_reference_query(sample["recon_reference_number"]),
+        ),
+        (
+            "matched listing: page of group keys",
+            "idx_txn_matched_group_key",
+            _group_keys_query(
+                "matched", [_match_status_condition("matched")], True, None, offset=0, limit=51
+            ),
+        ),
+        (
+            "partial listing: page of group keys",
+            "idx_txn_partial_group_key",
+            _group_keys_query(
+                "partial", [_match_status_condition("partial")], True, None, offset=0, limit=51
+            ),
+        ),
+        (
+            "search: complete RRN",
+            "idx_txn_reference_number" if settings.SEARCH_EXACT_FAST_PATHS else "idx_txn_reference_number_trgm",
+            TransactionSearchService._recon_refs_query(search_complete, 0, 30),
+        ),
+        (
+            "search: RRN fragment (pg_trgm)",
+            "idx_txn_reference_number_trgm",
+            TransactionSearchService._recon_refs_query(search_fragment, 0, 30),
+        ),
+    ]
+
+
+def _index_names(plan: dict) -> set:
+    """All index names used anywhere in an EXPLAIN (FORMAT JSON) plan tree"""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+async def _sample_values(db) -> dict:
+    """Realistic bind values: the newest transaction (placeholders if the table is empty)"""
+    result = await db.execute(text("""
+        SELECT t.channel_id, t.source_id, s.source_name, t.amount, t.date, t.ccy,
+               t.reference_number, t.recon_reference_number, t.recon_group_number
+        FROM tbl_txn_transactions t
+        LEFT JOIN tbl_cfg_source s ON t.source_id = s.id
+        ORDER BY t.id DESC
+        LIMIT 1
+    """))
+    row = result.mappings().first()
+    values = dict(row) if row else {}
+    defaults = {
+        "channel_id": 1, "source_id": 1, "source_name": "ATM", "amount": "0",
+        "date": "1970-01-01 00:00:00", "ccy": "", "reference_number": "000000000000",
+        "recon_reference_number": "REF-0", "recon_group_number": "RUN-0",
+    }
+    sample = {key: values.get(key) if values.get(key) is not None else default
+              for key, default in defaults.items()}
+    # A complete RRN takes the exact-match search path
+    reference = sample["reference_number"]
+    sample["rrn"] = reference if SmartSearchDetector.is_full_rrn(reference) else "000000000000"
+    # Middle of the reference, as typed into the search box
+    sample["reference_fragment"] = reference[len(reference) // 4:][:6]
+    return sample
+
+
+async def _explain_generic(db, statement) -> dict:
+    """EXPLAIN plan of the statement as a prepared statement with a generic plan"""
+    compiled = statement.compile(
+        dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    parameters = len(compiled.positiontup or [])
+
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection
+    await driver.execute(f"PREPARE hot_query AS {compiled.string}")
+    try:
+        # Generic plan: the (NULL) arguments are not looked at by the planner
+        arguments = ", ".join(["NULL"] * parameters)
+        execute = f"EXECUTE hot_query({arguments})" if parameters else "EXECUTE hot_query"
+        explain = await driver.fetchval(f"EXPLAIN (FORMAT JSON) {execute}")
+    finally:
+        await driver.execute("DEALLOCATE hot_query")
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    return explain[0]["Plan"]
+
+
+async def check_query_plans(force_index: bool, verbose: bool) -> bool:
+    async for db in get_db():
+        await db.execute(text("SET plan_cache_mode = force_generic_plan"))
+        if force_index:
+            await db.execute(text("SET enable_seqscan = off"))
+            print("⚙️  Sequential scans disabled for this session (--force-index)\n")
+
+        sample = await _sample_values(db)
+        hot_queries = _hot_queries(ApplicationMatcher(db), sample)
+        failures = 0
+        for name, expected_index, statement in hot_queries:
+            plan = await _explain_generic(db, statement)
+            used = _index_names(plan)
+
+            if expected_index in used:
+                print(f"✅ {name}: {expected_index}")
+            else:
+                failures += 1
+                print(f"❌ {name}: expected {expected_index}, plan uses {sorted(used) or 'no index'}")
+            if verbose:
+                print(json.dumps(plan, indent=2))
+
+        await db.rollback()
+        print(f"\n📊 {len(hot_queries) - failures}/{len(hot_queries)} hot queries use their index")
+        return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries and check their indexes")
+    parser.add_argument("--force-index", action="store_true", help="Disable sequential scans (small databases)")
+    parser.add_argument("--verbose", action="store_true", help="Print the full plans")
+    args = parser.parse_args()
+    ok = asyncio.run(check_query_plans(args.force_index, args.verbose))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Invalidate the network mapping cache of every API / Celery process
+Run after editing tbl_cfg_networks or tbl_cfg_channels outside the app
+(seeds, SQL): bumps the shared version in Redis, so every process reloads
+the mapping within NETWORK_CACHE_CHECK_SECONDS. Needs REDIS_URL.
+
+Usage:
+    python scripts/clear_network_cache.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import asyncio
+
+from app.config import settings
+from app.db.repositories.upload import UploadRepository
+
+
+def main():
+    if not settings.REDIS_URL:
+        print("⚠️ REDIS_URL is not set: each process only reloads when its own copy expires")
+        sys.exit(1)
+    asyncio.run(UploadRepository.clearNetworkCache())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Rebuild tbl_txn_recon_rollup from tbl_txn_transactions
+Run once after the migration (before enabling RECON_ROLLUP) and whenever the
+rollup needs repairing, e.g. after bulk SQL edits that bypass the app.
+
+Rollout: RECON_ROLLUP is off by default, and while it is off nothing keeps
+the table current. In a window without uploads or matching, run this
+script, then deploy with RECON_ROLLUP=true. Run it again if transactions
+changed between the rebuild and the deploy.
+
+Usage:
+    python scripts/rebuild_recon_rollup.py                 # all channels
+    python scripts/rebuild_recon_rollup.py --channel-id 3  # one channel
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+from sqlalchemy import text
+from app.db.session import get_db
+from app.db.repositories.recon_rollup_repository import ReconRollupRepository
+
+
+async def rebuild_recon_rollup(channel_id=None):
+    """
+    Rebuild the rollup channel by channel (one transaction per channel)
+    """
+    async for db in get_db():
+        if channel_id is not None:
+            channel_ids = [channel_id]
+        else:
+            # Every channel with transactions or stale buckets (0 = no channel)
+            result = await db.execute(text("""
+                SELECT DISTINCT COALESCE(channel_id, 0) FROM tbl_txn_transactions
+                UNION
+                SELECT channel_id FROM tbl_txn_recon_rollup
+                ORDER BY 1
+            """))
+            channel_ids = list(result.scalars().all())
+
+        total_buckets = 0
+        total_transactions = 0
+        for cid in channel_ids:
+            result = await ReconRollupRepository.rebuild(db, channel_id=cid)
+            if result["error"]:
+                print(f"❌ Channel {cid}: {result['message']}")
+                continue
+            total_buckets += result["buckets"]
+            total_transactions += result["transactions"]
+            print(f"✅ Channel {cid}: {result['buckets']:,} buckets, {result['transactions']:,} transactions")
+
+        print(f"\n📊 Rollup rebuilt: {total_buckets:,} buckets, {total_transactions:,} transactions")
+        break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the reconciliation rollup table")
+    parser.add_argument("--channel-id", type=int, default=None, help="Only rebuild this channel")
+    args = parser.parse_args()
+    asyncio.run(rebuild_recon_rollup(args.channel_id))
+
+
+if __name__ == "__main__":
+    main()